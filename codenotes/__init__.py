@@ -1,11 +1,17 @@
+import os
 import sys
 import argparse
-from typing import Final, Text
+from typing import TYPE_CHECKING, Final, Text
 
 import codenotes.util.help as help_text
+from codenotes.util.args import change_number, positive_int
+from codenotes.util.formats import FORMATS, INPUT_FORMATS
+from codenotes.db.journal import journal_enabled
+from codenotes.db.location import DATABASE_VARIABLE, MEMORY_DATABASE
 from codenotes.cli import PrintFormatted
-from codenotes.cli.tasks import AddTask, SearchTask
-from codenotes.cli.notes import AddNote, SearchNote
+
+if TYPE_CHECKING:
+    from codenotes.db.connection import SQLiteConnection
 
 
 __version__ = '0.0.1'
@@ -27,6 +33,7 @@ def parse_args(sys_args: list) -> argparse.Namespace:
 
     parser = argparse.ArgumentParser(prog='codenotes')
     parser.add_argument('--version', '-v', action='version', version=__version__)
+    parser.add_argument('--db', action='store')
     subparsers = parser.add_subparsers(dest='subargs')
 
     add = subparsers.add_parser('add')
@@ -37,12 +44,14 @@ def parse_args(sys_args: list) -> argparse.Namespace:
     task.add_argument('text', type=str, nargs='*', action='store')
     task.add_argument('--category', '-c', type=str, nargs='*', action='store')
     task.add_argument('--preview', '-p', action='store_true')
+    task.add_argument('--journal', '-j', action='store_true')
 
     note = add_type_file.add_parser('note')  # TODO: ADD ARGUMENT TO ADD FROM CLIPBOARD
     note.add_argument('text', type=str, nargs='*', action='store')
     note.add_argument('--title', '-t', type=str, nargs='*', action='store')
     note.add_argument('--category', '-c', type=str, nargs='*', action='store')
     note.add_argument('--preview', '-p', action='store_true')
+    note.add_argument('--journal', '-j', action='store_true')
 
     search = subparsers.add_parser('search')
 
@@ -56,6 +65,53 @@ def parse_args(sys_args: list) -> argparse.Namespace:
     search_group.add_argument('--week', '-w', action='store_true')
     search_group.add_argument('--month', '-m', action='store_true')
 
+    order_group = search.add_mutually_exclusive_group()
+
+    order_group.add_argument('--rank', '-r', action='store_true')
+    order_group.add_argument('--fuzzy', '-f', action='store_true')
+
+    search.add_argument('--limit', '-l', type=positive_int)
+
+    page_group = search.add_mutually_exclusive_group()
+
+    page_group.add_argument('--after', '-a', type=positive_int)
+    page_group.add_argument('--page', type=positive_int)
+
+    search.add_argument('--format', choices=FORMATS)
+    search.add_argument('--all-dbs', action='store_true')
+
+    import_file = subparsers.add_parser('import')
+
+    import_file.add_argument('type', choices=['note', 'task'])
+    import_file.add_argument('file', action='store')
+    import_file.add_argument('--format', choices=INPUT_FORMATS)
+    import_file.add_argument('--batch-size', '-b', type=positive_int)
+
+    export = subparsers.add_parser('export')
+
+    export.add_argument('--format', choices=FORMATS, default='ndjson')
+    export.add_argument('--output', '-o', action='store')
+    export.add_argument('--gzip', '-z', action='store_true')
+    export.add_argument('--since', '-s', type=change_number)
+
+    batch = subparsers.add_parser('batch')
+
+    batch.add_argument('file', action='store')
+    batch.add_argument('--commit-every', '-n', type=positive_int)
+    batch.add_argument('--quiet', '-q', action='store_true')
+
+    subparsers.add_parser('compact')
+
+    init = subparsers.add_parser('init')
+    init.add_argument('directory', nargs='?')
+
+    subparsers.add_parser('shell')
+
+    daemon = subparsers.add_parser('daemon')
+
+    daemon.add_argument('action', choices=['start', 'stop', 'status'])
+    daemon.add_argument('--foreground', '-f', action='store_true')
+
     tui = subparsers.add_parser('tui')
     tui.add_argument('type', choices=['note', 'task'])
 
@@ -78,28 +134,123 @@ def print_usage(error_message: str = None) -> None:
     PrintFormatted.print_help(help_text.CLI_USAGE_TEXT)
 
 
-def main():
-    """ Main function """
-    args = parse_args(sys.argv[1:])
-    if len(sys.argv) > 1:
-        #* ADD <type>
-        if args.subargs == 'add':
-            if args.type == 'task':
-                AddTask.set_args(args)
-
-            elif args.type == 'note':
-                AddNote.set_args(args)
-            else:
-                print_usage()
-
-        #*  SEARCH <type>
-        elif args.subargs == 'search':
-            if args.type == 'task':
-                SearchTask.set_args(args)
-            elif args.type == 'note':
-                SearchNote.set_args(args)
-            else:
-                print_usage()
+def dispatch(args: argparse.Namespace, db: 'SQLiteConnection' = None) -> None:
+    """ Runs the command of the arguments. The module of each command is imported only when the command is run, so
+    the commands that don't display anything (or only a few lines) don't load the renderables of rich
+
+    Parameters
+    ----------
+    args: Namespace
+        Arguments of argparse
+
+    db: SQLiteConnection
+        Connection with the database used by the command. When it isn't passed, the command opens its own connection
+    """
+    #* ADD <type>
+    if args.subargs == 'add':
+        if args.type in ('task', 'note') and journal_enabled(args.journal):
+            from codenotes.cli.journal import CaptureAnnotations
+
+            if CaptureAnnotations.capturable(args):  # Appended to the journal, without opening the database
+                CaptureAnnotations.set_args(args)
+                return
+
+        if args.type == 'task':
+            from codenotes.cli.tasks import AddTask
+
+            AddTask.set_args(args, db)
+        elif args.type == 'note':
+            from codenotes.cli.notes import AddNote
+
+            AddNote.set_args(args, db)
+        else:
+            print_usage()
+
+    #*  SEARCH <type>
+    elif args.subargs == 'search':
+        if args.type == 'task':
+            from codenotes.cli.tasks import SearchTask
+
+            SearchTask.set_args(args, db)
+        elif args.type == 'note':
+            from codenotes.cli.notes import SearchNote
+
+            SearchNote.set_args(args, db)
+        else:
+            print_usage()
+
+    #* IMPORT <type> <file>
+    elif args.subargs == 'import':
+        from codenotes.cli.importer import ImportAnnotations
+
+        ImportAnnotations.set_args(args, db)
+
+    #* EXPORT
+    elif args.subargs == 'export':
+        from codenotes.cli.export import ExportAnnotations
+
+        ExportAnnotations.set_args(args, db)
+
+    #* BATCH <file>
+    elif args.subargs == 'batch':
+        from codenotes.cli.batch import BatchCommands
+
+        BatchCommands.set_args(args, db)
+
+    #* COMPACT
+    elif args.subargs == 'compact':
+        from codenotes.cli.journal import CompactJournal
+
+        CompactJournal.set_args(args, db)
+
+    #* INIT <directory>
+    elif args.subargs == 'init':
+        from codenotes.cli.project import InitProject
+
+        InitProject.set_args(args)
+
+    #* SHELL
+    elif args.subargs == 'shell':
+        from codenotes.cli.shell import Shell
+
+        Shell.set_args(args, db)
+
+    #* TUI <type>
+    elif args.subargs == 'tui':
+        from codenotes.tui import App
+
+        App.set_args(args, db)
+
+    #* DAEMON <action>
+    elif args.subargs == 'daemon':
+        from codenotes.cli.daemon import DaemonCommand
+
+        DaemonCommand.set_args(args)
 
     else:
         print_usage()
+
+
+def main():
+    """ Main function """
+    from codenotes.daemon import forward
+
+    try:
+        # When the daemon is running, the command runs there and only its output is written here
+        status = forward(sys.argv[1:])
+        if status is not None:
+            sys.exit(status)
+
+        args = parse_args(sys.argv[1:])
+        if args.db:  # The flag has precedence over the other locations of the database (see codenotes.db.location)
+            os.environ[DATABASE_VARIABLE] = args.db if args.db == MEMORY_DATABASE else os.path.abspath(args.db)
+
+        if len(sys.argv) > 1:
+            dispatch(args)
+        else:
+            print_usage()
+    except BrokenPipeError:
+        # The output was piped to a command that stopped reading (e.g. head). Python would fail again flushing
+        # stdout at exit, so it's redirected to devnull
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
@@ -1,7 +1,65 @@
-from typing import final
+from typing import TYPE_CHECKING, Any, Optional, final
 
-from rich.theme import Theme
-from rich.console import Console
+from codenotes.util.sql import SNIPPET_START, SNIPPET_END
+
+if TYPE_CHECKING:  # rich is imported only when something is printed
+    from rich.text import Text
+    from rich.theme import Theme
+    from rich.console import Console
+
+
+# Options of every Console created. The daemon sets them with the ones of the client terminal (width, color, etc.)
+CONSOLE_OPTIONS: dict[str, Any] = {}
+
+
+def new_console(**options: Any) -> 'Console':
+    """ Creates a rich Console with CONSOLE_OPTIONS. rich is imported the first time a console is created. When a
+    console is shared (see PrintFormatted.share_console), that one is returned instead
+
+    Parameters
+    ----------
+    options: Any
+        Options of the Console, which override the ones of CONSOLE_OPTIONS
+
+    Returns
+    -------
+    console: Console
+        (Rich) Console for beatiful printting
+    """
+    if PrintFormatted.shared_console is not None:
+        return PrintFormatted.shared_console
+
+    from rich.console import Console
+
+    return Console(**{**CONSOLE_OPTIONS, **options})
+
+
+def highlight_snippet(snippet: str, style: str = 'bold yellow') -> 'Text':
+    """ Converts the excerpt returned by snippet() into rich Text, with the matched terms highlighted
+
+    Parameters
+    ----------
+    snippet: str
+        Excerpt with the matched terms wrapped by SNIPPET_START and SNIPPET_END
+
+    style: str
+        Style used to highlight the matched terms
+
+    Returns
+    -------
+    text: Text
+        (Rich) Text with the excerpt
+    """
+    from rich.text import Text
+
+    text = Text()
+
+    for part in (snippet or '').split(SNIPPET_START):
+        matched, _, rest = part.rpartition(SNIPPET_END)
+        text.append(matched, style=style)
+        text.append(rest)
+
+    return text
 
 
 @final
@@ -15,11 +73,19 @@ class PrintFormatted:
     ----------
     console: Console
         (Rich) Console for beatiful printting
+
+    theme: Theme
+        Theme used for the text displayed, when the console is shared
+
+    shared_console: Optional[Console]
+        Console used by all the instances (and by new_console), instead of creating a new one each time
     """
 
-    console: Console
+    console: 'Console'
+    theme: 'Theme' = None
+    shared_console: Optional['Console'] = None
 
-    def __init__(self, custom_theme: Theme = None):
+    def __init__(self, custom_theme: 'Theme' = None):
         """ PrintFormatted Constructor 
         
         Parameters
@@ -28,13 +94,41 @@ class PrintFormatted:
             Theme use for Console class
         """
         # If a theme is passed, while pass it through Console class
-        if custom_theme:
-            self.console = Console(theme=custom_theme)
+        if self.shared_console is not None:
+            self.console = self.shared_console
+            self.theme = custom_theme
+        elif custom_theme:
+            self.console = new_console(theme=custom_theme)
+        else:
+            self.console = new_console()
+
+    @classmethod
+    def share_console(cls, console: Optional['Console']) -> None:
+        """ Class method used to share a console, which is used instead of creating one for each text printed
+
+        Parameters
+        ----------
+        console: Optional[Console]
+            Console shared. None to stop sharing it
+        """
+        cls.shared_console = console
+
+    def print(self, text: Any) -> None:
+        """ Method used to print text (or a renderable) with the theme of the instance
+
+        Parameters
+        ----------
+        text: Any
+            Text with rich format, or renderable
+        """
+        if self.theme is not None:
+            with self.console.use_theme(self.theme):
+                self.console.print(text)
         else:
-            self.console = Console()
+            self.console.print(text)
 
     @classmethod
-    def custom_print(cls, text: str, theme: Theme = None) -> None:
+    def custom_print(cls, text: str, theme: 'Theme' = None) -> None:
         """ Class method used to print custom formatted text
         Parameters
         ----------
@@ -45,7 +139,7 @@ class PrintFormatted:
             Theme used for the text to be displayed
         """
         print_formatted = cls(theme)
-        print_formatted.console.print(text)
+        print_formatted.print(text)
 
     @classmethod
     def print_category_creation(cls, category: str) -> None:
@@ -56,6 +150,8 @@ class PrintFormatted:
         category: str
             Name of the category created
         """
+        from rich.theme import Theme
+
         custom_txt = '[msg]Created new category:[/msg][name]{}[/name]'.format(category)
 
         custom_theme = Theme({
@@ -64,7 +160,7 @@ class PrintFormatted:
         })
 
         print_formatted = cls(custom_theme)
-        print_formatted.console.print(custom_txt)
+        print_formatted.print(custom_txt)
 
     @classmethod
     def print_content_storage(cls, content: str, category: str) -> None:
@@ -78,6 +174,8 @@ class PrintFormatted:
         category : str
             Category where is stored
         """
+        from rich.theme import Theme
+
         custom_txt = '[msg]> Saved[{}]: [/msg][content]{}[/content]'.format(category, content)
 
         custom_theme = Theme({
@@ -86,7 +184,7 @@ class PrintFormatted:
         })
 
         print_formatted = cls(custom_theme)
-        print_formatted.console.print(custom_txt)
+        print_formatted.print(custom_txt)
 
     @classmethod
     def ask_confirmation(cls, text: str) -> bool:
@@ -123,6 +221,8 @@ class PrintFormatted:
         help_txt: str
             Custom help text that will display instructions of how to use the CLI
         """
+        from rich.theme import Theme
+
         custom_text = help_txt
 
         custom_theme = Theme({
@@ -131,4 +231,4 @@ class PrintFormatted:
         })
         
         print_formatted = cls(custom_theme)
-        print_formatted.console.print(custom_text)
+        print_formatted.print(custom_text)
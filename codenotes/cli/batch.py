@@ -0,0 +1,174 @@
+import os
+import sys
+import shlex
+from argparse import Namespace
+from contextlib import nullcontext, redirect_stdout
+from typing import Final, Iterable, final
+
+from codenotes.cli import PrintFormatted, new_console
+from codenotes.db.connection import SQLiteConnection
+from codenotes.db.journal import replay
+
+BATCH_COMMANDS: Final[tuple[str, ...]] = ('add', 'search', 'import', 'export')  # Commands allowed in a script
+
+
+@final
+class BatchCommands:
+    """ Class to run a script of codenotes commands in this process
+
+    Each line of the script is a command of the CLI (add task ..., add note ... -c X), parsed with parse_args and run
+    with the same connection and console. The commits of the commands are deferred, so the script is committed once
+    at the end, or every commit_every commands. When a command fails, the commands that weren't committed are rolled
+    back and the script stops. Blank lines and lines starting with # are ignored
+
+    Attributes
+    ----------
+    db: SQLiteConnection
+        Connection with the database shared by all the commands
+
+    commit_every: int
+        Number of commands run in each transaction. None to commit once at the end
+
+    quiet: bool
+        Flag to hide the output of the commands
+
+    executed: int
+        Number of commands run
+
+    committed: int
+        Number of commands committed
+    """
+
+    db: SQLiteConnection
+    commit_every: int
+    quiet: bool
+    executed: int = 0
+    committed: int = 0
+
+    def __init__(self, args: Namespace, db: SQLiteConnection = None) -> None:
+        """ BatchCommands Constructor
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is opened, which is closed by the
+            class
+        """
+        self.commit_every = args.commit_every
+        self.quiet = args.quiet
+
+        if args.file != '-' and not os.path.isfile(args.file):
+            PrintFormatted.custom_print(f'[red]File not found: {args.file}[/red]')
+            return
+
+        self.own_db = db is None
+        self.db = db if db is not None else SQLiteConnection()
+
+        with (nullcontext(sys.stdin) if args.file == '-' else open(args.file, encoding='utf-8')) as script:
+            succeeded = self.run(script)
+
+        if self.own_db:
+            self.db.close()
+
+        if not succeeded:
+            sys.exit(1)
+
+    @classmethod
+    def set_args(cls, args: Namespace, db: SQLiteConnection = None) -> None:
+        """ Set args and initialize class
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is used
+        """
+        cls(args, db)
+
+    def run(self, script: Iterable[str]) -> bool:
+        """ Runs the commands of the script
+
+        Parameters
+        ----------
+        script: Iterable[str]
+            Lines of the script
+
+        Returns
+        -------
+        succeeded: bool
+            False when a command failed
+        """
+        from codenotes import parse_args, dispatch
+
+        replay(self.db)  # Before the commits are deferred, since the journal can't be replayed inside a transaction
+
+        shared_console = PrintFormatted.shared_console
+        PrintFormatted.share_console(new_console())
+        self.db.deferred_commits = True
+
+        try:
+            with open(os.devnull, 'w') if self.quiet else nullcontext() as devnull, \
+                    redirect_stdout(devnull) if self.quiet else nullcontext():
+                for number, line in enumerate(script, start=1):
+                    if not line.strip() or line.lstrip().startswith('#'):
+                        continue
+
+                    argv = shlex.split(line)
+                    if argv[0] == 'codenotes':
+                        argv = argv[1:]
+
+                    if not argv or argv[0] not in BATCH_COMMANDS:
+                        raise BatchError(number, f'{argv[0] if argv else line.strip()} can\'t be used in a batch')
+
+                    try:
+                        dispatch(parse_args(argv), self.db)
+                    except SystemExit as exit_error:  # Arguments rejected by argparse
+                        if exit_error.code:
+                            raise BatchError(number, 'invalid arguments')
+                    except Exception as error:
+                        raise BatchError(number, repr(error))
+
+                    self.executed += 1
+
+                    if self.commit_every and self.executed % self.commit_every == 0:
+                        self.db.commit(force=True)
+                        self.committed = self.executed
+
+            self.db.commit(force=True)
+            self.committed = self.executed
+        except (BatchError, ValueError) as error:  # ValueError: line with unclosed quotes
+            self.db.rollback()
+            PrintFormatted.custom_print(f'[red]❌ {error}[/red]')
+            PrintFormatted.custom_print(f'[yellow]{self.committed} commands committed, '
+                                        f'{self.executed - self.committed} rolled back')
+            return False
+        finally:
+            self.db.deferred_commits = False
+            PrintFormatted.share_console(shared_console)
+
+        PrintFormatted.custom_print(f'[bold green]✔️ {self.executed} commands run')
+
+        return True
+
+
+class BatchError(Exception):
+    """ Error of a command of the script """
+
+    def __init__(self, line: int, message: str) -> None:
+        """ BatchError Constructor
+
+        Parameters
+        ----------
+        line: int
+            Number of the line of the command
+
+        message: str
+            Description of the error
+        """
+        super().__init__(f'Line {line}: {message}')
+        self.line = line
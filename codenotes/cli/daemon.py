@@ -0,0 +1,77 @@
+from argparse import Namespace
+from datetime import timedelta
+from typing import final
+
+import codenotes.daemon as daemon
+from codenotes.cli import PrintFormatted
+
+
+@final
+class DaemonCommand:
+    """ Class to start, stop and show the status of the daemon
+
+    This class only has the purpose to control the daemon (see codenotes.daemon). When the daemon is running, the add
+    and search commands are forwarded to it through its socket, instead of running in a new process
+    """
+
+    def __init__(self, args: Namespace) -> None:
+        """ DaemonCommand Constructor
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+        """
+        if args.action == 'start':
+            self.start(args.foreground)
+        elif args.action == 'stop':
+            self.stop()
+        else:
+            self.status()
+
+    @classmethod
+    def set_args(cls, args: Namespace) -> None:
+        """ Set args and initialize class
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+        """
+        cls(args)
+
+    def start(self, foreground: bool) -> None:
+        """ Starts the daemon, when it isn't running
+
+        Parameters
+        ----------
+        foreground: bool
+            Flag to serve the daemon in this process, instead of a detached one
+        """
+        if daemon.request({'control': 'status'}) is not None:
+            PrintFormatted.custom_print('[yellow]Daemon is already running')
+        elif foreground:
+            PrintFormatted.custom_print(f'[green]Daemon listening on {daemon.socket_path()}')
+            daemon.serve()
+        elif daemon.start():
+            PrintFormatted.custom_print(f'[bold green]✔️ Daemon started[/bold green] ({daemon.socket_path()})')
+        else:
+            PrintFormatted.custom_print('[red]❌ Daemon could not be started')
+
+    def stop(self) -> None:
+        """ Stops the daemon, when it's running """
+        if daemon.request({'control': 'stop'}) is not None:
+            PrintFormatted.custom_print('[bold green]✔️ Daemon stopped')
+        else:
+            PrintFormatted.custom_print('[yellow]Daemon is not running')
+
+    def status(self) -> None:
+        """ Displays if the daemon is running, with its pid, uptime and number of commands run """
+        response = daemon.request({'control': 'status'})
+
+        if response is not None:
+            uptime = timedelta(seconds=int(response['uptime']))
+            PrintFormatted.custom_print(f'[green]Daemon running[/green] (pid {response["pid"]}, uptime {uptime}, '
+                                        f'{response["served"]} commands)')
+        else:
+            PrintFormatted.custom_print('[yellow]Daemon is not running')
@@ -0,0 +1,270 @@
+import sys
+import gzip
+from argparse import Namespace
+from contextlib import nullcontext
+from typing import ContextManager, Final, Iterable, Optional, TextIO, Union, final
+
+import codenotes.db.utilities.notes as notes
+import codenotes.db.utilities.tasks as tasks
+import codenotes.db.utilities.notes_categories as notes_categories
+import codenotes.db.utilities.tasks_categories as tasks_categories
+import codenotes.db.utilities.change_log as change_log
+import codenotes.db.journal as journal
+from codenotes.db.connection import SQLiteConnection
+from codenotes.util.formats import iter_cursor, write_rows
+from codenotes.util.text import status_text
+
+
+# Columns of the exported records. Each type of record uses only some of them, the rest are empty in csv/tsv
+EXPORT_COLUMNS: Final[tuple[str, ...]] = (
+    'type', 'id', 'title', 'content', 'status', 'category', 'readme', 'creation', 'updated'
+)
+CATEGORY_COLUMNS: Final[tuple[str, ...]] = ('type', 'id', 'category', 'updated')
+NOTE_COLUMNS: Final[tuple[str, ...]] = ('type', 'id', 'title', 'content', 'category', 'readme', 'creation', 'updated')
+TASK_COLUMNS: Final[tuple[str, ...]] = ('type', 'id', 'content', 'status', 'category', 'creation', 'updated')
+
+
+@final
+class ExportAnnotations:
+    """ Class to export the categories, notes and tasks of the database
+
+    This class only has the purpose to write all the annotations (or the ones changed since the previous export) in a
+    machine-readable format. The rows are read in batches from the cursor and written as soon as they are read, so the
+    memory used doesn't depend on the size of the database. All the tables are read in the same transaction, so the
+    export is a consistent snapshot. Nothing is printed to stdout apart from the records, and rich isn't imported
+
+    Attributes
+    ----------
+    db: SQLiteConnection
+        Connection with the dabatase
+
+    output_format: str
+        Format of the records (ndjson, tsv or csv)
+
+    output: str
+        Path of the file where the records are written. None to write them to stdout
+
+    compress: bool
+        Flag to compress the records with gzip
+
+    since: Union[int, str]
+        Number of the last change read by the previous export, whose later changes are exported. It can also be a
+        timestamp (UTC), which exports the rows changed since it (included); the timestamps are taken when the
+        statements run, not when they commit, so a row of a long transaction can be missed, and the rows changed in the
+        millisecond of the timestamp are exported again
+
+    last_change: int
+        Number of the last change of the database read, used as since of the next incremental export
+
+    last_updated: str
+        Timestamp of the last change exported
+
+    exported: int
+        Number of records exported
+    """
+
+    db: SQLiteConnection
+    output_format: str
+    output: Optional[str]
+    compress: bool
+    since: Optional[Union[int, str]]
+    last_change: int = 0
+    last_updated: Optional[str] = None
+    exported: int = 0
+
+    def __init__(self, args: Namespace, db: SQLiteConnection = None) -> None:
+        """ ExportAnnotations Constructor
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new read-only connection is opened, which is closed
+            by the class
+        """
+        self.own_db = db is None
+        self.db = db if db is not None else SQLiteConnection(read_only=True)
+        self.output_format = args.format
+        self.output = args.output
+        self.compress = args.gzip or bool(self.output and self.output.endswith('.gz'))
+        self.since = args.since
+
+        journal.replay(self.db)  # The annotations captured in the journal are exported too
+
+        with self.open_output() as stream:
+            self.export(stream)
+
+        if self.own_db:
+            self.db.close()
+
+        print(f'{self.exported or "No"} records exported. Next incremental export: --since {self.last_change}',
+              file=sys.stderr)
+
+    @classmethod
+    def set_args(cls, args: Namespace, db: SQLiteConnection = None) -> None:
+        """ Set args and initialize class
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is used
+        """
+        cls(args, db)
+
+    def open_output(self) -> ContextManager[TextIO]:
+        """ Function that opens the stream where the records are written
+
+        Returns
+        -------
+        stream: ContextManager[TextIO]
+            File, gzip file, or stdout (which isn't closed)
+        """
+        if self.compress:
+            return gzip.open(self.output or sys.stdout.buffer, 'wt', encoding='utf-8', newline='')
+        elif self.output:
+            return open(self.output, 'w', encoding='utf-8', newline='')
+
+        return nullcontext(sys.stdout)
+
+    def export(self, stream: TextIO) -> None:
+        """ Function that writes the records of the categories, notes and tasks to the stream
+
+        Parameters
+        ----------
+        stream: TextIO
+            Stream where the records are written
+        """
+        sections = (
+            (CATEGORY_COLUMNS, self.__categories('note_category', notes_categories)),
+            (CATEGORY_COLUMNS, self.__categories('task_category', tasks_categories)),
+            (NOTE_COLUMNS, self.__notes()),
+            (TASK_COLUMNS, self.__tasks())
+        )
+
+        if not self.db.connection.in_transaction:
+            self.db.exec_sql('BEGIN')  # The tables are read from the same snapshot
+        try:
+            # Read in the snapshot, so every change committed after it has a greater number
+            self.last_change = self.db.exec_sql(change_log.SELECT_LAST_SEQUENCE).fetchone()[0]
+
+            if self.output_format == 'ndjson':
+                for columns, rows in sections:
+                    self.exported += write_rows(self.__track(rows), columns, self.output_format, stream)
+            else:  # With a header, all the records must have the same columns
+                rows = (
+                    tuple(record.get(column) for column in EXPORT_COLUMNS)
+                    for columns, section_rows in sections
+                    for record in (dict(zip(columns, row)) for row in self.__track(section_rows))
+                )
+
+                self.exported = write_rows(rows, EXPORT_COLUMNS, self.output_format, stream)
+        finally:
+            self.db.commit()
+
+    def __track(self, rows: Iterable[tuple]) -> Iterable[tuple]:
+        """ Function that keeps the last timestamp of the rows written, which is their last column
+
+        Parameters
+        ----------
+        rows: Iterable[tuple]
+            Rows of a section
+
+        Returns
+        -------
+        rows: Iterable[tuple]
+            The same rows
+        """
+        for row in rows:
+            if row[-1] and (self.last_updated is None or row[-1] > self.last_updated):
+                self.last_updated = row[-1]
+
+            yield row
+
+    def __changed(self, utilities, column_id: str, column_updated: str) -> tuple[str, tuple]:
+        """ Function that returns the condition that filters the rows changed since the previous export
+
+        Parameters
+        ----------
+        utilities: module
+            Utility module of the table
+
+        column_id: str
+            Id column of the table, qualified when the query has joins
+
+        column_updated: str
+            Timestamp column of the table, qualified when the query has joins
+
+        Returns
+        -------
+        condition: tuple[str, tuple]
+            WHERE clause (empty without since) and its values
+        """
+        if isinstance(self.since, int):
+            return f' WHERE {change_log.changed_condition(utilities.TABLE_NAME, column_id)}', (self.since,)
+        elif self.since:
+            return f' WHERE {column_updated} >= ?', (self.since,)
+        return '', ()
+
+    def __categories(self, record_type: str, categories) -> Iterable[tuple]:
+        """ Function that reads the categories of notes or tasks
+
+        Parameters
+        ----------
+        record_type: str
+            Type of the records written
+
+        categories: module
+            Utility module of the categories table
+
+        Returns
+        -------
+        rows: Iterable[tuple]
+            Rows with the columns of CATEGORY_COLUMNS
+        """
+        where, values = self.__changed(categories, categories.COLUMN_ID, categories.COLUMN_UPDATED)
+        sql = f"SELECT '{record_type}', {categories.COLUMN_ID}, {categories.COLUMN_NAME}, {categories.COLUMN_UPDATED} " \
+              f"FROM {categories.TABLE_NAME}{where} ORDER BY {categories.COLUMN_ID}"
+
+        yield from iter_cursor(self.db.connection.execute(sql, values))
+
+    def __notes(self) -> Iterable[tuple]:
+        """ Function that reads the notes, with the name of their category
+
+        Returns
+        -------
+        rows: Iterable[tuple]
+            Rows with the columns of NOTE_COLUMNS
+        """
+        where, values = self.__changed(notes, f'{notes.TABLE_NAME}.{notes.COLUMN_ID}',
+                                       f'{notes.TABLE_NAME}.{notes.COLUMN_UPDATED}')
+        sql = f"SELECT 'note', {notes.COLUMN_ID}, {notes.COLUMN_TITLE}, {notes.COLUMN_CONTENT}, " \
+              f"{notes_categories.COLUMN_NAME}, {notes.COLUMN_README}, {notes.COLUMN_CREATION}, " \
+              f"{notes.TABLE_NAME}.{notes.COLUMN_UPDATED} FROM {notes.TABLE_NAME} LEFT JOIN " \
+              f"{notes_categories.TABLE_NAME} ON {notes.COLUMN_CATEGORY} = {notes_categories.COLUMN_ID}{where} " \
+              f"ORDER BY {notes.COLUMN_ID}"
+
+        for row in iter_cursor(self.db.connection.execute(sql, values)):
+            yield row[:5] + (bool(row[5]),) + row[6:]
+
+    def __tasks(self) -> Iterable[tuple]:
+        """ Function that reads the tasks, with the name of their category
+
+        Returns
+        -------
+        rows: Iterable[tuple]
+            Rows with the columns of TASK_COLUMNS
+        """
+        where, values = self.__changed(tasks, f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID}',
+                                       f'{tasks.TABLE_NAME}.{tasks.COLUMN_UPDATED}')
+        sql = f"SELECT 'task', {tasks.COLUMN_ID}, {tasks.COLUMN_CONTENT}, {tasks.COLUMN_STATUS}, " \
+              f"{tasks_categories.COLUMN_NAME}, {tasks.COLUMN_CREATION}, {tasks.TABLE_NAME}.{tasks.COLUMN_UPDATED} " \
+              f"FROM {tasks.TABLE_NAME} LEFT JOIN {tasks_categories.TABLE_NAME} ON " \
+              f"{tasks.COLUMN_CATEGORY} = {tasks_categories.COLUMN_ID}{where} ORDER BY {tasks.COLUMN_ID}"
+
+        for row in iter_cursor(self.db.connection.execute(sql, values)):
+            yield row[:3] + (status_text(row[3]),) + row[4:]
@@ -0,0 +1,377 @@
+import io
+import os
+from argparse import Namespace
+from itertools import islice
+from datetime import datetime, date
+from typing import TYPE_CHECKING, Any, Callable, Final, Iterable, Optional, final
+
+import codenotes.util.help as help_text
+import codenotes.db.utilities.notes as notes
+import codenotes.db.utilities.tasks as tasks
+import codenotes.db.utilities.notes_categories as notes_categories
+import codenotes.db.utilities.tasks_categories as tasks_categories
+import codenotes.db.category_ids as category_ids
+from codenotes.cli import PrintFormatted, new_console
+from codenotes.db.connection import SQLiteConnection
+from codenotes.util.formats import input_format_of, read_records
+from codenotes.util.text import status_text
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+CHUNK_SIZE: Final[int] = 1000  # Rows inserted in each executemany()
+MAX_CATEGORY_LENGTH: Final[int] = 30
+
+STATUS_VALUES: Final[dict[str, int]] = {status_text(value).lower(): value for value in range(3)}
+
+
+@final
+class ImportAnnotations:
+    """ Class to import tasks or notes from a file into the database
+
+    The file is read one record at a time, and the records are inserted in chunks with executemany inside a single
+    transaction, which is committed at the end (or after every batch_size records, when it's specified, reading each
+    batch before its transaction). When the transaction is retried, its records are inserted again. Categories are
+    loaded once, and the new ones are created the first time they are found. The progress is displayed with a progress
+    bar instead of a line for each record
+
+    Attributes
+    ----------
+    console: Console
+        (Rich) Console for beatiful printting
+
+    db: SQLiteConnection
+        Connection with the dabatase
+
+    annotation: str
+        Type of annotations imported (note or task)
+
+    path: str
+        Path of the file imported
+
+    input_format: str
+        Format of the file (ndjson, csv or todotxt)
+
+    batch_size: int
+        Number of records inserted in each transaction. None to insert all of them in one transaction
+
+    imported: int
+        Number of records imported
+
+    skipped: int
+        Number of records that couldn't be imported
+    """
+
+    console: 'Console'
+    db: SQLiteConnection
+    annotation: str
+    path: str
+    input_format: str
+    batch_size: int
+    imported: int = 0
+    skipped: int = 0
+
+    def __init__(self, args: Namespace, db: SQLiteConnection = None) -> None:
+        """ ImportAnnotations Constructor
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is opened, which is closed by the
+            class
+        """
+        self.console = new_console()
+        self.annotation = args.type
+        self.path = args.file
+        self.input_format = args.format or input_format_of(self.path)
+        self.batch_size = args.batch_size
+
+        if not self.input_format:
+            PrintFormatted.custom_print('[red]Format of the file unknown. Specify it with --format[/red]')
+            PrintFormatted.print_help(help_text.IMPORT_USAGE_TEXT)
+        elif not os.path.isfile(self.path):
+            PrintFormatted.custom_print(f'[red]File not found: {self.path}[/red]')
+        else:
+            self.own_db = db is None
+            self.db = db if db is not None else SQLiteConnection()
+            # The ids of the categories are loaded at once, instead of querying them record by record
+            category_ids.load(self.db, tasks_categories if self.annotation == 'task' else notes_categories)
+
+            try:
+                self.import_file()
+            except KeyboardInterrupt:
+                self.db.rollback()
+                self.console.print('[bold yellow]\nCorrectly Cancelled[/bold yellow]')
+
+            if self.own_db:
+                self.db.close()
+
+    @classmethod
+    def set_args(cls, args: Namespace, db: SQLiteConnection = None) -> None:
+        """ Set args and initialize class
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is used
+        """
+        cls(args, db)
+
+    def import_file(self) -> None:
+        """ Function that reads the file and inserts its records, each batch in a write transaction of the database """
+        from rich.progress import Progress
+
+        if self.annotation == 'task':
+            sql = f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_STATUS}, ' \
+                  f'{tasks.COLUMN_CREATION}, {tasks.COLUMN_CATEGORY}) VALUES (?,?,?,?);'
+        else:
+            sql = f'INSERT INTO {notes.TABLE_NAME} ({notes.COLUMN_TITLE}, {notes.COLUMN_CONTENT}, ' \
+                  f'{notes.COLUMN_CATEGORY}, {notes.COLUMN_README}, {notes.COLUMN_CREATION}) VALUES (?,?,?,?,?);'
+
+        with open(self.path, 'rb') as binary_file, Progress(console=self.console, transient=True) as progress:
+            text_file = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+            progress_task = progress.add_task(f'Importing {self.annotation}s', total=os.path.getsize(self.path))
+
+            update = lambda: progress.update(progress_task, completed=binary_file.tell())
+
+            if self.batch_size:
+                # Each batch is read before its transaction, so a retry of a locked database inserts the same records
+                records = read_records(text_file, self.input_format)
+
+                batch = list(islice(records, self.batch_size))
+
+                while batch:
+                    self.__write_batch(sql, lambda: batch, update)
+                    batch = list(islice(records, self.batch_size))
+            else:
+                # All the records are inserted in one transaction, so each attempt reads the file from the beginning
+                self.__write_batch(sql, lambda: read_records(rewind(text_file), self.input_format), update)
+
+        self.console.print(f'[bold green]✔️ {self.imported} {self.annotation}s imported')
+        if self.skipped:
+            self.console.print(f'[yellow]{self.skipped} records skipped, they have no content or invalid values')
+
+    def category_id(self, name: Optional[str]) -> int:
+        """ Function that returns the id of the category, creating it when it doesn't exist
+
+        Parameters
+        ----------
+        name: Optional[str]
+            Name of the category. Without name, it's the default category
+
+        Returns
+        -------
+        id: int
+            Id of the category
+        """
+        if not name:
+            return 1  # Default category
+
+        if len(name) > MAX_CATEGORY_LENGTH:
+            raise ValueError(f'Category name is too long: {name}')
+
+        return category_ids.resolve(self.db, tasks_categories if self.annotation == 'task' else notes_categories, name)
+
+    def task_values(self, record: dict[str, Any]) -> tuple:
+        """ Function that converts a record into the values of a task
+
+        Parameters
+        ----------
+        record: dict[str, Any]
+            Record read with content, and optionally status (number or text), creation and category
+
+        Returns
+        -------
+        values: tuple
+            Content, status, creation date and category id of the task
+        """
+        content = (record.get('content') or '').strip()
+
+        if not content:
+            raise ValueError('Task without content')
+
+        return content, parse_status(record.get('status')), parse_date(record.get('creation')), \
+            self.category_id(record.get('category'))
+
+    def note_values(self, record: dict[str, Any]) -> tuple:
+        """ Function that converts a record into the values of a note. When the note has no title, it takes the first
+        30 characters of the content
+
+        Parameters
+        ----------
+        record: dict[str, Any]
+            Record read with title or content, and optionally category, readme and creation
+
+        Returns
+        -------
+        values: tuple
+            Title, content, category id, readme flag and creation date of the note
+        """
+        content = record.get('content') or None
+        title = (record.get('title') or (content or '')[:30]).strip()
+
+        if not title:
+            raise ValueError('Note without title and content')
+
+        return title, content, self.category_id(record.get('category')), parse_flag(record.get('readme')), \
+            parse_date(record.get('creation'))
+
+    def __write_batch(self, sql: str, records: Callable[[], Iterable[Optional[dict[str, Any]]]],
+                      update: Callable[[], None]) -> None:
+        """ Function that inserts the records of a batch in a write transaction of the database. When the transaction is
+        retried, the counters are restored and the records are inserted again
+
+        Parameters
+        ----------
+        sql: str
+            Insert statement of the tasks or notes
+
+        records: Callable[[], Iterable[Optional[dict[str, Any]]]]
+            Function that returns the records of the batch, called by each attempt
+
+        update: Callable[[], None]
+            Function that updates the progress bar
+        """
+        counters = self.imported, self.skipped
+
+        def insert_batch() -> None:
+            self.imported, self.skipped = counters
+            self.__insert_batch(sql, self.__values(records()), update)
+
+        self.db.write(insert_batch)
+
+    def __insert_batch(self, sql: str, values: Iterable[tuple], update: Callable[[], None]) -> None:
+        """ Function that inserts the values of a batch in chunks, updating the progress bar after each chunk
+
+        Parameters
+        ----------
+        sql: str
+            Insert statement of the tasks or notes
+
+        values: Iterable[tuple]
+            Values of the tasks or notes of the batch
+
+        update: Callable[[], None]
+            Function that updates the progress bar
+        """
+        values = iter(values)
+        chunk = list(islice(values, CHUNK_SIZE))
+
+        while chunk:
+            self.db.exec_many(sql, chunk)
+            self.imported += len(chunk)
+            update()
+
+            chunk = list(islice(values, CHUNK_SIZE))
+
+    def __values(self, records: Iterable[Optional[dict[str, Any]]]) -> Iterable[tuple]:
+        """ Function that converts the records into the values inserted, skipping the invalid ones
+
+        Parameters
+        ----------
+        records: Iterable[Optional[dict[str, Any]]]
+            Records read from the file
+
+        Returns
+        -------
+        values: Iterable[tuple]
+            Values of the tasks or notes
+        """
+        convert = self.task_values if self.annotation == 'task' else self.note_values
+
+        for record in records:
+            if record is not None and record.get('type', self.annotation) != self.annotation:
+                continue  # Categories and annotations of the other type, written by export
+
+            try:
+                if record is None:
+                    raise ValueError('Record that could not be parsed')
+
+                yield convert(record)
+            except (ValueError, TypeError, AttributeError):
+                self.skipped += 1
+
+
+def rewind(text_file: io.TextIOWrapper) -> io.TextIOWrapper:
+    """ Function that moves the file back to its beginning
+
+    Parameters
+    ----------
+    text_file: TextIOWrapper
+        File read
+
+    Returns
+    -------
+    text_file: TextIOWrapper
+        The same file, at its beginning
+    """
+    text_file.seek(0)
+
+    return text_file
+
+
+def parse_status(value: Any) -> int:
+    """ Function that converts the status of a record (its number or its text) into its value
+
+    Parameters
+    ----------
+    value: Any
+        Status of the record. Without status, the task is incomplete
+
+    Returns
+    -------
+    status: int
+        Value of the status
+    """
+    if value is None or value == '':
+        return 0
+
+    text = str(value).strip().lower()
+    status = STATUS_VALUES[text] if text in STATUS_VALUES else int(text)
+
+    if status not in STATUS_VALUES.values():
+        raise ValueError(f'Invalid status: {value}')
+
+    return status
+
+
+def parse_date(value: Any) -> date:
+    """ Function that converts the creation date (or datetime) of a record into a date
+
+    Parameters
+    ----------
+    value: Any
+        Date in ISO format. Without date, it's today
+
+    Returns
+    -------
+    creation: date
+        Creation date
+    """
+    if not value:
+        return datetime.now().date()
+
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+def parse_flag(value: Any) -> int:
+    """ Function that converts a boolean field of a record into 0 or 1
+
+    Parameters
+    ----------
+    value: Any
+        Boolean, number or text of the field
+
+    Returns
+    -------
+    flag: int
+        1 when the value is true, 0 otherwise
+    """
+    return int(str(value).strip().lower() in ('1', 'true', 'yes'))
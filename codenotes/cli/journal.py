@@ -0,0 +1,164 @@
+from argparse import Namespace
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Final, final
+
+import codenotes.db.journal as journal
+from codenotes.cli import PrintFormatted
+from codenotes.util.args import format_argument_text
+from codenotes.util.text import format_task_text
+
+if TYPE_CHECKING:  # The database is only opened to compact the journal
+    from codenotes.db.connection import SQLiteConnection
+
+
+MAX_NAME_LENGTH: Final[int] = 30  # Max length of the names of categories and titles of notes
+
+
+@final
+class CaptureAnnotations:
+    """ Class to capture new tasks and notes in the journal, instead of saving them in the database
+
+    This class only has the purpose to append the annotations typed to the journal (see codenotes.db.journal), which
+    are saved in the database by the next search or compact. It doesn't open the database or import rich, so the
+    output is plain text. The annotations that need the database or the console (a preview, or a name too long to be
+    saved, which is asked again) aren't capturable, and are added as usual
+
+    Attributes
+    ----------
+    records: list[dict[str, Any]]
+        Records of the annotations appended to the journal
+    """
+
+    records: list[dict[str, Any]]
+
+    def __init__(self, args: Namespace) -> None:
+        """ CaptureAnnotations Constructor
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+        """
+        self.records = self.annotation_records(args)
+        appended = journal.append(self.records)
+
+        print(f'✔️ {appended} {args.type}{"s" if appended != 1 else ""} captured in the journal')
+
+    @classmethod
+    def set_args(cls, args: Namespace) -> None:
+        """ Set args and initialize class
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+        """
+        cls(args)
+
+    @staticmethod
+    def capturable(args: Namespace) -> bool:
+        """ Checks if the annotations of the arguments can be captured in the journal
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse of add task or add note
+
+        Returns
+        -------
+        capturable: bool
+            False when there is nothing to save, a preview is asked or a name is too long
+        """
+        title = getattr(args, 'title', None)
+
+        if args.preview or not (args.text or title):
+            return False
+
+        return all(
+            len(format_argument_text(name)) <= MAX_NAME_LENGTH for name in (args.category, title) if name
+        )
+
+    @staticmethod
+    def annotation_records(args: Namespace) -> list[dict[str, Any]]:
+        """ Builds the records of the annotations, as AddTask and AddNote would save them
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse of add task or add note
+
+        Returns
+        -------
+        records: list[dict[str, Any]]
+            Record of each task, or of the note
+        """
+        creation = datetime.now().date().isoformat()
+        category = format_argument_text(args.category) if args.category else None
+
+        if args.type == 'task':
+            tasks = format_task_text(args.text)
+
+            return [
+                {'type': 'task', 'content': task, 'category': category, 'creation': creation}
+                for task in (tasks if isinstance(tasks, list) else [tasks])
+            ]
+
+        content = format_argument_text(args.text) if args.text else None
+        title = format_argument_text(args.title) if args.title else content[:MAX_NAME_LENGTH]
+
+        return [{'type': 'note', 'title': title, 'content': content, 'category': category, 'creation': creation}]
+
+
+@final
+class CompactJournal:
+    """ Class to save the annotations of the journal in the database
+
+    Searches already save them before searching, so this command is only needed to empty the journal without searching
+    """
+
+    def __init__(self, args: Namespace, db: 'SQLiteConnection' = None) -> None:
+        """ CompactJournal Constructor
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is opened, which is closed by the
+            class
+        """
+        from codenotes.db.connection import SQLiteConnection
+
+        own_db = db is None
+        db = db if db is not None else SQLiteConnection()
+
+        try:
+            replayed = journal.replay(db)
+            rejected_path = journal.journal_path(db.database_path) + journal.REJECTED_SUFFIX
+        finally:
+            if own_db:
+                db.close()
+
+        if replayed:
+            PrintFormatted.custom_print(f'[bold green]✔️ {replayed} annotations saved from the journal')
+        else:
+            PrintFormatted.custom_print('[yellow]The journal is empty')
+
+        if journal.pending(rejected_path):
+            PrintFormatted.custom_print(f'[yellow]Some lines of the journal could not be saved, they were moved to '
+                                        f'{rejected_path}')
+
+    @classmethod
+    def set_args(cls, args: Namespace, db: 'SQLiteConnection' = None) -> None:
+        """ Set args and initialize class
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is used
+        """
+        cls(args, db)
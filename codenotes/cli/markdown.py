@@ -0,0 +1,202 @@
+""" Module that renders the Markdown of the readme notes, reusing the lines rendered before
+
+Parsing the Markdown and highlighting its code blocks takes most of the time of displaying long readme notes, although
+they rarely change. The lines rendered (rich segments) are cached by the hash of the content and the settings they
+were rendered with (width, version of rich, color system and code theme): in memory, for the commands run by the daemon or the shell, and in files of the cache directory of the
+user, for the next commands. Both caches are bounded, dropping the least recently used renders. The files are skipped
+when CODENOTES_CACHE=0.
+"""
+import os
+import json
+import hashlib
+from functools import lru_cache
+from collections import OrderedDict
+from importlib.metadata import PackageNotFoundError, version
+from typing import Final, Iterable, Optional, final
+
+from rich.style import Style
+from rich.segment import Segment
+from rich.markdown import Markdown
+from rich.errors import StyleSyntaxError
+from rich.console import Console, ConsoleOptions
+
+import codenotes.db.result_cache as result_cache
+
+MEMORY_ENTRIES: Final[int] = 64  # Renders kept in memory
+MAX_ENTRIES: Final[int] = 512  # Renders kept in files
+MAX_SIZE: Final[int] = 16 * 1024 * 1024  # Bytes of the files of all the renders
+CODE_THEME: Final[str] = 'monokai'  # Pygments theme of the code blocks
+
+Lines = list[list[Segment]]
+
+# Renders of the process, by hash of the Markdown and hash of the render settings
+RENDERS: 'OrderedDict[tuple[str, str], Lines]' = OrderedDict()
+
+
+@final
+class CachedMarkdown:
+    """ Renderable of the Markdown of a note, which is only parsed and highlighted when it isn't in the cache
+
+    Attributes
+    ----------
+    markup: str
+        Markdown of the note
+    """
+
+    markup: str
+
+    def __init__(self, markup: str) -> None:
+        """ CachedMarkdown Constructor
+
+        Parameters
+        ----------
+        markup: str
+            Markdown of the note
+        """
+        self.markup = markup
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> Iterable[Segment]:
+        new_line = Segment.line()
+
+        for line in render_lines(console, options, self.markup):
+            yield from line
+            yield new_line
+
+
+def cache_directory() -> str:
+    """ Returns the directory where the renders are saved
+
+    Returns
+    -------
+    directory: str
+        markdown directory in the cache directory of the user
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(base, 'codenotes', 'markdown')
+
+
+@lru_cache(maxsize=None)
+def rich_version() -> str:
+    """ Returns the version of rich, whose renders may change between versions
+
+    Returns
+    -------
+    version: str
+        Version of the rich package installed, or an empty string when its metadata can't be read
+    """
+    try:
+        return version('rich')
+    except PackageNotFoundError:
+        return ''
+
+
+def render_settings(console: Console, options: ConsoleOptions) -> str:
+    """ Returns the hash of the settings the segments depend on: the width, the version of rich, the colors and
+    characters of the terminal, and the theme of the code blocks
+
+    Parameters
+    ----------
+    console: Console
+        Console where the Markdown is printed
+
+    options: ConsoleOptions
+        Options of the render
+
+    Returns
+    -------
+    digest: str
+        Hexadecimal hash of the settings
+    """
+    ascii_only = not options.encoding.lower().startswith('utf')
+    settings = [options.max_width, rich_version(), console.color_system, options.legacy_windows, ascii_only,
+                CODE_THEME]
+
+    return hashlib.sha256(json.dumps(settings).encode('utf-8')).hexdigest()[:16]
+
+
+def render_lines(console: Console, options: ConsoleOptions, markup: str) -> Lines:
+    """ Returns the lines of the Markdown rendered with the options, from the cache when it's possible
+
+    Parameters
+    ----------
+    console: Console
+        Console where the Markdown is printed
+
+    options: ConsoleOptions
+        Options of the render
+
+    markup: str
+        Markdown
+
+    Returns
+    -------
+    lines: Lines
+        Segments of each line
+    """
+    key = (hashlib.sha256(markup.encode('utf-8')).hexdigest(), render_settings(console, options))
+
+    if key in RENDERS:
+        RENDERS.move_to_end(key)  # Most recently used
+        return RENDERS[key]
+
+    path = os.path.join(cache_directory(), f'{key[0]}-{key[1]}{result_cache.ENTRY_SUFFIX}')
+    lines = load(path) if result_cache.cache_enabled() else None
+
+    if lines is None:
+        lines = console.render_lines(Markdown(markup, code_theme=CODE_THEME), options, pad=False)
+
+        if result_cache.cache_enabled():
+            try:
+                result_cache.save(os.path.dirname(path), path, dump(lines), MAX_ENTRIES, MAX_SIZE)
+            except OSError:
+                pass
+
+    RENDERS[key] = lines
+    if len(RENDERS) > MEMORY_ENTRIES:
+        RENDERS.popitem(last=False)
+
+    return lines
+
+
+def dump(lines: Lines) -> list[list[tuple[str, Optional[str]]]]:
+    """ Converts the segments into JSON values, with the definition of their styles
+
+    Parameters
+    ----------
+    lines: Lines
+        Segments of each line
+
+    Returns
+    -------
+    lines: list[list[tuple[str, Optional[str]]]]
+        Text and style of each segment
+    """
+    return [[(segment.text, str(segment.style) if segment.style else None) for segment in line] for line in lines]
+
+
+def load(path: str) -> Optional[Lines]:
+    """ Reads the segments of a render saved in a file
+
+    Parameters
+    ----------
+    path: str
+        Path of the file
+
+    Returns
+    -------
+    lines: Optional[Lines]
+        Segments of each line, or None when the file doesn't exist or can't be read
+    """
+    try:
+        with open(path, encoding='utf-8') as entry:
+            lines = [
+                [Segment(text, Style.parse(style) if style else None) for text, style in line]
+                for line in json.load(entry)
+            ]
+
+        os.utime(path)  # Most recently used
+    except (OSError, ValueError, TypeError, StyleSyntaxError):
+        return None
+
+    return lines
@@ -1,36 +1,31 @@
 from argparse import Namespace
+from itertools import islice
 from datetime import datetime, date
-from typing import Final, final, Union, Any, Text
-from rich.theme import Theme
-
-from rich.tree import Tree
-from rich.panel import Panel
-from rich.markdown import Markdown
-from rich.console import Console
+from typing import TYPE_CHECKING, Final, final, Union, Text
 
 import codenotes.util.help as help_text
 import codenotes.db.utilities.notes as notes
 import codenotes.db.utilities.notes_categories as categories
-from codenotes.cli import PrintFormatted
+import codenotes.db.journal as journal
+import codenotes.db.category_ids as category_ids
+import codenotes.db.result_cache as result_cache
+from codenotes.cli import PrintFormatted, highlight_snippet, new_console
 from codenotes.db.connection import SQLiteConnection
-from codenotes.util.sql import add_conditions_sql
+from codenotes.db.migrations import trigram_search
+from codenotes.util.sql import Query, date_range, date_range_condition, fts_query, like_condition, like_pattern, \
+    snippet_sql, strip_snippet, substring_query, trigram_query
+from codenotes.util.text import trigrams, trigram_similarity, MIN_TRIGRAM_SIMILARITY
 from codenotes.util.args import date_args_empty, dates_to_search, format_argument_text, add_note_args_empty
+from codenotes.util.formats import iter_cursor, write_rows
 
+if TYPE_CHECKING:  # rich is imported only when the notes are displayed, not when they are written in a format
+    from rich.console import Console
 
-def sorter(query: tuple) -> Any:
-    """ Function used to get the key that will be used in the built-in function sorted()
-
-    Parameters
-    ----------
-    query: tuple
-        Row from the query done to the database, which contains the variables that will be used to sort the query
 
-    Returns
-    -------
-    key: Any
-        Returns the key that will be used
-    """
-    return query[2]
+PAGE_SIZE: Final[int] = 20  # Default number of notes displayed per page
+RANK_LIMIT: Final[int] = 10  # Default number of notes displayed when results are ranked by relevance
+FUZZY_CANDIDATES: Final[int] = 200  # Number of notes, with trigrams in common, compared in a fuzzy search
+EXCERPT_TOKENS: Final[int] = 16  # Max number of tokens of the excerpts of the ranked notes (about 80 characters)
 
 
 @final
@@ -57,7 +52,7 @@ class AddNote:
     creation_date: date
         Date of the creation of the note (Today date)
 
-    console: Console
+    console: 'Console'
         (Rich) Console for beatiful printting
     """
 
@@ -66,18 +61,23 @@ class AddNote:
     note_title: str = None
     note_text: str = None
     creation_date: date # Today's date
-    console: Console
+    console: 'Console'
 
-    def __init__(self, args: Namespace) -> None:
+    def __init__(self, args: Namespace, db: SQLiteConnection = None) -> None:
         """ Constructor of AddTask class 
         
         Parameters
         ----------
         args : NameSpace
             Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is opened, which is closed by the
+            class
         """
-        self.console = Console()
-        self.db = SQLiteConnection()
+        self.console = new_console()
+        self.own_db = db is None
+        self.db = db if db is not None else SQLiteConnection()
         self.creation_date = datetime.now().date()
 
         if not add_note_args_empty(args):
@@ -102,15 +102,18 @@ class AddNote:
 
 
     @classmethod
-    def set_args(cls, args: Namespace) -> None:
+    def set_args(cls, args: Namespace, db: SQLiteConnection = None) -> None:
         """ Set args and initialize class
         
         Parameters
         ----------
         args : NameSpace
             Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is used
         """
-        cls(args)
+        cls(args, db)
 
     def category_exists(self) -> bool:
         """ Checks if the typed category exists
@@ -120,12 +123,10 @@ class AddNote:
         exists: bool
             Boolean value flag if the category already exists
         """
-        sql = f"SELECT {categories.COLUMN_ID} FROM {categories.TABLE_NAME} WHERE {categories.COLUMN_NAME} = '{self.category_name}'"
-        query = self.db.exec_sql(sql)
-        categories_list: list[tuple] = query.fetchall()
+        category_id = category_ids.find(self.db, categories, self.category_name)
 
-        if categories_list: # categories_list == []
-            self.category_id = categories_list[0][0]
+        if category_id is not None:
+            self.category_id = category_id
             return True
         return False
 
@@ -138,14 +139,14 @@ class AddNote:
         if len(self.category_name) <= 30: # Category name can't be longer than 30 characters
 
             if not self.category_exists():
-                sql = f'INSERT INTO {categories.TABLE_NAME} ({categories.COLUMN_NAME}) VALUES (?)'
-                cursor = self.db.exec_sql(sql, (self.category_name,))
+                self.category_id = self.db.write(
+                    lambda: category_ids.resolve(self.db, categories, self.category_name)
+                )
 
-                self.category_id = cursor.lastrowid
-
-                self.db.commit()
                 PrintFormatted.print_category_creation(self.category_name)
             else:
+                from rich.theme import Theme
+
                 custom_theme = Theme({
                     'msg': '#31f55f bold',
                     'name': '#616161 italic'
@@ -162,15 +163,15 @@ class AddNote:
 
         with self.console.status('[bold yellow]Saving Note') as status:
             values = (self.note_title, self.note_text, self.category_id, self.creation_date)
-            self.db.exec_sql(sql, values)
+            self.db.write(lambda: self.db.exec_sql(sql, values))
 
             PrintFormatted.print_content_storage(self.note_title, self.category_name)
 
             self.console.print('[bold green]✔️ Note Correctly Saved')
             status.stop()
 
-        self.db.commit()
-        self.db.close()
+        if self.own_db:
+            self.db.close()
 
     def _set_note_content(self, args) -> None:
         """ Set the content (title and text) of the note according to the arguments """
@@ -212,6 +213,7 @@ class AddNote:
 
     def _show_preview(self) -> None:
         """ Method that displays a panel with the title and text of the note """
+        from rich.panel import Panel
 
         self.console.rule('Preview', style='purple')
         self.console.print(
@@ -234,7 +236,7 @@ class SearchNote:
 
     Attributes
     ----------
-    console: Console
+    console: 'Console'
         (Rich) Console for beautiful printting
 
     db: SQLiteConnection
@@ -244,84 +246,423 @@ class SearchNote:
         Date or list of dates to search the notes
 
     search_text: str
-        Text to search in the title of the notes
+        Text to search in the title and content of the notes
+
+    rank: bool
+        Flag to order the notes found by relevance, displaying only the best RANK_LIMIT
+
+    fuzzy: bool
+        Flag to search notes whose title contains the text or a similar one, ordered by similarity
+
+    limit: int
+        Max number of notes displayed per page, or of best matches. None to use the default one
+
+    after: int
+        Id of the last note of the previous page. The page displayed starts after it
+
+    page: int
+        Number of the page displayed, used when after isn't specified
+
+    output_format: str
+        Machine-readable format (ndjson, tsv or csv) in which the notes are written, instead of displaying them
+
+    all_dbs: bool
+        Flag to search the notes in all the known databases (see codenotes.db.location), merged by creation date
     """
 
-    console: Console
+    console: 'Console'
     db: SQLiteConnection
     search_date: Union[list[date], date]
     search_text: str
-
-    def __init__(self, args: Namespace) -> None:
+    rank: bool
+    fuzzy: bool
+    limit: int
+    after: int
+    page: int
+    output_format: str
+    all_dbs: bool
+
+    def __init__(self, args: Namespace, db: SQLiteConnection = None) -> None:
         """ SearchNote constructor
 
         Parameters
         ----------
         args: Namespace
             Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new read-only connection is opened, which is closed
+            by the class
         """
-        self.console = Console()
-        self.db  = SQLiteConnection()
+        self.own_db = db is None
+        self.db = db if db is not None else SQLiteConnection(read_only=True)
         self.search_date = dates_to_search(args)
         self.search_text = format_argument_text(args.text)
-
-        if not date_args_empty(args):
-            self.search_note()
-        else:
-            PrintFormatted.print_help(help_text.SEARCH_USAGE_TEXT)
+        self.rank = args.rank
+        self.fuzzy = args.fuzzy
+        self.limit = args.limit
+        self.after = args.after
+        self.page = args.page
+        self.output_format = args.format
+        self.all_dbs = args.all_dbs
+
+        try:
+            journal.replay(self.db)  # The annotations captured in the journal are searched too
+
+            if (self.rank or self.fuzzy) and not self.search_text:
+                PrintFormatted.custom_print('[red]Text to search is required to rank the notes[/red]')
+                PrintFormatted.print_help(help_text.SEARCH_USAGE_TEXT)
+            elif date_args_empty(args):
+                PrintFormatted.print_help(help_text.SEARCH_USAGE_TEXT)
+            elif self.all_dbs and (self.rank or self.fuzzy or self.after or self.page):
+                PrintFormatted.custom_print('[red]--all-dbs lists the notes by date, it can\'t be used with --rank, '
+                                           '--fuzzy, --after or --page[/red]')
+            elif self.all_dbs:
+                self.search_databases()
+            elif self.output_format:
+                self.write_notes()
+            else:
+                self.console = new_console()
+
+                if self.rank:
+                    self.print_ranked_notes(self.ranked_query())
+                elif self.fuzzy:
+                    self.print_ranked_notes(self.fuzzy_query())
+                else:
+                    self.search_note()
+        finally:
+            if self.own_db:  # After the search was rendered
+                self.db.close()
 
     @classmethod
-    def set_args(cls, args: Namespace) -> None:
+    def set_args(cls, args: Namespace, db: SQLiteConnection = None) -> None:
         """ Class method that initializes the class and automatically will do the search
 
         Parameters
         ----------
         args: Namespace
             Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is used
         """
-        cls(args)
+        cls(args, db)
 
     def sql_query(self) -> list[tuple]:
         """ Function that makes a query of related information of notes, and also adds more statements to the main sql
         
+        Returns
+        -------
+        query: list[tuple]
+            Query done to the database, with the notes of the page searched
+        """
+        return self.page_query()[0]
+
+    def page_query(self) -> tuple[list[tuple], int]:
+        """ Function that makes a query of the notes of the page searched
+
+        Notes are ordered by category, creation date and id, which is the order of the index over the category, so a
+        page is read from the index without sorting all the notes found. The page starts after the note with the id
+        in after (keyset pagination), or after skipping the previous pages when page is specified. The page is saved in
+        the cache of the search results until the notes change (see codenotes.db.result_cache)
+
+        Returns
+        -------
+        page: tuple[list[tuple], int]
+            Notes of the page, and the id of its last note when there are more pages (None if it's the last one)
+        """
+        page_size = self.limit or PAGE_SIZE
+        query = self.__list_query()
+
+        # One more note is selected to know if there is a next page
+        query.limit(page_size + 1)
+
+        if self.page and not self.after:
+            query.offset((self.page - 1) * page_size)
+
+        sql, values = query.build()
+        notes_page = result_cache.fetch(self.db, (sql, values), lambda: self.db.exec_sql(sql, values).fetchall())
+        next_after = notes_page[page_size - 1][-1] if len(notes_page) > page_size else None
+
+        return [note[:-1] for note in notes_page[:page_size]], next_after
+
+    def write_notes(self) -> None:
+        """ Function that writes the notes searched to stdout in the format specified, as they are read from the
+        database. Without a limit, all the notes found are written
+        """
+        if self.rank or self.fuzzy:
+            query = self.ranked_query() if self.rank else self.fuzzy_query()
+            rows = ((note[0], strip_snippet(note[1]), note[2], note[3]) for note in query)
+            columns = ('title', 'excerpt' if self.rank else 'content', 'category', 'creation')
+
+            write_rows(rows, columns, self.output_format)
+        else:
+            query = self.__list_query()
+
+            if self.limit:
+                query.limit(self.limit)
+
+                if self.page and not self.after:
+                    query.offset((self.page - 1) * self.limit)
+
+            rows = (
+                (note[5], note[0], note[1], note[2], bool(note[3]), note[4])
+                for note in iter_cursor(self.db.exec_sql(*query.build()))
+            )
+
+            write_rows(rows, ('id', 'title', 'content', 'category', 'readme', 'creation'), self.output_format)
+
+    def search_databases(self) -> None:
+        """ Function that searches the notes in all the known databases at the same time, and writes or displays them
+        merged by creation date, with the database each one comes from
+        """
+        from codenotes.db.location import registered_databases
+        from codenotes.db.federated import database_label, query_databases
+
+        query = self.__list_query(by_date=True, trigram=False)  # The other databases may not have the trigram index
+
+        if self.limit:
+            query.limit(self.limit)
+
+        sql, values = query.build()
+        rows, failed = query_databases([self.db.database_path, *registered_databases()], sql, values,
+                                       key=lambda note: note[4])
+
+        if self.limit:
+            rows = islice(rows, self.limit)
+
+        if self.output_format:
+            rows = ((note[0], note[6], note[1], note[2], note[3], bool(note[4]), note[5]) for note in rows)
+            columns = ('database', 'id', 'title', 'content', 'category', 'readme', 'creation')
+
+            write_rows(rows, columns, self.output_format)
+        else:
+            from rich.tree import Tree
+            from rich.panel import Panel
+
+            self.console = new_console()
+            root = Tree('📒[bold #964B00] List of Notes Found')
+
+            for note in rows:
+                if note[4]:
+                    from codenotes.cli.markdown import CachedMarkdown
+
+                    content = CachedMarkdown(note[2] if note[2] else '# Note Empty')
+                else:
+                    content = note[2] if note[2] else '[red bold]Empty note[/red bold]'
+
+                root.add(Panel(content, title=f'{note[1]} {note[5]} [#d898ed]{database_label(note[0])} · {note[3]}'))
+
+            if not root.children:
+                root.add('[red]❌ No Note Found')
+
+            self.console.print(root)
+
+        for path in failed:
+            PrintFormatted.custom_print(f'[yellow]The database {path} could not be searched[/yellow]')
+
+    def __list_query(self, by_date: bool = False, trigram: bool = True) -> Query:
+        """ Function that makes the query of all the notes that match the search, ordered by category, creation date
+        and id. Each row ends with the id of the note
+
+        Parameters
+        ----------
+        by_date: bool
+            Flag to order the notes only by creation date and id
+
+        trigram: bool
+            Flag to search the text in the trigram index, when the database has it
+
+        Returns
+        -------
+        query: Query
+            Query of the notes, without limit
+        """
+        query = self.__filtered_query(
+            notes.TABLE_NAME,
+            (
+                f'{notes.TABLE_NAME}.{notes.COLUMN_TITLE}', f'{notes.TABLE_NAME}.{notes.COLUMN_CONTENT}',
+                f'{categories.TABLE_NAME}.{categories.COLUMN_NAME}', f'{notes.TABLE_NAME}.{notes.COLUMN_README}',
+                f'{notes.TABLE_NAME}.{notes.COLUMN_CREATION}', f'{notes.TABLE_NAME}.{notes.COLUMN_ID}'
+            )
+        )
+
+        if self.search_text:
+            # Rows that contain the text (in the trigram index, or with LIKE when it's shorter than a trigram or there
+            # isn't an index), or its words (in the full-text index)
+            substring = substring_query(self.search_text)
+            match = fts_query(self.search_text)
+
+            if substring and trigram and trigram_search(self.db.connection):
+                conditions = [f'{notes.TABLE_NAME}.{notes.COLUMN_ID} IN (SELECT rowid FROM {notes.TRIGRAM_TABLE_NAME} '
+                              f'WHERE {notes.TRIGRAM_TABLE_NAME} MATCH ?)']
+                values = [substring]
+            else:
+                conditions = [like_condition(f'{notes.TABLE_NAME}.{notes.COLUMN_TITLE}')]
+                values = [like_pattern(self.search_text)]
+
+            if match:
+                conditions.append(f'{notes.TABLE_NAME}.{notes.COLUMN_ID} IN (SELECT rowid FROM {notes.FTS_TABLE_NAME} '
+                                  f'WHERE {notes.FTS_TABLE_NAME} MATCH ?)')
+                values.append(match)
+
+            query.where(' OR '.join(conditions), *values)
+
+        order = (
+            f'{notes.TABLE_NAME}.{notes.COLUMN_CATEGORY}', f'{notes.TABLE_NAME}.{notes.COLUMN_CREATION}',
+            f'{notes.TABLE_NAME}.{notes.COLUMN_ID}'
+        )[1 if by_date else 0:]
+
+        if self.after:
+            query.where(f'({", ".join(order)}) > (SELECT {", ".join(order)} FROM {notes.TABLE_NAME} WHERE '
+                        f'{notes.TABLE_NAME}.{notes.COLUMN_ID} = ?)', self.after)
+
+        return query.order_by(*order)
+
+    def ranked_query(self) -> list[tuple]:
+        """ Function that makes a query of the notes that match the text searched, ordered by relevance (bm25). A
+        match in the title weighs more than a match in the content
+
+        Returns
+        -------
+        query: list[tuple]
+            Query done to the database, with an excerpt of the note instead of the complete content
+        """
+        match = fts_query(self.search_text)
+
+        if not match:
+            return []
+
+        query = self.__filtered_query(
+            notes.FTS_TABLE_NAME,
+            (
+                f'{notes.TABLE_NAME}.{notes.COLUMN_TITLE}', snippet_sql(notes.FTS_TABLE_NAME, 1, EXCERPT_TOKENS),
+                f'{categories.TABLE_NAME}.{categories.COLUMN_NAME}', f'{notes.TABLE_NAME}.{notes.COLUMN_CREATION}'
+            )
+        )
+        query.where(f'{notes.FTS_TABLE_NAME} MATCH ?', match)
+        query.order_by(f'bm25({notes.FTS_TABLE_NAME}, 10.0, 1.0)').limit(self.limit or RANK_LIMIT)
+        sql, values = query.build()
+
+        return result_cache.fetch(self.db, (sql, values), lambda: self.db.exec_sql(sql, values).fetchall())
+
+    def fuzzy_query(self) -> list[tuple]:
+        """ Function that makes a query of the notes whose title contains the text searched, or a text similar to it,
+        ordered by the fraction of trigrams they share with the text searched
+
         Returns
         -------
         query: list[tuple]
             Query done to the database
         """
-        sql = f"SELECT {notes.TABLE_NAME}.{notes.COLUMN_TITLE}, {notes.TABLE_NAME}.{notes.COLUMN_CONTENT}, " \
-            f"{categories.TABLE_NAME}.{categories.COLUMN_NAME}, " \
-            f"{notes.TABLE_NAME}.{notes.COLUMN_README}, {notes.TABLE_NAME}.{notes.COLUMN_CREATION} FROM " \
-            f"{notes.TABLE_NAME} INNER JOIN {categories.TABLE_NAME} ON " \
-            f"{notes.TABLE_NAME}.{notes.COLUMN_CATEGORY} = {categories.TABLE_NAME}.{categories.COLUMN_ID}"
+        match = trigram_query(self.search_text)
+        columns = (
+            f'{notes.TABLE_NAME}.{notes.COLUMN_TITLE}', f'{notes.TABLE_NAME}.{notes.COLUMN_CONTENT}',
+            f'{categories.TABLE_NAME}.{categories.COLUMN_NAME}', f'{notes.TABLE_NAME}.{notes.COLUMN_CREATION}'
+        )
+
+        # A database migrated by an older SQLite may not have the trigram tables
+        if match and trigram_search(self.db.connection):
+            query = self.__filtered_query(notes.TRIGRAM_TABLE_NAME, columns)
+            query.where(f'{notes.TRIGRAM_TABLE_NAME} MATCH ?', match)
+            query.order_by(f'bm25({notes.TRIGRAM_TABLE_NAME})')
+        else:  # Text shorter than a trigram (or no trigram tables), which can only be searched as a substring
+            query = self.__filtered_query(notes.TABLE_NAME, columns)
+            query.where(like_condition(f'{notes.TABLE_NAME}.{notes.COLUMN_TITLE}'), like_pattern(self.search_text))
+            query.order_by(f'{notes.TABLE_NAME}.{notes.COLUMN_ID}')
+
+        query.limit(FUZZY_CANDIDATES)
+        sql, values = query.build()
+
+        def similar_notes() -> list[tuple]:
+            search_trigrams = trigrams(self.search_text)
+            scored_notes = [
+                (trigram_similarity(search_trigrams, note[0]), note)
+                for note in self.db.exec_sql(sql, values).fetchall()
+            ]
+            scored_notes.sort(key=lambda scored_note: scored_note[0], reverse=True)
+
+            return [
+                note for similarity, note in scored_notes[:self.limit or RANK_LIMIT]
+                if similarity >= MIN_TRIGRAM_SIMILARITY
+            ]
+
+        # The candidates are scored by the text searched, which isn't in the query when it's shorter than a trigram
+        return result_cache.fetch(self.db, (sql, values, self.search_text, self.limit), similar_notes)
+
+    def __filtered_query(self, table: str, columns: tuple[str, ...]) -> Query:
+        """ Function that starts the query of notes, joined with their categories and filtered by the date searched
+
+        Parameters
+        ----------
+        table: str
+            Table of the FROM clause. It's the notes table or one of its full-text tables (joined with notes by rowid)
+
+        columns: tuple[str, ...]
+            Columns selected
+
+        Returns
+        -------
+        query: Query
+            Query of the notes
+        """
+        query = Query(table, columns)
+
+        if table != notes.TABLE_NAME:
+            query.join(notes.TABLE_NAME, f'{notes.TABLE_NAME}.{notes.COLUMN_ID} = {table}.rowid')
+
+        query.join(categories.TABLE_NAME,
+                   f'{notes.TABLE_NAME}.{notes.COLUMN_CATEGORY} = {categories.TABLE_NAME}.{categories.COLUMN_ID}')
 
         if self.search_date:
-            if isinstance(self.search_date, date):
-                sql = add_conditions_sql(sql, f'{notes.COLUMN_CREATION} LIKE date("{self.search_date}")')
+            query.where(date_range_condition(f'{notes.TABLE_NAME}.{notes.COLUMN_CREATION}'),
+                        *date_range(self.search_date))
 
-            elif isinstance(self.search_date, list):
-                first_day, last_day = self.search_date
-                sql = add_conditions_sql(sql, f'{notes.COLUMN_CREATION} BETWEEN date("{first_day}") '
-                                              f'AND date("{last_day}")')
-        if self.search_text:
-            sql = add_conditions_sql(sql, f'{notes.COLUMN_TITLE} LIKE "%{self.search_text}%"', 'AND')
+        return query
 
-        query = self.db.exec_sql(sql)
+    def print_ranked_notes(self, query: list[tuple]) -> None:
+        """ Function that displays a table with excerpts of the notes that best match the text searched, in the order
+        of query
+
+        Parameters
+        ----------
+        query: list[tuple]
+            Notes found, ordered by relevance
+        """
+        from rich import box
+        from rich.table import Table
 
-        return query.fetchall()
+        if query:
+            table = Table(title=f'📒[bold #964B00] Top {len(query)} Notes Found', box=box.SIMPLE)
+            table.add_column('#', justify='right', style='dim')
+            table.add_column('Title')
+            table.add_column('Excerpt', overflow='fold')
+            table.add_column('Category')
+            table.add_column('Creation Date', justify='center', style='yellow')
+
+            for position, actual_note in enumerate(query, start=1):
+                excerpt = highlight_snippet(actual_note[1]) if actual_note[1] \
+                    else '[red bold]Empty note[/red bold]'
+                table.add_row(str(position), actual_note[0], excerpt, actual_note[2], actual_note[3])
+
+            self.console.print(table)
+        else:
+            self.console.print('[red]❌ No Note Found')
 
     def search_note(self) -> None:
         """ Function that displays a tree with Panels as child nodes with the notes searched """
+        from rich.tree import Tree
+        from rich.panel import Panel
+
         root = Tree('📒[bold #964B00] List of Notes Found')
-        query = self.sql_query()
+        query, next_after = self.page_query()
 
         if query:
-            notes_sorted = sorted(query, key=sorter)
-            actual_note = notes_sorted[0]
+            actual_note = query[0]
             actual_category = actual_note[2]
 
             child_node = root.add(f':file_folder:[#d898ed]{actual_category}')
-            for actual_note in notes_sorted:
+            for actual_note in query:
                 if actual_note[2] != actual_category:
 
                     actual_category = actual_note[2]
@@ -335,13 +676,17 @@ class SearchNote:
                                 )
                         )
                 else:  # actual_note[3] == 1
-                    markdown = Markdown( actual_note[1] if actual_note[1] else '# Note Empty')
+                    # Loads commonmark and Pygments, only needed for readme notes that aren't in the cache
+                    from codenotes.cli.markdown import CachedMarkdown
+
+                    markdown = CachedMarkdown(actual_note[1] if actual_note[1] else '# Note Empty')
                     child_node.add(
                             Panel(markdown, title=f'{actual_note[0]} {actual_note[4]}')
                         )
-            
+
+            if next_after:
+                root.add(f'[yellow]More notes found. Next page: --after {next_after}')
+
         else:
             root.add('[red]❌ No Note Found')
         self.console.print(root)
-        
-        # self.db.close() # FIXME: DATABASE DONT CLOSE CORRECTLY
@@ -0,0 +1,49 @@
+import os
+from argparse import Namespace
+from typing import final
+
+import codenotes.db.location as location
+from codenotes.cli import PrintFormatted
+from codenotes.db.connection import SQLiteConnection
+
+
+@final
+class InitProject:
+    """ Class to create the database of a project
+
+    This class only has the purpose to create the database in the .codenotes directory of the working directory (or
+    the directory passed). The commands run in that directory, or in any of its subdirectories, use that database
+    instead of the global one. The database is saved in the registry, so search --all-dbs finds it
+    """
+
+    def __init__(self, args: Namespace) -> None:
+        """ InitProject Constructor
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+        """
+        directory = os.path.abspath(args.directory or os.getcwd())
+        path = os.path.join(directory, location.PROJECT_DIRECTORY, location.PROJECT_DATABASE)
+
+        if not os.path.isdir(directory):
+            PrintFormatted.custom_print(f'[red]Directory not found: {directory}[/red]')
+        elif os.path.isfile(path):
+            PrintFormatted.custom_print(f'[yellow]The project already has a database:[/yellow] {path}')
+        else:
+            SQLiteConnection(path=path).close()  # Creates the database and applies the migrations
+            location.register(path)
+
+            PrintFormatted.custom_print(f'[bold green]✔️ Project database created:[/bold green] {path}')
+
+    @classmethod
+    def set_args(cls, args: Namespace) -> None:
+        """ Set args and initialize class
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+        """
+        cls(args)
@@ -0,0 +1,242 @@
+import os
+import re
+import shlex
+from argparse import Namespace
+from typing import TYPE_CHECKING, Final, Iterable, final
+
+import codenotes.util.help as help_text
+import codenotes.db.utilities.notes_categories as notes_categories
+import codenotes.db.utilities.tasks_categories as tasks_categories
+from codenotes.cli import PrintFormatted, new_console
+from codenotes.db.connection import SQLiteConnection
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+PROMPT: Final[str] = 'codenotes> '
+HISTORY_FILE: Final[str] = os.path.join(os.path.expanduser('~'), '.codenotes_history')
+HISTORY_LENGTH: Final[int] = 1000
+
+SHELL_COMMANDS: Final[tuple[str, ...]] = ('add', 'search', 'import', 'export', 'compact', 'help', 'exit')
+ANNOTATIONS: Final[tuple[str, ...]] = ('note', 'task')
+CATEGORY_FLAGS: Final[tuple[str, ...]] = ('--category', '-c')
+CATEGORY_TEXT: Final[re.Pattern] = re.compile(r'(?:^|\s)(?:--category|-c)\s+')  # Flag before the category name
+EXCLUDED_COMMANDS: Final[tuple[str, ...]] = ('shell', 'batch', 'daemon', 'tui')  # Commands that can't run inside the shell
+
+
+@final
+class Shell:
+    """ Class of the interactive shell, which runs the commands of the CLI one after another
+
+    The commands use the same grammar as the CLI (parse_args), but all of them run in this process with the same
+    connection with the database and the same console, so they don't pay the start-up of the interpreter, the imports
+    and the connection. The history is kept between sessions and the names of the categories are completed with tab
+    (when readline is available)
+
+    Attributes
+    ----------
+    console: Console
+        (Rich) Console shared by all the commands
+
+    db: SQLiteConnection
+        Connection with the database shared by all the commands
+
+    categories: dict[str, list[str]]
+        Names of the categories of notes and tasks, used by the completion
+    """
+
+    console: 'Console'
+    db: SQLiteConnection
+    categories: dict[str, list[str]]
+
+    def __init__(self, args: Namespace, db: SQLiteConnection = None) -> None:
+        """ Shell Constructor
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is opened, which is closed by the
+            class
+        """
+        self.own_db = db is None
+        self.db = db if db is not None else SQLiteConnection()
+        self.console = new_console()
+        self.load_categories()
+
+    @classmethod
+    def set_args(cls, args: Namespace, db: SQLiteConnection = None) -> None:
+        """ Set args, initialize class and run the shell until the user exits
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is used
+        """
+        cls(args, db).run()
+
+    def run(self) -> None:
+        """ Reads and runs commands until exit, or Ctrl+D, is typed """
+        readline = self.__setup_readline()
+        PrintFormatted.share_console(self.console)
+
+        self.console.print('[bold #d898ed]codenotes shell[/bold #d898ed] [dim]Type help to see the commands, exit to '
+                           'quit')
+        try:
+            while True:
+                try:
+                    line = input(PROMPT)
+                except KeyboardInterrupt:
+                    self.console.print()
+                    continue
+                except EOFError:
+                    self.console.print()
+                    break
+
+                if not self.run_line(line):
+                    break
+        finally:
+            PrintFormatted.share_console(None)
+
+            if readline is not None:
+                try:
+                    readline.write_history_file(HISTORY_FILE)
+                except OSError:
+                    pass
+
+            if self.own_db:
+                self.db.close()
+
+    def run_line(self, line: str) -> bool:
+        """ Runs the command of the line
+
+        Parameters
+        ----------
+        line: str
+            Line typed, with the arguments of a command of the CLI (optionally starting with codenotes)
+
+        Returns
+        -------
+        continue: bool
+            False when the user exits the shell
+        """
+        from codenotes import parse_args, dispatch
+
+        try:
+            argv = shlex.split(line)
+        except ValueError as error:
+            PrintFormatted.custom_print(f'[red]{error}')
+            return True
+
+        if argv[:1] == ['codenotes']:
+            argv = argv[1:]
+
+        if not argv:
+            return True
+        elif argv[0] in ('exit', 'quit'):
+            return False
+        elif argv[0] == 'help':
+            PrintFormatted.print_help(help_text.SHELL_USAGE_TEXT)
+        elif argv[0] in EXCLUDED_COMMANDS:
+            PrintFormatted.custom_print(f'[red]{argv[0]} can\'t be used inside the shell')
+        else:
+            try:
+                dispatch(parse_args(argv), self.db)
+            except SystemExit:  # --help and --version of argparse
+                pass
+            except KeyboardInterrupt:
+                self.db.rollback()
+                self.console.print('[bold yellow]\nCorrectly Cancelled[/bold yellow]')
+            except Exception as error:  # The shell keeps running after a failed command
+                self.db.rollback()
+                PrintFormatted.custom_print(f'[red]❌ {error!r}')
+
+            if argv[0] in ('add', 'import'):  # They can create categories
+                self.load_categories()
+
+        return True
+
+    def load_categories(self) -> None:
+        """ Loads the names of the categories of notes and tasks """
+        self.categories = {
+            annotation: [
+                name for name, in self.db.exec_sql(f'SELECT {categories.COLUMN_NAME} FROM {categories.TABLE_NAME} '
+                                                   f'ORDER BY {categories.COLUMN_NAME}').fetchall()
+            ]
+            for annotation, categories in (('note', notes_categories), ('task', tasks_categories))
+        }
+
+    def completions(self, line: str, text: str) -> list[str]:
+        """ Returns the completions of the word being typed
+
+        Parameters
+        ----------
+        line: str
+            Line typed until the cursor
+
+        text: str
+            Word being typed (the end of line)
+
+        Returns
+        -------
+        completions: list[str]
+            Commands, annotations or, after --category, names of categories that complete the word
+        """
+        words = line.split()
+        previous = words[:-1] if text else words
+
+        if not previous:
+            candidates: Iterable[str] = SHELL_COMMANDS
+        elif len(previous) == 1 and previous[0] in ('add', 'search', 'import'):
+            candidates = ANNOTATIONS
+        elif any(flag in previous for flag in CATEGORY_FLAGS):
+            # The name can have several words, so all the text typed after the flag is completed
+            typed = line[list(CATEGORY_TEXT.finditer(line))[-1].end():]
+            annotation = previous[1] if len(previous) > 1 and previous[1] in ANNOTATIONS else 'task'
+
+            return [
+                name[len(typed) - len(text):] for name in self.categories[annotation] if name.startswith(typed)
+            ]
+        else:
+            return []
+
+        return [candidate for candidate in candidates if candidate.startswith(text)]
+
+    def __setup_readline(self):
+        """ Loads the history and sets the completion of readline, when it's available
+
+        Returns
+        -------
+        readline: module
+            readline module, or None when it isn't available
+        """
+        try:
+            import readline
+        except ImportError:  # Windows without pyreadline
+            return None
+
+        try:
+            readline.read_history_file(HISTORY_FILE)
+        except OSError:
+            pass
+
+        readline.set_history_length(HISTORY_LENGTH)
+        readline.set_completer_delims(' \t\n')
+        readline.set_completer(self.__complete)
+        readline.parse_and_bind('tab: complete')
+
+        return readline
+
+    def __complete(self, text: str, state: int):
+        """ Completer of readline, which returns the completion number state """
+        import readline
+
+        completions = self.completions(readline.get_line_buffer()[:readline.get_endidx()], text)
+
+        return completions[state] if state < len(completions) else None
@@ -1,37 +1,30 @@
 from argparse import Namespace
-from typing import Any, Text, Union, final, Final
+from itertools import islice
+from typing import TYPE_CHECKING, Text, Union, final, Final
 from datetime import datetime, date
 
-from rich import box
-from rich.theme import Theme
-from rich.tree import Tree
-from rich.table import Table
-from rich.console import Console
-
 import codenotes.util.help as help_text
 import codenotes.db.utilities.tasks as tasks
 import codenotes.db.utilities.tasks_categories as categories
-from codenotes.cli import PrintFormatted
-from codenotes.util.sql import add_conditions_sql
+import codenotes.db.journal as journal
+import codenotes.db.category_ids as category_ids
+import codenotes.db.result_cache as result_cache
+from codenotes.cli import PrintFormatted, highlight_snippet, new_console
+from codenotes.util.sql import Query, date_range, date_range_condition, fts_query, like_condition, like_pattern, \
+    snippet_sql, strip_snippet, substring_query, trigram_query
+from codenotes.util.formats import iter_cursor, write_rows
 from codenotes.db.connection import SQLiteConnection
+from codenotes.db.migrations import trigram_search
 from codenotes.util.args import format_argument_text, date_args_empty, dates_to_search, add_task_args_empty
-from codenotes.util.text import format_task_text, status_text
-
+from codenotes.util.text import format_task_text, status_text, trigrams, trigram_similarity, MIN_TRIGRAM_SIMILARITY
 
-def sorter(query: tuple) -> Any:
-    """ Function used to get the key that will be used in the built-in function sorted()
+if TYPE_CHECKING:  # rich is imported only when the tasks are displayed, not when they are written in a format
+    from rich.console import Console
 
-    Parameters
-    ----------
-    query: tuple
-        Row from the query done to the database, which contains the variables that will be used to sort the query
 
-    Returns
-    -------
-    key: Any
-        Returns the key that will be used
-    """
-    return query[3]
+PAGE_SIZE: Final[int] = 50  # Default number of tasks displayed per page
+RANK_LIMIT: Final[int] = 10  # Default number of tasks displayed when results are ranked by relevance
+FUZZY_CANDIDATES: Final[int] = 200  # Number of tasks, with trigrams in common, compared in a fuzzy search
 
 
 @final
@@ -55,7 +48,7 @@ class AddTask:
     task: Union[list[str], str]
         Task or list of task that will be store in database
 
-    console: Console
+    console: 'Console'
         (Rich) Console for beatiful printting
     """
 
@@ -63,18 +56,23 @@ class AddTask:
     category_name: str = 'TODO Task'
     creation_date: date
     task: Union[list[str], str]
-    console: Console
+    console: 'Console'
 
-    def __init__(self, args: Namespace) -> None:
+    def __init__(self, args: Namespace, db: SQLiteConnection = None) -> None:
         """ Constructor fro AddTask class 
         
         Parameters
         ----------
         args : NameSpace
             Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is opened, which is closed by the
+            class
         """
-        self.console = Console()
-        self.db = SQLiteConnection()
+        self.console = new_console()
+        self.own_db = db is None
+        self.db = db if db is not None else SQLiteConnection()
         self.creation_date = datetime.now().date()
 
         if not add_task_args_empty(args):
@@ -99,15 +97,18 @@ class AddTask:
             PrintFormatted.print_help(help_text.ADD_TASK_USAGE_TEXT)
 
     @classmethod
-    def set_args(cls, args: Namespace) -> None:
+    def set_args(cls, args: Namespace, db: SQLiteConnection = None) -> None:
         """ Set args and initialize class
         
         Parameters
         ----------
         args: NameSpace
             Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is used
         """
-        cls(args)
+        cls(args, db)
 
     def category_exists(self) -> bool:
         """ Checks if the typed category exists
@@ -117,12 +118,10 @@ class AddTask:
         exists: bool
             Boolean value flag if the category already exists
         """
-        sql = f"SELECT {categories.COLUMN_ID} FROM {categories.TABLE_NAME} WHERE {categories.COLUMN_NAME} = '{self.category_name}'"
-        query = self.db.exec_sql(sql)
-        categories_list: list[tuple] = query.fetchall()
+        category_id = category_ids.find(self.db, categories, self.category_name)
 
-        if categories_list: # categories_list == []
-            self.category_id = categories_list[0][0]
+        if category_id is not None:
+            self.category_id = category_id
             return True
         return False
 
@@ -134,14 +133,14 @@ class AddTask:
         """
         if len(self.category_name) <= 30:
             if not self.category_exists():
-                sql = f'INSERT INTO {categories.TABLE_NAME} ({categories.COLUMN_NAME}) VALUES (?)'
-                cursor = self.db.exec_sql(sql, (self.category_name,))
+                self.category_id = self.db.write(
+                    lambda: category_ids.resolve(self.db, categories, self.category_name)
+                )
 
-                self.category_id = cursor.lastrowid
-
-                self.db.commit()
                 PrintFormatted.print_category_creation(self.category_name)
             else:
+                from rich.theme import Theme
+
                 custom_theme = Theme({
                     'msg': '#31f55f bold',
                     'name': '#616161 italic'
@@ -157,19 +156,15 @@ class AddTask:
         sql = f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT},{tasks.COLUMN_CREATION}, '\
               f'{tasks.COLUMN_CATEGORY}) VALUES (?,?,?);'
 
-        with self.console.status('[bold yellow]Saving Tasks...') as status:
-            if isinstance(self.task, list):
-                for task in self.task:
-                    values = (task, self.creation_date, self.category_id)
-                    self.db.exec_sql(sql, values)
-
-                    PrintFormatted.print_content_storage(task, self.category_name)
+        task_list = self.task if isinstance(self.task, list) else [self.task]
 
-            elif isinstance(self.task, str):
-                values = (self.task, self.creation_date, self.category_id)
-                self.db.exec_sql(sql, values)
+        with self.console.status('[bold yellow]Saving Tasks...') as status:
+            self.db.write(lambda: self.db.exec_many(
+                sql, [(task, self.creation_date, self.category_id) for task in task_list]
+            ))
 
-                PrintFormatted.print_content_storage(self.task, self.category_name)
+            for task in task_list:
+                PrintFormatted.print_content_storage(task, self.category_name)
 
             if self.task:
                 self.console.print('[bold green]✔️Task Saved')
@@ -178,8 +173,8 @@ class AddTask:
 
             status.stop()
 
-        self.db.commit()
-        self.db.close()
+        if self.own_db:
+            self.db.close()
 
     def _ask_category(self) -> None:
         """ Function that asks to the user to introduce different category name """
@@ -194,6 +189,9 @@ class AddTask:
 
     def _show_preview(self) -> None:
         """ Method that displays a table with the tasks written"""
+        from rich import box
+        from rich.table import Table
+
         formatted_date = self.creation_date.strftime('%Y-%m-%d')
         
         self.console.rule('Preview', style='purple')
@@ -226,7 +224,7 @@ class SearchTask:
 
     Attributes
     ----------
-    console: Console
+    console: 'Console'
         (Rich) Console for beautiful printting
 
     db: SQLiteConnection
@@ -237,76 +235,407 @@ class SearchTask:
 
     search_text: str
         Text to search in the content of the tasks
+
+    rank: bool
+        Flag to order the tasks found by relevance, displaying only the best RANK_LIMIT
+
+    fuzzy: bool
+        Flag to search tasks that contain the text or a similar one, ordered by similarity
+
+    limit: int
+        Max number of tasks displayed per page, or of best matches. None to use the default one
+
+    after: int
+        Id of the last task of the previous page. The page displayed starts after it
+
+    page: int
+        Number of the page displayed, used when after isn't specified
+
+    output_format: str
+        Machine-readable format (ndjson, tsv or csv) in which the tasks are written, instead of displaying them
+
+    all_dbs: bool
+        Flag to search the tasks in all the known databases (see codenotes.db.location), merged by creation date
     """
 
-    console: Console
+    console: 'Console'
     db: SQLiteConnection
     search_date: Union[date, list[date]]
     search_text: str
-    
-    def __init__(self, args: Namespace) -> None:
+    rank: bool
+    fuzzy: bool
+    limit: int
+    after: int
+    page: int
+    output_format: str
+    all_dbs: bool
+
+    def __init__(self, args: Namespace, db: SQLiteConnection = None) -> None:
         """ SearchTask Constructor 
         
         Parameters
         ----------
         args : NameSpace
             Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new read-only connection is opened, which is closed
+            by the class
         """
-        self.console = Console()
-        self.db = SQLiteConnection()
+        self.own_db = db is None
+        self.db = db if db is not None else SQLiteConnection(read_only=True)
         self.search_date = dates_to_search(args)
         self.search_text = format_argument_text(args.text)
-
-        if not date_args_empty(args):
-            self.__search_task()
-        else:
-            PrintFormatted.print_help(help_text.SEARCH_USAGE_TEXT)
+        self.rank = args.rank
+        self.fuzzy = args.fuzzy
+        self.limit = args.limit
+        self.after = args.after
+        self.page = args.page
+        self.output_format = args.format
+        self.all_dbs = args.all_dbs
+
+        try:
+            journal.replay(self.db)  # The annotations captured in the journal are searched too
+
+            if (self.rank or self.fuzzy) and not self.search_text:
+                PrintFormatted.custom_print('[red]Text to search is required to rank the tasks[/red]')
+                PrintFormatted.print_help(help_text.SEARCH_USAGE_TEXT)
+            elif date_args_empty(args):
+                PrintFormatted.print_help(help_text.SEARCH_USAGE_TEXT)
+            elif self.all_dbs and (self.rank or self.fuzzy or self.after or self.page):
+                PrintFormatted.custom_print('[red]--all-dbs lists the tasks by date, it can\'t be used with --rank, '
+                                           '--fuzzy, --after or --page[/red]')
+            elif self.all_dbs:
+                self.search_databases()
+            elif self.output_format:
+                self.write_tasks()
+            else:
+                self.console = new_console()
+
+                if self.rank:
+                    self.__print_ranked_tasks(self.ranked_query())
+                elif self.fuzzy:
+                    self.__print_ranked_tasks(self.fuzzy_query())
+                else:
+                    self.__search_task()
+        finally:
+            if self.own_db:  # After the search was rendered
+                self.db.close()
 
     @classmethod
-    def set_args(cls, args: Namespace) -> None:
+    def set_args(cls, args: Namespace, db: SQLiteConnection = None) -> None:
         """ Class method that initializes the class and automatically will do the search
         
         Parameters
         ----------
         args : NameSpace
             Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is used
         """
-        cls(args)
+        cls(args, db)
 
     def sql_query(self) -> list[tuple]:
         """ Function that makes a query of related information of tasks, and also adds more statements to the main sql
         sql
 
+        Returns
+        -------
+        query: list[tuple]
+            Query done to the database, with the tasks of the page searched
+        """
+        return self.page_query()[0]
+
+    def page_query(self) -> tuple[list[tuple], int]:
+        """ Function that makes a query of the tasks of the page searched
+
+        Tasks are ordered by category, creation date and id, which is the order of the index over the category, so a
+        page is read from the index without sorting all the tasks found. The page starts after the task with the id
+        in after (keyset pagination), or after skipping the previous pages when page is specified. The page is saved in
+        the cache of the search results until the tasks change (see codenotes.db.result_cache)
+
+        Returns
+        -------
+        page: tuple[list[tuple], int]
+            Tasks of the page, and the id of its last task when there are more pages (None if it's the last one)
+        """
+        page_size = self.limit or PAGE_SIZE
+        query = self.__list_query()
+
+        # One more task is selected to know if there is a next page
+        query.limit(page_size + 1)
+
+        if self.page and not self.after:
+            query.offset((self.page - 1) * page_size)
+
+        sql, values = query.build()
+        tasks_page = result_cache.fetch(self.db, (sql, values), lambda: self.db.exec_sql(sql, values).fetchall())
+        next_after = tasks_page[page_size - 1][-1] if len(tasks_page) > page_size else None
+
+        return [task[:-1] for task in tasks_page[:page_size]], next_after
+
+    def write_tasks(self) -> None:
+        """ Function that writes the tasks searched to stdout in the format specified, as they are read from the
+        database. Without a limit, all the tasks found are written
+        """
+        if self.rank or self.fuzzy:
+            query = self.ranked_query() if self.rank else self.fuzzy_query()
+            rows = ((strip_snippet(task[0]), status_text(task[1]), task[2], task[3]) for task in query)
+
+            write_rows(rows, ('content', 'status', 'creation', 'category'), self.output_format)
+        else:
+            query = self.__list_query()
+
+            if self.limit:
+                query.limit(self.limit)
+
+                if self.page and not self.after:
+                    query.offset((self.page - 1) * self.limit)
+
+            rows = (
+                (task[4], task[0], status_text(task[1]), task[2], task[3])
+                for task in iter_cursor(self.db.exec_sql(*query.build()))
+            )
+
+            write_rows(rows, ('id', 'content', 'status', 'creation', 'category'), self.output_format)
+
+    def search_databases(self) -> None:
+        """ Function that searches the tasks in all the known databases at the same time, and writes or displays them
+        merged by creation date, with the database each one comes from
+        """
+        from codenotes.db.location import registered_databases
+        from codenotes.db.federated import database_label, query_databases
+
+        query = self.__list_query(by_date=True, trigram=False)  # The other databases may not have the trigram index
+
+        if self.limit:
+            query.limit(self.limit)
+
+        sql, values = query.build()
+        rows, failed = query_databases([self.db.database_path, *registered_databases()], sql, values,
+                                       key=lambda task: task[2])
+
+        if self.limit:
+            rows = islice(rows, self.limit)
+
+        if self.output_format:
+            rows = ((task[0], task[5], task[1], status_text(task[2]), task[3], task[4]) for task in rows)
+
+            write_rows(rows, ('database', 'id', 'content', 'status', 'creation', 'category'), self.output_format)
+        else:
+            from rich.table import Table
+
+            self.console = new_console()
+            table = Table(title='📒[bold blue] List of Tasks Found')
+            table.add_column('Database', style='#d898ed')
+            table.add_column('Tasks')
+            table.add_column('Status')
+            table.add_column('Category')
+            table.add_column('Creation Date', justify='center', style='yellow')
+
+            for task in rows:
+                table.add_row(database_label(task[0]), task[1], status_text(task[2]), task[4], task[3])
+
+            self.console.print(table if table.row_count else '[red]❌ No Task Found')
+
+        for path in failed:
+            PrintFormatted.custom_print(f'[yellow]The database {path} could not be searched[/yellow]')
+
+    def __list_query(self, by_date: bool = False, trigram: bool = True) -> Query:
+        """ Function that makes the query of all the tasks that match the search, ordered by category, creation date
+        and id. Each row ends with the id of the task
+
+        Parameters
+        ----------
+        by_date: bool
+            Flag to order the tasks only by creation date and id
+
+        trigram: bool
+            Flag to search the text in the trigram index, when the database has it
+
+        Returns
+        -------
+        query: Query
+            Query of the tasks, without limit
+        """
+        query = self.__filtered_query(
+            tasks.TABLE_NAME,
+            (
+                f'{tasks.TABLE_NAME}.{tasks.COLUMN_CONTENT}', f'{tasks.TABLE_NAME}.{tasks.COLUMN_STATUS}',
+                f'{tasks.TABLE_NAME}.{tasks.COLUMN_CREATION}', f'{categories.TABLE_NAME}.{categories.COLUMN_NAME}',
+                f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID}'
+            )
+        )
+
+        if self.search_text:
+            # Rows that contain the text (in the trigram index, or with LIKE when it's shorter than a trigram or there
+            # isn't an index), or its words (in the full-text index)
+            substring = substring_query(self.search_text)
+            match = fts_query(self.search_text)
+
+            if substring and trigram and trigram_search(self.db.connection):
+                conditions = [f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID} IN (SELECT rowid FROM {tasks.TRIGRAM_TABLE_NAME} '
+                              f'WHERE {tasks.TRIGRAM_TABLE_NAME} MATCH ?)']
+                values = [substring]
+            else:
+                conditions = [like_condition(f'{tasks.TABLE_NAME}.{tasks.COLUMN_CONTENT}')]
+                values = [like_pattern(self.search_text)]
+
+            if match:
+                conditions.append(f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID} IN (SELECT rowid FROM {tasks.FTS_TABLE_NAME} '
+                                  f'WHERE {tasks.FTS_TABLE_NAME} MATCH ?)')
+                values.append(match)
+
+            query.where(' OR '.join(conditions), *values)
+
+        order = (
+            f'{tasks.TABLE_NAME}.{tasks.COLUMN_CATEGORY}', f'{tasks.TABLE_NAME}.{tasks.COLUMN_CREATION}',
+            f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID}'
+        )[1 if by_date else 0:]
+
+        if self.after:
+            query.where(f'({", ".join(order)}) > (SELECT {", ".join(order)} FROM {tasks.TABLE_NAME} WHERE '
+                        f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID} = ?)', self.after)
+
+        return query.order_by(*order)
+
+    def ranked_query(self) -> list[tuple]:
+        """ Function that makes a query of the tasks that match the text searched, ordered by relevance (bm25)
+
+        Returns
+        -------
+        query: list[tuple]
+            Query done to the database, with an excerpt of the content instead of the complete content
+        """
+        match = fts_query(self.search_text)
+
+        if not match:
+            return []
+
+        query = self.__filtered_query(
+            tasks.FTS_TABLE_NAME,
+            (
+                snippet_sql(tasks.FTS_TABLE_NAME), f'{tasks.TABLE_NAME}.{tasks.COLUMN_STATUS}',
+                f'{tasks.TABLE_NAME}.{tasks.COLUMN_CREATION}', f'{categories.TABLE_NAME}.{categories.COLUMN_NAME}'
+            )
+        )
+        query.where(f'{tasks.FTS_TABLE_NAME} MATCH ?', match)
+        query.order_by(f'bm25({tasks.FTS_TABLE_NAME})').limit(self.limit or RANK_LIMIT)
+        sql, values = query.build()
+
+        return result_cache.fetch(self.db, (sql, values), lambda: self.db.exec_sql(sql, values).fetchall())
+
+    def fuzzy_query(self) -> list[tuple]:
+        """ Function that makes a query of the tasks whose content contains the text searched, or a text similar to it,
+        ordered by the fraction of trigrams they share with the text searched
+
         Returns
         -------
         query: list[tuple]
             Query done to the database
         """
-        sql = f'SELECT {tasks.TABLE_NAME}.{tasks.COLUMN_CONTENT},{tasks.TABLE_NAME}.{tasks.COLUMN_STATUS}, ' \
-              f'{tasks.TABLE_NAME}.{tasks.COLUMN_CREATION}, ' \
-              f'{categories.TABLE_NAME}.{categories.COLUMN_NAME} FROM {tasks.TABLE_NAME} INNER JOIN ' \
-              f'{categories.TABLE_NAME} ON {tasks.TABLE_NAME}.{tasks.COLUMN_CATEGORY} = ' \
-              f'{categories.TABLE_NAME}.{categories.COLUMN_ID}'
+        match = trigram_query(self.search_text)
+        columns = (
+            f'{tasks.TABLE_NAME}.{tasks.COLUMN_CONTENT}', f'{tasks.TABLE_NAME}.{tasks.COLUMN_STATUS}',
+            f'{tasks.TABLE_NAME}.{tasks.COLUMN_CREATION}', f'{categories.TABLE_NAME}.{categories.COLUMN_NAME}'
+        )
+
+        # A database migrated by an older SQLite may not have the trigram tables
+        if match and trigram_search(self.db.connection):
+            query = self.__filtered_query(tasks.TRIGRAM_TABLE_NAME, columns)
+            query.where(f'{tasks.TRIGRAM_TABLE_NAME} MATCH ?', match)
+            query.order_by(f'bm25({tasks.TRIGRAM_TABLE_NAME})')
+        else:  # Text shorter than a trigram (or no trigram tables), which can only be searched as a substring
+            query = self.__filtered_query(tasks.TABLE_NAME, columns)
+            query.where(like_condition(f'{tasks.TABLE_NAME}.{tasks.COLUMN_CONTENT}'), like_pattern(self.search_text))
+            query.order_by(f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID}')
+
+        query.limit(FUZZY_CANDIDATES)
+        sql, values = query.build()
+
+        def similar_tasks() -> list[tuple]:
+            search_trigrams = trigrams(self.search_text)
+            scored_tasks = [
+                (trigram_similarity(search_trigrams, task[0]), task)
+                for task in self.db.exec_sql(sql, values).fetchall()
+            ]
+            scored_tasks.sort(key=lambda scored_task: scored_task[0], reverse=True)
+
+            return [
+                task for similarity, task in scored_tasks[:self.limit or RANK_LIMIT]
+                if similarity >= MIN_TRIGRAM_SIMILARITY
+            ]
+
+        # The candidates are scored by the text searched, which isn't in the query when it's shorter than a trigram
+        return result_cache.fetch(self.db, (sql, values, self.search_text, self.limit), similar_tasks)
+
+    def __filtered_query(self, table: str, columns: tuple[str, ...]) -> Query:
+        """ Function that starts the query of tasks, joined with their categories and filtered by the date searched
+
+        Parameters
+        ----------
+        table: str
+            Table of the FROM clause. It's the tasks table or one of its full-text tables (joined with tasks by rowid)
+
+        columns: tuple[str, ...]
+            Columns selected
+
+        Returns
+        -------
+        query: Query
+            Query of the tasks
+        """
+        query = Query(table, columns)
+
+        if table != tasks.TABLE_NAME:
+            query.join(tasks.TABLE_NAME, f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID} = {table}.rowid')
+
+        query.join(categories.TABLE_NAME,
+                   f'{tasks.TABLE_NAME}.{tasks.COLUMN_CATEGORY} = {categories.TABLE_NAME}.{categories.COLUMN_ID}')
 
         if self.search_date:
-            if isinstance(self.search_date, date):
-                sql = add_conditions_sql(sql, f'{tasks.COLUMN_CREATION} LIKE date("{self.search_date}")')
+            query.where(date_range_condition(f'{tasks.TABLE_NAME}.{tasks.COLUMN_CREATION}'),
+                        *date_range(self.search_date))
 
-            elif isinstance(self.search_date, list):
-                first_day, last_day = self.search_date
-                sql = add_conditions_sql(sql, f'{tasks.COLUMN_CREATION} BETWEEN date("{first_day}") '
-                                              f'AND date("{last_day}")')
-        if self.search_text:
-            sql = add_conditions_sql(sql, f'{tasks.COLUMN_CONTENT} LIKE "%{self.search_text}%"', 'AND')
+        return query
 
-        query = self.db.exec_sql(sql)
+    def __print_ranked_tasks(self, query: list[tuple]) -> None:
+        """ Function that displays a table with the tasks that best match the text searched, in the order of query
 
-        return query.fetchall()
+        Parameters
+        ----------
+        query: list[tuple]
+            Tasks found, ordered by relevance
+        """
+        from rich import box
+        from rich.table import Table
+
+        if query:
+            table = Table(title=f'📒[bold blue] Top {len(query)} Tasks Found', box=box.SIMPLE)
+            table.add_column('#', justify='right', style='dim')
+            table.add_column('Tasks', overflow='fold')
+            table.add_column('Status')
+            table.add_column('Category')
+            table.add_column('Creation Date', justify='center', style='yellow')
+
+            for position, actual_task in enumerate(query, start=1):
+                table.add_row(
+                        str(position), highlight_snippet(actual_task[0]), status_text(actual_task[1]),
+                        actual_task[3], actual_task[2]
+                    )
+
+            self.console.print(table)
+        else:
+            self.console.print('[red]❌ No Task Found')
 
     def __search_task(self) -> None:
         """ Function that displays a tree with tables as child nodes with the tasks searched """
+        from rich.tree import Tree
+        from rich.table import Table
+
         root = Tree('📒[bold blue] List of Tasks  Found')
-        query = self.sql_query()
+        query, next_after = self.page_query()
 
         if query:  # When the list is not empty
             table = Table()
@@ -315,13 +644,12 @@ class SearchTask:
             table.add_column('Category')
             table.add_column('Creation Date', justify='center', style='yellow')
 
-            tasks_sorted = sorted(query, key=sorter)
-            actual_task = tasks_sorted[0]
+            actual_task = query[0]
             actual_category = actual_task[3]
 
             child_node = root.add(f':file_folder:[#d898ed]{actual_category}')
 
-            for actual_task in tasks_sorted:
+            for actual_task in query:
                 if actual_task[3] != actual_category:
                     child_node.add(table)
 
@@ -340,7 +668,9 @@ class SearchTask:
             else:
                 child_node.add(table)
 
+            if next_after:
+                root.add(f'[yellow]More tasks found. Next page: --after {next_after}')
+
         else:
             root.add('[red]❌ No Task Found')
         self.console.print(root)
-        # self.db.close() # FIXME: DATABASE DONT CLOSE CORRECTLY
@@ -0,0 +1,563 @@
+""" Module of the optional daemon that runs the commands of the CLI in a warm process
+
+The daemon listens on a Unix domain socket and keeps the connections with the databases and the rich renderables
+already imported, so a command forwarded to it only costs a round-trip through the socket. The client side (forward) is
+imported by main() on every run, so this module only imports asyncio when the daemon is served.
+
+The protocol is a JSON line per connection: the client sends its argv, cwd and terminal (isatty, columns and the
+environment variables of codenotes, XDG and the colors), and the daemon replies with the exit status and the output of
+the command (or a null status, when the command asks for input and must run in the process of the client). A request
+that isn't a JSON object is answered with an error. The searches with a machine format (--format) aren't forwarded,
+since their output is streamed with constant memory by the process of the command, while the daemon would reply with
+all of it at once.
+
+The socket is only used when it belongs to the user and only the user can access it (and its directory), so no other
+user can receive the commands (with the content of the annotations) or write in the terminal of the client.
+"""
+import os
+import sys
+import json
+import stat
+from typing import Any, Final, Optional
+
+FORWARDED_COMMANDS: Final[tuple[str, ...]] = ('add', 'search')  # Commands that don't read from stdin
+INTERACTIVE_FLAGS: Final[tuple[str, ...]] = ('--preview', '-p')  # Flags that ask for confirmation
+STREAMED_FLAGS: Final[tuple[str, ...]] = ('--format',)  # Flags whose output is streamed by the process of the command
+# Environment of the client used by the commands: the colors of rich, and the variables of codenotes (database,
+# journal, cache, etc.) and XDG (config and cache directories)
+CLIENT_ENVIRON: Final[tuple[str, ...]] = ('TERM', 'COLORTERM', 'NO_COLOR')
+CLIENT_ENVIRON_PREFIXES: Final[tuple[str, ...]] = ('CODENOTES_', 'XDG_')
+DISABLE_VARIABLE: Final[str] = 'CODENOTES_NO_DAEMON'  # Environment variable that disables the forwarding
+START_TIMEOUT: Final[float] = 5.0  # Seconds waited for the daemon to listen after it's started
+CONNECT_TIMEOUT: Final[float] = 1.0  # Seconds waited to connect with the daemon, before running the command here
+RESPONSE_TIMEOUT: Final[float] = 60.0  # Seconds waited for each part of the response of the daemon
+SOCKET_NAME: Final[str] = 'daemon.sock'
+
+
+def socket_path() -> str:
+    """ Returns the path of the socket of the daemon, in a directory of the user in the runtime directory (or the
+    temporary one, when the runtime directory isn't set)
+
+    Returns
+    -------
+    path: str
+        Path of the Unix domain socket
+    """
+    directory = os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or '/tmp'
+    user = getattr(os, 'getuid', lambda: 0)()
+
+    return os.path.join(directory, f'codenotes-{user}', SOCKET_NAME)
+
+
+def private(path: str, kind: int) -> bool:
+    """ Checks that the file is of the kind expected, belongs to the user and only the user can access it. The
+    symbolic links aren't followed
+
+    Parameters
+    ----------
+    path: str
+        Path of the file
+
+    kind: int
+        stat.S_IFSOCK or stat.S_IFDIR
+
+    Returns
+    -------
+    private: bool
+        False when the file doesn't exist, or any of the checks fails
+    """
+    try:
+        status = os.lstat(path)
+    except OSError:
+        return False
+
+    owner = getattr(os, 'getuid', lambda: status.st_uid)()
+
+    return stat.S_IFMT(status.st_mode) == kind and status.st_uid == owner and not status.st_mode & 0o077
+
+
+def socket_directory(path: str) -> None:
+    """ Creates the directory of the socket, only accessible by the user
+
+    Parameters
+    ----------
+    path: str
+        Path of the socket
+
+    Raises
+    ------
+    PermissionError
+        When the directory already exists and belongs to another user, or other users can access it
+    """
+    directory = os.path.dirname(path)
+
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+
+    if not private(directory, stat.S_IFDIR):
+        raise PermissionError(f'{directory} must belong to the user, with permissions 0700')
+
+
+def request(message: dict[str, Any], path: str = None) -> Optional[dict[str, Any]]:
+    """ Sends a message to the daemon and returns its response
+
+    Parameters
+    ----------
+    message: dict[str, Any]
+        Message sent, serialized as a JSON line
+
+    path: str
+        Path of the socket (Default socket_path())
+
+    Returns
+    -------
+    response: Optional[dict[str, Any]]
+        Response of the daemon, or None when the daemon isn't running (or its socket isn't private)
+
+    Raises
+    ------
+    TimeoutError
+        When the message was sent, but the response doesn't arrive in RESPONSE_TIMEOUT seconds
+    """
+    path = path or socket_path()
+
+    # The socket (and its directory) could have been created by another user, to receive the commands
+    if not private(path, stat.S_IFSOCK) or not private(os.path.dirname(path), stat.S_IFDIR):
+        return None
+
+    import socket
+
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(CONNECT_TIMEOUT)
+
+        try:
+            client.connect(path)
+        except OSError:  # Socket left by a daemon that didn't stop correctly, or a daemon that doesn't answer
+            return None
+
+        client.settimeout(RESPONSE_TIMEOUT)
+
+        try:
+            client.sendall(json.dumps(message).encode('utf-8') + b'\n')
+            client.shutdown(socket.SHUT_WR)
+
+            response = b''.join(iter(lambda: client.recv(65536), b''))
+        except socket.timeout:  # The command may have run, so it must not run again here
+            raise TimeoutError(f'The daemon did not answer in {RESPONSE_TIMEOUT:g} seconds') from None
+
+    return json.loads(response) if response else None
+
+
+def forward(argv: list[str], path: str = None) -> Optional[int]:
+    """ Runs the command in the daemon, when it's running and the command can be forwarded, writing its output
+
+    Parameters
+    ----------
+    argv: list[str]
+        Arguments of the command (sys.argv without the program)
+
+    path: str
+        Path of the socket (Default socket_path())
+
+    Returns
+    -------
+    status: Optional[int]
+        Exit status of the command, or None when it must run in this process
+    """
+    if not argv or argv[0] not in FORWARDED_COMMANDS or os.environ.get(DISABLE_VARIABLE):
+        return None
+
+    if has_flag(argv, INTERACTIVE_FLAGS) or has_flag(argv, STREAMED_FLAGS):
+        return None
+
+    try:
+        columns, lines = os.get_terminal_size(sys.stdout.fileno())
+    except (AttributeError, ValueError, OSError):
+        columns = lines = None
+
+    try:
+        response = request({
+            'argv': argv,
+            'cwd': os.getcwd(),
+            'isatty': sys.stdout.isatty(),
+            'columns': columns,
+            'lines': lines,
+            'environ': client_environ(os.environ)
+        }, path)
+    except TimeoutError as error:
+        sys.stderr.write(f'{error}\n')
+        return 1
+
+    if response is None or response['status'] is None:  # Not running, or the command asks for input
+        return None
+
+    sys.stdout.write(response['output'])
+    sys.stdout.flush()
+
+    return response['status']
+
+
+def has_flag(argv: list[str], flags: tuple[str, ...]) -> bool:
+    """ Checks if any of the flags is in the arguments, alone or with its value (--flag=value)
+
+    Parameters
+    ----------
+    argv: list[str]
+        Arguments of the command
+
+    flags: tuple[str, ...]
+        Flags searched
+
+    Returns
+    -------
+    found: bool
+        True when any of the flags is found
+    """
+    return any(argument.split('=', 1)[0] in flags for argument in argv)
+
+
+def client_environ(environ: dict[str, str]) -> dict[str, str]:
+    """ Returns the environment variables of the client used by the commands
+
+    Parameters
+    ----------
+    environ: dict[str, str]
+        Environment of the client
+
+    Returns
+    -------
+    environ: dict[str, str]
+        Variables of CLIENT_ENVIRON, or with a prefix of CLIENT_ENVIRON_PREFIXES
+    """
+    return {
+        name: value for name, value in environ.items()
+        if name in CLIENT_ENVIRON or name.startswith(CLIENT_ENVIRON_PREFIXES)
+    }
+
+
+def start(path: str = None) -> bool:
+    """ Starts the daemon in a new process, detached from the terminal, and waits until it's listening
+
+    Parameters
+    ----------
+    path: str
+        Path of the socket (Default socket_path())
+
+    Returns
+    -------
+    started: bool
+        True when the daemon is listening
+    """
+    import time
+    import subprocess
+
+    path = path or socket_path()
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environ = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, (package_dir, os.environ.get('PYTHONPATH'))))}
+
+    subprocess.Popen(
+        [sys.executable, '-c', f'from codenotes.daemon import serve; serve({path!r})'],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=environ,
+        start_new_session=True
+    )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if request({'control': 'status'}, path) is not None:
+            return True
+        time.sleep(0.05)
+
+    return False
+
+
+def serve(path: str = None) -> None:
+    """ Serves the daemon until it receives the stop message (or SIGTERM/SIGINT)
+
+    Parameters
+    ----------
+    path: str
+        Path of the socket (Default socket_path())
+    """
+    import asyncio
+
+    asyncio.run(Daemon(path or socket_path()).serve())
+
+
+class Daemon:
+    """ Server of the daemon
+
+    The commands run one by one in a single worker thread, which owns the connections with the databases (sqlite3
+    connections can only be used by the thread that creates them), while the event loop keeps answering the control
+    messages (status and stop). Each command uses the database of the working directory and environment of its
+    client, and the connection of each database is kept open for the next commands.
+
+    Attributes
+    ----------
+    path: str
+        Path of the socket
+
+    databases: dict[str, SQLiteConnection]
+        Warm connections with the databases used by the commands, by path
+
+    started: float
+        Time when the daemon was started
+
+    served: int
+        Number of commands run
+    """
+
+    path: str
+    databases: dict[str, Any]  # SQLiteConnection, imported by the worker thread
+    started: float
+    served: int = 0
+
+    def __init__(self, path: str) -> None:
+        """ Daemon Constructor
+
+        Parameters
+        ----------
+        path: str
+            Path of the socket
+        """
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.path = path
+        self.databases = {}
+        self.started = time.time()
+        self.worker = ThreadPoolExecutor(max_workers=1)
+        self.stopped = None
+
+    async def serve(self) -> None:
+        """ Listens on the socket until the daemon is stopped """
+        import signal
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        self.stopped = asyncio.Event()
+        await loop.run_in_executor(self.worker, self.warm_up)
+
+        socket_directory(self.path)
+
+        if os.path.lexists(self.path):  # Socket of a daemon that didn't stop correctly
+            os.unlink(self.path)
+
+        umask = os.umask(0o077)  # Only the user can connect to the socket and send commands
+        try:
+            server = await asyncio.start_unix_server(self.handle, path=self.path)
+        finally:
+            os.umask(umask)
+
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signal_number, self.stopped.set)
+            except (NotImplementedError, RuntimeError, ValueError):  # Not served from the main thread
+                pass
+
+        async with server:
+            await self.stopped.wait()
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        await loop.run_in_executor(self.worker, self.close)
+        self.worker.shutdown()
+
+    async def handle(self, reader, writer) -> None:
+        """ Answers the message of a client
+
+        Parameters
+        ----------
+        reader: StreamReader
+            Stream with the message of the client
+
+        writer: StreamWriter
+            Stream where the response is written
+        """
+        import time
+        import asyncio
+
+        try:
+            try:
+                message = json.loads(await reader.readline())
+                control = message.get('control')
+            except (ValueError, AttributeError):  # Empty line, invalid JSON, or JSON that isn't an object
+                message, control = None, None
+
+            if message is None or control is None and not isinstance(message.get('argv'), list):
+                response = {'status': 1, 'output': 'Invalid request: expected a JSON object with argv\n'}
+            elif control == 'stop':
+                response = {'status': 0, 'output': 'Daemon stopped\n'}
+                self.stopped.set()
+            elif control == 'status':
+                response = {'status': 0, 'pid': os.getpid(), 'uptime': time.time() - self.started,
+                            'served': self.served}
+            else:
+                response = await asyncio.get_running_loop().run_in_executor(self.worker, self.run, message)
+
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+        except (ConnectionError, OSError):  # The client closed the connection before the response
+            pass
+        finally:
+            writer.close()
+
+    def warm_up(self) -> None:
+        """ Opens the connection with the database and imports the modules of the commands and rich renderables """
+        import rich.tree  # noqa: F401
+        import rich.table  # noqa: F401
+        import rich.panel  # noqa: F401
+        import rich.console  # noqa: F401
+        import rich.markdown  # noqa: F401
+        import codenotes.cli.tasks  # noqa: F401
+        import codenotes.cli.notes  # noqa: F401
+        from codenotes.db.location import database_path
+
+        self.database(database_path())
+
+    def database(self, path: str):
+        """ Returns the connection with the database, opening it the first time it's used
+
+        Parameters
+        ----------
+        path: str
+            Path of the database
+
+        Returns
+        -------
+        db: SQLiteConnection
+            Connection with the database
+        """
+        from codenotes.db.connection import SQLiteConnection
+
+        if path not in self.databases:
+            self.databases[path] = SQLiteConnection(path=path)
+
+        return self.databases[path]
+
+    def close(self) -> None:
+        """ Closes the connections with the databases """
+        for db in self.databases.values():
+            db.close()
+
+    def run(self, message: dict[str, Any]) -> dict[str, Any]:
+        """ Runs the command of the client, with its working directory and terminal, capturing its output
+
+        Parameters
+        ----------
+        message: dict[str, Any]
+            Message of the client, with argv, cwd, isatty, columns, lines and environ
+
+        Returns
+        -------
+        response: dict[str, Any]
+            Exit status and output of the command. The status is None when the command asked for input before
+            writing anything, so the client runs it in its own process, with its terminal
+        """
+        import io
+        import traceback
+        from contextlib import redirect_stdout, redirect_stderr
+
+        import codenotes.cli as cli
+        from codenotes import parse_args, dispatch
+        from codenotes.db.location import database_path
+
+        output = ClientOutput(message['isatty'])
+        status = 0
+
+        cli.CONSOLE_OPTIONS.update(force_terminal=message['isatty'], width=message['columns'],
+                                   height=message['lines'])
+        cwd = os.getcwd()
+        client = client_environ(message['environ'])
+        # The variables of the daemon that the client doesn't have are removed while the command runs
+        names = set(client) | set(client_environ(os.environ))
+        environ = {name: os.environ.get(name) for name in names}
+        stdin = sys.stdin
+        db = None
+        changes = 0
+
+        try:
+            os.chdir(message['cwd'])
+            set_environ({name: client.get(name) for name in names})
+            sys.stdin = io.StringIO()  # The client stdin isn't forwarded
+            db = self.database(database_path())
+            changes = db.connection.total_changes
+
+            with redirect_stdout(output), redirect_stderr(output):
+                dispatch(parse_args(message['argv']), db)
+        except SystemExit as exit_error:
+            status = exit_error.code if isinstance(exit_error.code, int) else int(exit_error.code is not None)
+        except EOFError:  # The command asked for input (e.g. a category name too long), which isn't forwarded
+            if db is not None:
+                db.rollback()
+
+            if db is not None and db.connection.total_changes == changes:  # Nothing written, the client runs it
+                status = None
+                output = ClientOutput(message['isatty'])
+            else:
+                output.write(f'The command asked for input, which the daemon can\'t read. Run it again with '
+                             f'{DISABLE_VARIABLE}=1\n')
+                status = 1
+        except Exception:
+            if db is not None:
+                db.rollback()
+            output.write(traceback.format_exc())
+            status = 1
+        finally:
+            sys.stdin = stdin
+            set_environ(environ)
+            os.chdir(cwd)
+            cli.CONSOLE_OPTIONS.clear()
+
+        self.served += 1
+
+        return {'status': status, 'output': output.getvalue()}
+
+
+class ClientOutput:
+    """ Output of a command run by the daemon, which behaves like the terminal of the client """
+
+    def __init__(self, isatty: bool) -> None:
+        """ ClientOutput Constructor
+
+        Parameters
+        ----------
+        isatty: bool
+            Flag that indicates if the stdout of the client is a terminal
+        """
+        import io
+
+        self.buffer = io.StringIO()
+        self.tty = isatty
+
+    def write(self, text: str) -> int:
+        return self.buffer.write(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return self.tty
+
+    def getvalue(self) -> str:
+        return self.buffer.getvalue()
+
+
+def set_environ(environ: dict[str, Optional[str]]) -> None:
+    """ Sets the environment variables, removing the ones whose value is None
+
+    Parameters
+    ----------
+    environ: dict[str, Optional[str]]
+        Values of the variables
+    """
+    for name, value in environ.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
@@ -0,0 +1,126 @@
+""" Module that finds the ids of the categories by name, creating the ones that don't exist
+
+The names of the categories are unique (migration 6), so a category is created with INSERT ... ON CONFLICT DO NOTHING,
+which can't add a repeated category even if another process creates it at the same time. The ids found are kept in a
+cache of the connection, shared by the commands that use it (add, import, batch and the replay of the journal), so
+adding many annotations in the same categories only queries each category once. The cache is cleared when the
+connection rolls back, since the categories created in the transaction don't exist anymore.
+"""
+import sqlite3
+from typing import TYPE_CHECKING, Final, Optional
+
+if TYPE_CHECKING:
+    from codenotes.db.connection import SQLiteConnection
+
+RETURNING_SUPPORTED: Final[bool] = sqlite3.sqlite_version_info >= (3, 35, 0)  # INSERT ... RETURNING
+
+
+def cache(db: 'SQLiteConnection', categories) -> dict[str, int]:
+    """ Returns the cache of the ids of the categories of the table, in the connection
+
+    Parameters
+    ----------
+    db: SQLiteConnection
+        Connection with the database
+
+    categories: module
+        Utility module of the categories table
+
+    Returns
+    -------
+    ids: dict[str, int]
+        Ids of the categories found, by name
+    """
+    return db.category_ids.setdefault(categories.TABLE_NAME, {})
+
+
+def load(db: 'SQLiteConnection', categories) -> dict[str, int]:
+    """ Loads the ids of all the categories of the table in the cache, with a single query
+
+    Parameters
+    ----------
+    db: SQLiteConnection
+        Connection with the database
+
+    categories: module
+        Utility module of the categories table
+
+    Returns
+    -------
+    ids: dict[str, int]
+        Ids of the categories, by name
+    """
+    ids = cache(db, categories)
+    ids.update(db.exec_sql(categories.SELECT_CATEGORIES).fetchall())
+
+    return ids
+
+
+def find(db: 'SQLiteConnection', categories, name: str) -> Optional[int]:
+    """ Returns the id of the category, without creating it
+
+    Parameters
+    ----------
+    db: SQLiteConnection
+        Connection with the database
+
+    categories: module
+        Utility module of the categories table
+
+    name: str
+        Name of the category
+
+    Returns
+    -------
+    id: Optional[int]
+        Id of the category, or None when it doesn't exist
+    """
+    ids = cache(db, categories)
+
+    if name not in ids:
+        found = db.exec_sql(categories.SELECT_CATEGORY_ID, (name,)).fetchone()
+
+        if found is None:
+            return None
+
+        ids[name] = found[0]
+
+    return ids[name]
+
+
+def resolve(db: 'SQLiteConnection', categories, name: Optional[str]) -> int:
+    """ Returns the id of the category, creating it (in the current transaction) when it doesn't exist
+
+    Parameters
+    ----------
+    db: SQLiteConnection
+        Read-write connection with the database
+
+    categories: module
+        Utility module of the categories table
+
+    name: Optional[str]
+        Name of the category. Without name, it's the default category
+
+    Returns
+    -------
+    id: int
+        Id of the category
+    """
+    if not name:
+        return 1  # Default category
+
+    ids = cache(db, categories)
+
+    if name not in ids:
+        created = []
+
+        if RETURNING_SUPPORTED:  # The insert doesn't return a row when the category already exists
+            sql = f'{categories.INSERT_CATEGORY} RETURNING {categories.COLUMN_ID}'
+            created = db.exec_sql(sql, (name,)).fetchall()
+        else:
+            db.exec_sql(categories.INSERT_CATEGORY, (name,))
+
+        ids[name] = created[0][0] if created else db.exec_sql(categories.SELECT_CATEGORY_ID, (name,)).fetchone()[0]
+
+    return ids[name]
@@ -1,12 +1,22 @@
 import os
+import time
+import random
 import sqlite3
-from typing import Any, AnyStr, Final
+import tempfile
+from pathlib import Path
+from typing import Any, AnyStr, Callable, Final, Iterable, TypeVar
 from sqlite3.dbapi2 import Connection, Cursor
 
-import codenotes.db.utilities.notes as notes
-import codenotes.db.utilities.tasks as tasks
-import codenotes.db.utilities.tasks_categories as tasks_categories
-import codenotes.db.utilities.notes_categories as notes_categories
+from codenotes.db.location import MEMORY_DATABASE, database_path
+from codenotes.db.migrations import migrate, outdated
+
+T = TypeVar('T')
+
+BUSY_TIMEOUT: Final[float] = 5.0  # Seconds a statement waits for a lock held by another connection
+TIMEOUT_VARIABLE: Final[str] = 'CODENOTES_BUSY_TIMEOUT'  # Environment variable with the busy timeout, in seconds
+WRITE_RETRIES: Final[int] = 5  # Times a write transaction is retried when the database is locked
+RETRY_DELAY: Final[float] = 0.05  # Seconds waited before the first retry, doubled in the next ones
+MAX_RETRY_DELAY: Final[float] = 1.0
 
 
 class SQLiteConnection:
@@ -14,10 +24,18 @@ class SQLiteConnection:
     """ Connection with SQLite3 class
     
     Class has the purpouse to manage the connection with the database created with
-    sqlite3. Everytime the constructor is executed, it connects to the database, then 
-    execute the SQL statements that creates the tables if they not exist. Also, this class
+    sqlite3. Everytime the constructor is executed, it connects to the database, then
+    applies the schema migrations that are missing (see codenotes.db.migrations). Also, this class
     allows you to execute sql, commit the transactions and close the connection with
-    the database.
+    the database. The read-only connections, used by the commands that only read, don't apply
+    the migrations nor take the write lock, so they can't hold up the commands that write.
+
+    The read-write connections put the database in WAL mode, so the readers and the writer don't
+    block each other, and wait up to a busy timeout for the lock of other writers. The writes
+    made with write() are also retried with backoff when the database stays locked.
+
+    The ephemeral connections (see ephemeral()) use a database in memory or in a temporary file, which is deleted when
+    the connection is closed, so the tests and the throwaway scripting sessions don't touch the real database.
 
     Attributes
     ---------
@@ -28,36 +46,125 @@ class SQLiteConnection:
         Name of the database
 
     DATABASE_PATH: Final[str]
-        Complete path where is the database (its getted after joinning BASE_DIR & DATABASE_NAME)
+        Complete path where is the database (its getted after joinning BASE_DIR & DATABASE_NAME). It's used when
+        no other database is configured (see codenotes.db.location)
+
+    database_path: str
+        Path of the database (Default the one found by codenotes.db.location)
 
     connection: Connection
-        Connection with the database specified in DATABASE_PATH
+        Connection with the database specified in database_path
 
     cursor: Cursor
         Cursor created to interact with the database
+
+    read_only: bool
+        Flag that indicates if the database is opened in read-only mode, where any write fails
+
+    in_memory: bool
+        Flag that indicates if the database is in memory (MEMORY_DATABASE), so it only exists in this connection
+
+    temporary: bool
+        Flag that indicates if the file of the database is deleted when the connection is closed
+
+    category_ids: dict[str, dict[str, int]]
+        Ids of the categories found by codenotes.db.category_ids, by table and name. It's cleared on rollback
+
+    deferred_commits: bool
+        Flag that indicates if commit() is ignored (unless it's forced), so the statements executed by several
+        commands are committed together
     """
 
     BASE_DIR: Final[AnyStr] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     DATABASE_NAME: Final[str] = 'codenotes.db'
     DATABASE_PATH: Final[str] = os.path.join(BASE_DIR, DATABASE_NAME)
     
+    database_path: str
     connection: Connection
     cursor: Cursor
+    read_only: bool
+    in_memory: bool
+    timeout: float
+    temporary: bool = False
+    deferred_commits: bool = False
+    category_ids: dict[str, dict[str, int]]
+
+    def __init__(self, read_only: bool = False, path: str = None, timeout: float = None, wal: bool = True) -> None:
+        """ SQLiteConnection Constructor
+
+        Parameters
+        ----------
+        read_only: bool
+            Flag to open the database in read-only mode (mode=ro and query_only). The migrations are only applied
+            (with a read-write connection) when the database doesn't exist or its schema is outdated
+
+        path: str
+            Path of the database (Default the one found by codenotes.db.location). MEMORY_DATABASE opens a new
+            database in memory
+
+        timeout: float
+            Seconds a statement waits for the lock of another connection (Default CODENOTES_BUSY_TIMEOUT, or
+            BUSY_TIMEOUT)
+
+        wal: bool
+            Flag to put the database in WAL mode. Without it, the journal mode of the database isn't changed
+        """
+        self.database_path = path if path == MEMORY_DATABASE else os.path.abspath(path) if path else database_path()
+        self.read_only = read_only
+        self.in_memory = self.database_path == MEMORY_DATABASE
+        self.category_ids = {}
+        self.timeout = timeout if timeout is not None else busy_timeout()
+
+        if not self.in_memory and not os.path.exists(self.database_path):  # New database, maybe in a new directory
+            os.makedirs(os.path.dirname(self.database_path), exist_ok=True)
+
+        if self.in_memory:  # Nothing else can open it, so it doesn't need WAL nor the read-only URI
+            self.connection = sqlite3.connect(MEMORY_DATABASE)
+            migrate(self.connection)
+
+            if read_only:
+                self.connection.execute('PRAGMA query_only = ON')
+        elif read_only:
+            self.connection = self.__connect_read_only()
+        else:
+            self.connection = sqlite3.connect(self.database_path, timeout=self.timeout)
+
+            migrate(self.connection)
+
+            if wal:
+                # The database was opened by the version read of migrate, so this query doesn't read it again
+                if self.connection.execute('PRAGMA journal_mode').fetchone()[0] != 'wal':
+                    self.connection.execute('PRAGMA journal_mode = WAL')
+                # A setting of the connection, which doesn't read the database. Durable at the checkpoints in WAL mode
+                self.connection.execute('PRAGMA synchronous = NORMAL')
 
-    def __init__(self) -> None:
-        """ SQLiteConnection Constructor """
-        self.connection = sqlite3.connect(self.DATABASE_PATH)
         self.cursor = self.connection.cursor()
 
-        self.exec_sql(notes_categories.CREATE_TABLE)  # Notes Category Table
-        self.cursor.execute(notes_categories.INSERT_DEFAULT_CATEGORY)  # Insert Default Category
-        self.exec_sql(notes.CREATE_TABLE)  # Notes Table
+    @classmethod
+    def ephemeral(cls, in_memory: bool = True) -> 'SQLiteConnection':
+        """ Opens a new empty database that is deleted when the connection is closed
 
-        self.exec_sql(tasks_categories.CREATE_TABLE)  # Task Category Table
-        self.cursor.execute(tasks_categories.INSERT_DEFAULT_CATEGORY)  # Insert Default Category
-        self.exec_sql(tasks.CREATE_TABLE)  # Tasks Table
+        Parameters
+        ----------
+        in_memory: bool
+            Flag to keep the database in memory, which is the fastest. Otherwise, it's created in a temporary file, so
+            other connections (and processes) can open it through database_path
 
-        self.connection.commit()
+        Returns
+        -------
+        db: SQLiteConnection
+            Read-write connection with the new database
+        """
+        if in_memory:
+            return cls(path=MEMORY_DATABASE)
+
+        descriptor, path = tempfile.mkstemp(prefix='codenotes-', suffix='.db')
+        os.close(descriptor)  # SQLite takes the empty file as an empty database
+
+        db = cls(path=path)
+        db.temporary = True
+
+        return db
 
     def exec_sql(self, sql: str, values: tuple[Any] = None) -> Cursor:
         """ Method that executes sql command 
@@ -79,11 +186,157 @@ class SQLiteConnection:
             return self.cursor.execute(sql, values)
         return self.cursor.execute(sql)
 
-    def commit(self) -> None:
-        """ Method commits the current transaction """
-        self.connection.commit()
+    def exec_many(self, sql: str, values: Iterable[tuple[Any]]) -> Cursor:
+        """ Method that executes the sql command once for each tuple of values, in the current transaction
+
+        Parameters
+        ----------
+        sql : str
+            SQL statement to be executed
+
+        values: Iterable[tuple[Any]]
+            Values of each execution of the sql statement
+
+        Returns
+        -------
+        cursor : Cursor
+            Method will return the cursor that the method executemany returns
+        """
+        return self.cursor.executemany(sql, values)
+
+    def commit(self, force: bool = False) -> None:
+        """ Method commits the current transaction. While the commits are deferred, it only commits when it's forced
+
+        Parameters
+        ----------
+        force: bool
+            Flag to commit even if the commits are deferred
+        """
+        if force or not self.deferred_commits:
+            self.connection.commit()
+
+    def rollback(self) -> None:
+        """ Method rolls back the current transaction, forgetting the ids of the categories it may have created """
+        self.connection.rollback()
+
+        for ids in self.category_ids.values():
+            ids.clear()
+
+    def write(self, statements: Callable[[], T]) -> T:
+        """ Method that runs the statements in a write transaction and commits it
+
+        The transaction takes the write lock when it begins (BEGIN IMMEDIATE), so it can't fail halfway because
+        another connection wrote in the meantime. When the lock isn't released in the busy timeout, the transaction is
+        rolled back and retried, up to WRITE_RETRIES times, waiting a random delay that doubles after each attempt.
+        Inside a transaction that is already open (deferred commits), the statements are just executed, since the
+        transaction can't be retried from here
+
+        Parameters
+        ----------
+        statements: Callable[[], T]
+            Function that executes the statements of the transaction. It must not commit
+
+        Returns
+        -------
+        result: T
+            Value returned by the statements
+        """
+        if self.connection.in_transaction:
+            return statements()
+
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                self.exec_sql('BEGIN IMMEDIATE')
+                result = statements()
+                self.commit()
+
+                return result
+            except sqlite3.OperationalError as error:
+                self.rollback()
+
+                if attempt == WRITE_RETRIES or not database_locked(error):
+                    raise
+            except BaseException:
+                self.rollback()
+                raise
+
+            time.sleep(min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** attempt) * random.uniform(0.5, 1.0))
+
+    def __connect_read_only(self) -> Connection:
+        """ Method that opens the database in read-only mode, migrating it first when it's needed
+
+        Returns
+        -------
+        connection: Connection
+            Read-only connection with the database
+        """
+        uri = f'{Path(os.path.abspath(self.database_path)).as_uri()}?mode=ro'
+
+        if os.path.exists(self.database_path):
+            connection = sqlite3.connect(uri, uri=True, timeout=self.timeout)
+
+            if not outdated(connection):
+                connection.execute('PRAGMA query_only = ON')
+                return connection
+
+            connection.close()
+
+        # New database or outdated schema. It's created in WAL mode, like the read-write connections do
+        connection = sqlite3.connect(self.database_path, timeout=self.timeout)
+        try:
+            connection.execute('PRAGMA journal_mode = WAL')
+            migrate(connection)
+        finally:
+            connection.close()
+
+        connection = sqlite3.connect(uri, uri=True, timeout=self.timeout)
+        connection.execute('PRAGMA query_only = ON')
+
+        return connection
 
     def close(self) -> None:
-        """ Close database and cursor connection """
+        """ Close database and cursor connection. The temporary databases are deleted, with their caches """
         self.cursor.close()
         self.connection.close()
+
+        if self.temporary:
+            from codenotes.db.journal import JOURNAL_SUFFIX, REJECTED_SUFFIX
+            from codenotes.db.result_cache import clear
+
+            clear(self.database_path)
+
+            for suffix in ('', '-wal', '-shm', JOURNAL_SUFFIX, JOURNAL_SUFFIX + REJECTED_SUFFIX):
+                try:
+                    os.remove(self.database_path + suffix)
+                except FileNotFoundError:
+                    pass
+
+
+def busy_timeout() -> float:
+    """ Returns the busy timeout of the connections, read from the environment variable
+
+    Returns
+    -------
+    timeout: float
+        Seconds a statement waits for a lock (BUSY_TIMEOUT when the variable isn't set or isn't a number)
+    """
+    try:
+        return max(0.0, float(os.environ[TIMEOUT_VARIABLE]))
+    except (KeyError, ValueError):
+        return BUSY_TIMEOUT
+
+
+def database_locked(error: sqlite3.OperationalError) -> bool:
+    """ Checks if the error was raised because the database was locked by another connection
+
+    Parameters
+    ----------
+    error: OperationalError
+        Error raised by sqlite3
+
+    Returns
+    -------
+    locked: bool
+        True for the SQLITE_BUSY and SQLITE_LOCKED errors
+    """
+    return str(error).startswith(('database is locked', 'database table is locked', 'database is busy'))
@@ -0,0 +1,91 @@
+""" Module that runs a query in several databases at the same time, merging their rows
+
+Each database is queried by a worker thread with its own read-only connection (sqlite3 releases the GIL while a
+statement runs), so searching many databases takes about as long as the slowest query instead of the sum of all of
+them. The rows of each database must be sorted by the key used to merge them, so the merge (heapq.merge) only keeps one
+row of each database to compare, instead of sorting all the rows again.
+"""
+import os
+import heapq
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Final, Iterable
+
+import codenotes.db.journal as journal
+import codenotes.db.location as location
+from codenotes.db.connection import SQLiteConnection
+
+MAX_WORKERS: Final[int] = 32  # Max number of databases queried at the same time
+
+
+def query_databases(paths: Iterable[str], sql: str, values: tuple[Any, ...],
+                    key: Callable[[tuple], Any]) -> tuple[Iterable[tuple], list[str]]:
+    """ Runs the query in each database concurrently, and merges the rows of all of them
+
+    Parameters
+    ----------
+    paths: Iterable[str]
+        Paths of the databases. The repeated ones are queried once
+
+    sql: str
+        Query, whose rows must be sorted by key
+
+    values: tuple[Any, ...]
+        Values of the query
+
+    key: Callable[[tuple], Any]
+        Function that returns the value of a row (without its database) the rows are sorted by
+
+    Returns
+    -------
+    result: tuple[Iterable[tuple], list[str]]
+        Rows of all the databases sorted by key, each one starting with the path of its database, and the paths of the
+        databases that couldn't be queried
+    """
+    paths = list(dict.fromkeys(paths))
+    failed = []
+
+    def query(path: str) -> list[tuple]:
+        try:
+            db = SQLiteConnection(read_only=True, path=path)
+        except sqlite3.Error:
+            failed.append(path)
+            return []
+
+        try:
+            journal.replay(db)  # The annotations captured in the journal of each database are searched too
+
+            return [(path,) + row for row in db.exec_sql(sql, values).fetchall()]
+        except sqlite3.Error:
+            failed.append(path)
+            return []
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(paths)))) as pool:
+        results = list(pool.map(query, paths))
+
+    return heapq.merge(*results, key=lambda row: key(row[1:])), failed
+
+
+def database_label(path: str) -> str:
+    """ Returns a short name of the database, to display which database a row comes from
+
+    Parameters
+    ----------
+    path: str
+        Path of the database
+
+    Returns
+    -------
+    label: str
+        Name of the directory of the project, default for the database of the package, or the path of the database
+    """
+    directory = os.path.dirname(path)
+
+    if os.path.basename(directory) == location.PROJECT_DIRECTORY:
+        return os.path.basename(os.path.dirname(directory))
+    elif os.path.abspath(path) == location.DEFAULT_PATH:
+        return 'default'
+
+    return path
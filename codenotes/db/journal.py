@@ -0,0 +1,420 @@
+""" Module of the journal, an append-only file where the annotations are captured without opening the database
+
+Capturing an annotation in the journal only costs appending a JSON line (and an fsync, depending on FSYNC_VARIABLE),
+so it doesn't import sqlite3 or rich, and doesn't apply the migrations. The annotations journaled are replayed into the
+database, in one transaction, by the next search (or export, batch, compact). The records have the same fields as the
+ndjson records of import and export.
+
+The journal is locked (flock, where it's available) while a line is appended, and while it's replayed until it's
+truncated, so the annotations appended during a replay aren't lost. If the process is killed between the commit and
+the truncate, the annotations of the journal are replayed twice.
+
+The records are validated like the ones of import (a task needs content, a note a title or content, etc.). The lines
+that can't be replayed are moved to the rejected file (<journal>.rejected) instead of failing the replay, so a bad line
+doesn't block the annotations of the other ones.
+"""
+import os
+import sys
+import json
+import time
+from typing import TYPE_CHECKING, Any, Final, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from codenotes.db.location import MEMORY_DATABASE, database_path as default_database_path
+
+if TYPE_CHECKING:
+    from codenotes.db.connection import SQLiteConnection
+
+
+JOURNAL_SUFFIX: Final[str] = '.journal'
+REJECTED_SUFFIX: Final[str] = '.rejected'  # Appended to the path of the journal
+
+ENABLE_VARIABLE: Final[str] = 'CODENOTES_JOURNAL'  # Environment variable that journals all the add commands
+FSYNC_VARIABLE: Final[str] = 'CODENOTES_JOURNAL_FSYNC'  # always (default) or never
+FSYNC_POLICIES: Final[tuple[str, ...]] = ('always', 'never')
+LOCK_POLL_INTERVAL: Final[float] = 0.01  # Seconds between the attempts to lock the journal, when it's locked
+
+
+def journal_path(database_path: str = None) -> str:
+    """ Returns the path of the journal of the database
+
+    Parameters
+    ----------
+    database_path: str
+        Path of the database (Default the one used by the commands, see codenotes.db.location)
+
+    Returns
+    -------
+    path: str
+        Path of the journal, next to the database
+    """
+    return (database_path or default_database_path()) + JOURNAL_SUFFIX
+
+
+def journal_enabled(journal_flag: bool = False) -> bool:
+    """ Checks if the annotations must be captured in the journal
+
+    Parameters
+    ----------
+    journal_flag: bool
+        Value of the --journal flag
+
+    Returns
+    -------
+    enabled: bool
+        True when the flag is passed or the environment variable is set (and isn't 0), unless the database is in
+        memory, since there's no database to replay the journal into later
+    """
+    if default_database_path() == MEMORY_DATABASE:
+        return False
+
+    return journal_flag or os.environ.get(ENABLE_VARIABLE, '0') not in ('', '0')
+
+
+def fsync_policy() -> str:
+    """ Returns the fsync policy of the journal, read from the environment variable
+
+    Returns
+    -------
+    policy: str
+        always to fsync every append (and truncate), never to leave it to the operating system
+    """
+    policy = os.environ.get(FSYNC_VARIABLE, 'always').strip().lower()
+
+    return policy if policy in FSYNC_POLICIES else 'always'
+
+
+def append(records: Iterable[dict[str, Any]], path: str = None) -> int:
+    """ Appends the records to the journal with a single write
+
+    Parameters
+    ----------
+    records: Iterable[dict[str, Any]]
+        Records of the annotations, with type (task or note) and the fields of their ndjson records
+
+    path: str
+        Path of the journal (Default journal_path())
+
+    Returns
+    -------
+    appended: int
+        Number of records appended
+    """
+    lines = [json.dumps(record, ensure_ascii=False) + '\n' for record in records]
+
+    if not lines:
+        return 0
+
+    descriptor = os.open(path or journal_path(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)  # Waits for a replay in progress
+
+        os.write(descriptor, ''.join(lines).encode('utf-8'))
+
+        if fsync_policy() == 'always':
+            os.fsync(descriptor)
+    finally:
+        os.close(descriptor)  # Also releases the lock
+
+    return len(lines)
+
+
+def pending(path: str = None) -> bool:
+    """ Checks if the journal has records that haven't been replayed, without opening it
+
+    Parameters
+    ----------
+    path: str
+        Path of the journal (Default journal_path())
+
+    Returns
+    -------
+    pending: bool
+        True when the journal isn't empty
+    """
+    try:
+        return os.path.getsize(path or journal_path()) > 0
+    except OSError:
+        return False
+
+
+def replay(db: 'SQLiteConnection', path: str = None) -> int:
+    """ Inserts the records of the journal into the database in one transaction, and truncates the journal
+
+    The journal isn't replayed when the connection is in the middle of a transaction (a batch with deferred commits),
+    since the truncate can't wait for a commit that may be rolled back. With a read-only connection, the journal is
+    replayed by a new read-write connection, which doesn't wait for the locks of the database and the journal: the
+    searches never wait for (or fail because of) the commands that write. When another command holds a lock, the replay
+    is skipped with a warning, and the annotations of the journal are saved by the next search
+
+    Parameters
+    ----------
+    db: SQLiteConnection
+        Connection with the database
+
+    path: str
+        Path of the journal (Default journal_path() of the database)
+
+    Returns
+    -------
+    replayed: int
+        Number of annotations inserted
+    """
+    if db.in_memory:  # The databases in memory don't have a journal
+        return 0
+
+    path = path or journal_path(db.database_path)
+
+    if not pending(path) or db.connection.in_transaction:
+        return 0
+
+    if db.read_only:
+        import sqlite3
+        from codenotes.db.connection import SQLiteConnection, database_locked
+
+        try:
+            writer = SQLiteConnection(path=db.database_path, timeout=0)
+        except sqlite3.OperationalError as error:  # Database locked while its journal mode is set
+            if not database_locked(error):
+                raise
+            return skip_replay()
+
+        try:
+            return replay_locked(writer, path, timeout=0)
+        except BlockingIOError:  # Journal locked by another replay
+            return skip_replay()
+        except sqlite3.OperationalError as error:
+            if not database_locked(error):
+                raise
+            return skip_replay()
+        finally:
+            writer.close()
+
+    return replay_locked(db, path)
+
+
+def skip_replay() -> int:
+    """ Warns that the journal wasn't replayed, because another command holds the lock of the database or the journal
+
+    Returns
+    -------
+    replayed: int
+        Number of annotations inserted, which is 0
+    """
+    print('The annotations of the journal are saved by the next search, the database is locked by another command',
+          file=sys.stderr)
+
+    return 0
+
+
+def replay_locked(db: 'SQLiteConnection', path: str, timeout: float = None) -> int:
+    """ Locks the journal, inserts its records into the database in one transaction and truncates it
+
+    Parameters
+    ----------
+    db: SQLiteConnection
+        Read-write connection with the database
+
+    path: str
+        Path of the journal
+
+    timeout: float
+        Seconds to wait for the lock of the journal, after which BlockingIOError is raised. None waits until the
+        lock is released
+
+    Returns
+    -------
+    replayed: int
+        Number of annotations inserted
+    """
+    with open(path, 'r+', encoding='utf-8') as journal:
+        lock(journal.fileno(), timeout)  # Appends wait until the journal is truncated
+
+        import sqlite3
+
+        replayed = 0
+        rejected = []
+        try:
+            for line in journal:
+                try:
+                    insert(db, parse_record(line))
+                    replayed += 1
+                except (ValueError, TypeError, AttributeError, sqlite3.IntegrityError):
+                    if line.strip():
+                        rejected.append(line if line.endswith('\n') else line + '\n')
+
+            if rejected:  # Saved before the commit, so they can't be lost with the truncate
+                reject(rejected, path)
+
+            db.commit(force=True)
+        except BaseException:
+            db.rollback()
+            raise
+
+        journal.truncate(0)
+
+        if fsync_policy() == 'always':
+            os.fsync(journal.fileno())
+
+    return replayed
+
+
+def lock(descriptor: int, timeout: float = None) -> None:
+    """ Takes the exclusive lock of the journal, when flock is available
+
+    Parameters
+    ----------
+    descriptor: int
+        File descriptor of the journal
+
+    timeout: float
+        Seconds to wait for the lock, after which BlockingIOError is raised. None waits until the lock is released
+    """
+    if fcntl is None:
+        return
+
+    if timeout is None:
+        fcntl.flock(descriptor, fcntl.LOCK_EX)
+        return
+
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                raise
+
+        time.sleep(LOCK_POLL_INTERVAL)
+
+
+def reject(lines: list[str], path: str) -> None:
+    """ Appends the lines that couldn't be replayed to the rejected file of the journal
+
+    Parameters
+    ----------
+    lines: list[str]
+        Lines of the journal, with their line break
+
+    path: str
+        Path of the journal
+    """
+    descriptor = os.open(path + REJECTED_SUFFIX, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(descriptor, ''.join(lines).encode('utf-8'))
+
+        if fsync_policy() == 'always':
+            os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def parse_record(line: str) -> dict[str, Any]:
+    """ Parses a line of the journal, which must have a record
+
+    Parameters
+    ----------
+    line: str
+        JSON line
+
+    Returns
+    -------
+    record: dict[str, Any]
+        Record of the line
+
+    Raises
+    ------
+    ValueError
+        When the line is blank or incomplete (an append interrupted)
+    """
+    record = parse_line(line)
+
+    if record is None:
+        raise ValueError('Line without a record')
+
+    return record
+
+
+def parse_line(line: str) -> Optional[dict[str, Any]]:
+    """ Parses a line of the journal
+
+    Parameters
+    ----------
+    line: str
+        JSON line
+
+    Returns
+    -------
+    record: Optional[dict[str, Any]]
+        Record of the line, or None when it's blank or incomplete (an append interrupted)
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+
+    return record if isinstance(record, dict) else None
+
+
+def insert(db: 'SQLiteConnection', record: dict[str, Any]) -> None:
+    """ Validates the record, like import does, and inserts its annotation in the current transaction
+
+    Parameters
+    ----------
+    db: SQLiteConnection
+        Connection with the database
+
+    record: dict[str, Any]
+        Record with type, content, creation and category, and title (notes)
+
+    Raises
+    ------
+    ValueError
+        When the record isn't a task or note, or its fields aren't valid (no content, a date that can't be parsed, a
+        category name too long, etc.)
+    """
+    import codenotes.db.utilities.notes as notes
+    import codenotes.db.utilities.tasks as tasks
+    import codenotes.db.utilities.notes_categories as notes_categories
+    import codenotes.db.utilities.tasks_categories as tasks_categories
+    from codenotes.cli.importer import MAX_CATEGORY_LENGTH, parse_date
+    from codenotes.db.category_ids import resolve
+
+    category = record.get('category') or None
+
+    if category is not None and (not isinstance(category, str) or len(category) > MAX_CATEGORY_LENGTH):
+        raise ValueError(f'Invalid category: {category}')
+
+    if record.get('type') == 'task':
+        content = (record.get('content') or '').strip()
+
+        if not content:
+            raise ValueError('Task without content')
+
+        creation = parse_date(record.get('creation'))
+        sql = f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, ' \
+              f'{tasks.COLUMN_CATEGORY}) VALUES (?,?,?)'
+
+        db.exec_sql(sql, (content, creation, resolve(db, tasks_categories, category)))
+    elif record.get('type') == 'note':
+        content = record.get('content') or None
+        title = (record.get('title') or (content or '')[:30]).strip()
+
+        if not title:
+            raise ValueError('Note without title and content')
+
+        creation = parse_date(record.get('creation'))
+        sql = f'INSERT INTO {notes.TABLE_NAME} ({notes.COLUMN_TITLE}, {notes.COLUMN_CONTENT}, ' \
+              f'{notes.COLUMN_CATEGORY}, {notes.COLUMN_CREATION}) VALUES (?,?,?,?)'
+
+        db.exec_sql(sql, (title, content, resolve(db, notes_categories, category), creation))
+    else:
+        raise ValueError(f'Invalid type: {record.get("type")}')
+
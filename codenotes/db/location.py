@@ -0,0 +1,166 @@
+""" Module that finds the database used by the commands
+
+The path of the database is taken from the first of these that is set:
+
+1. The --db flag (which main() copies to the environment variable)
+2. The environment variable CODENOTES_DB
+3. The database of the project: .codenotes/codenotes.db in the working directory or any of its parents (created with
+   codenotes init)
+4. The path of the [database] section of the config file ($XDG_CONFIG_HOME/codenotes/config.ini)
+5. codenotes.db in the directory of the package
+
+The path :memory: is a database that only exists while its connection is open, for throwaway scripting sessions (e.g.
+codenotes --db :memory: batch script.txt).
+
+This module only uses os (configparser is imported when the config file exists), since it's imported by the commands
+that don't open the database, like the ones captured in the journal. The databases of the projects are saved in a
+registry, next to the config file, so the commands can find all of them.
+"""
+import os
+from typing import Final, Optional
+
+DEFAULT_PATH: Final[str] = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'codenotes.db')
+DATABASE_VARIABLE: Final[str] = 'CODENOTES_DB'
+CONFIG_VARIABLE: Final[str] = 'CODENOTES_CONFIG_DIR'  # Directory of the config file and the registry
+PROJECT_DIRECTORY: Final[str] = '.codenotes'
+PROJECT_DATABASE: Final[str] = 'codenotes.db'
+CONFIG_FILE: Final[str] = 'config.ini'
+REGISTRY_FILE: Final[str] = 'databases'
+MEMORY_DATABASE: Final[str] = ':memory:'  # Path of the in-memory databases
+
+
+def config_directory() -> str:
+    """ Returns the directory of the config file and the registry
+
+    Returns
+    -------
+    directory: str
+        CODENOTES_CONFIG_DIR, or codenotes in the config directory of the user
+    """
+    if os.environ.get(CONFIG_VARIABLE):
+        return os.environ[CONFIG_VARIABLE]
+
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+
+    return os.path.join(base, 'codenotes')
+
+
+def project_database(cwd: str = None) -> Optional[str]:
+    """ Finds the database of the project, in the working directory or the closest parent that has one
+
+    Parameters
+    ----------
+    cwd: str
+        Directory where the search starts (Default working directory)
+
+    Returns
+    -------
+    path: Optional[str]
+        Path of the database of the project, or None when the directory isn't in a project
+    """
+    directory = os.path.abspath(cwd or os.getcwd())
+
+    while True:
+        path = os.path.join(directory, PROJECT_DIRECTORY, PROJECT_DATABASE)
+
+        if os.path.isfile(path):
+            return path
+
+        parent = os.path.dirname(directory)
+        if parent == directory:  # Root of the file system
+            return None
+
+        directory = parent
+
+
+def configured_database() -> Optional[str]:
+    """ Reads the path of the database of the config file
+
+    Returns
+    -------
+    path: Optional[str]
+        Path of the [database] section (relative paths are relative to the config directory), or None when it isn't
+        configured
+    """
+    config_path = os.path.join(config_directory(), CONFIG_FILE)
+
+    if not os.path.isfile(config_path):
+        return None
+
+    import configparser
+
+    config = configparser.ConfigParser()
+    config.read(config_path, encoding='utf-8')
+    path = config.get('database', 'path', fallback=None)
+
+    if not path:
+        return None
+
+    return os.path.join(config_directory(), os.path.expanduser(path))
+
+
+def database_path(cwd: str = None) -> str:
+    """ Returns the path of the database used by the commands
+
+    Parameters
+    ----------
+    cwd: str
+        Directory where the database of the project is searched (Default working directory)
+
+    Returns
+    -------
+    path: str
+        Absolute path of the database, or MEMORY_DATABASE
+    """
+    path = os.environ.get(DATABASE_VARIABLE) or project_database(cwd) or configured_database() or DEFAULT_PATH
+
+    if path == MEMORY_DATABASE:
+        return path
+
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def registered_databases() -> list[str]:
+    """ Returns the databases of the registry that still exist, and the default one
+
+    Returns
+    -------
+    paths: list[str]
+        Paths of the databases, without repeated ones
+    """
+    paths = [DEFAULT_PATH]
+    configured = configured_database()
+
+    if configured:
+        paths.append(os.path.abspath(configured))
+
+    try:
+        with open(os.path.join(config_directory(), REGISTRY_FILE), encoding='utf-8') as registry:
+            paths.extend(line.strip() for line in registry if line.strip())
+    except OSError:
+        pass
+
+    return [path for path in dict.fromkeys(paths) if os.path.isfile(path)]
+
+
+def register(path: str) -> None:
+    """ Adds the database to the registry, if it isn't in it
+
+    Parameters
+    ----------
+    path: str
+        Path of the database
+    """
+    path = os.path.abspath(path)
+    registry_path = os.path.join(config_directory(), REGISTRY_FILE)
+
+    try:
+        with open(registry_path, encoding='utf-8') as registry:
+            if path in (line.strip() for line in registry):
+                return
+    except OSError:
+        pass
+
+    os.makedirs(config_directory(), exist_ok=True)
+    with open(registry_path, 'a', encoding='utf-8') as registry:
+        registry.write(path + '\n')
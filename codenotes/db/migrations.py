@@ -0,0 +1,243 @@
+""" Module in charge of the versioned schema migrations of the database
+
+Every migration is a numbered step (its position in MIGRATIONS) with the SQL statements that brings the schema from
+the previous version to its own. The version applied to a database is stored in PRAGMA user_version, so an up-to-date
+database only costs one pragma read when the connection is opened. A SQLite without the trigram tokenizer skips the
+trigram tables, and marks user_version with TRIGRAM_MISSING, so they are created when a SQLite that has it opens the
+database.
+"""
+import sqlite3
+from sqlite3.dbapi2 import Connection
+from typing import Final, Text
+
+import codenotes.db.utilities.notes as notes
+import codenotes.db.utilities.changes as changes
+import codenotes.db.utilities.change_log as change_log
+import codenotes.db.utilities.tasks as tasks
+import codenotes.db.utilities.tasks_categories as tasks_categories
+import codenotes.db.utilities.notes_categories as notes_categories
+
+
+TRIGRAM_SUPPORTED: Final[bool] = sqlite3.sqlite_version_info >= (3, 34, 0)  # FTS5 trigram tokenizer
+TRIGRAM_MISSING: Final[int] = 1 << 16  # Flag of user_version, set when the database doesn't have the trigram tables
+
+# Trigram indexes for substring and fuzzy searches, with the backfill of the existing rows
+TRIGRAM_STATEMENTS: Final[tuple[Text, ...]] = (
+    notes.CREATE_TRIGRAM_TABLE,
+    notes.CREATE_TRIGRAM_INSERT_TRIGGER,
+    notes.CREATE_TRIGRAM_DELETE_TRIGGER,
+    notes.CREATE_TRIGRAM_UPDATE_TRIGGER,
+    notes.REBUILD_TRIGRAM_TABLE,
+    tasks.CREATE_TRIGRAM_TABLE,
+    tasks.CREATE_TRIGRAM_INSERT_TRIGGER,
+    tasks.CREATE_TRIGRAM_DELETE_TRIGGER,
+    tasks.CREATE_TRIGRAM_UPDATE_TRIGGER,
+    tasks.REBUILD_TRIGRAM_TABLE
+)
+
+MIGRATIONS: Final[list[tuple[Text, ...]]] = [
+    # 1: Initial schema with default categories
+    (
+        notes_categories.CREATE_TABLE,
+        notes_categories.INSERT_DEFAULT_CATEGORY,
+        notes.CREATE_TABLE,
+        tasks_categories.CREATE_TABLE,
+        tasks_categories.INSERT_DEFAULT_CATEGORY,
+        tasks.CREATE_TABLE
+    ),
+    # 2: Indexes used by the date searches and the joins with the categories
+    (
+        notes.CREATE_INDEX_CREATION,
+        notes.CREATE_INDEX_CATEGORY,
+        tasks.CREATE_INDEX_CREATION,
+        tasks.CREATE_INDEX_CATEGORY
+    ),
+    # 3: Full-text search tables kept in sync by triggers, with the backfill of the existing rows
+    (
+        notes.CREATE_FTS_TABLE,
+        notes.CREATE_FTS_INSERT_TRIGGER,
+        notes.CREATE_FTS_DELETE_TRIGGER,
+        notes.CREATE_FTS_UPDATE_TRIGGER,
+        notes.REBUILD_FTS_TABLE,
+        tasks.CREATE_FTS_TABLE,
+        tasks.CREATE_FTS_INSERT_TRIGGER,
+        tasks.CREATE_FTS_DELETE_TRIGGER,
+        tasks.CREATE_FTS_UPDATE_TRIGGER,
+        tasks.REBUILD_FTS_TABLE
+    ),
+    # 4: Trigram indexes. Skipped when SQLite doesn't have the trigram tokenizer (created later by migrate, once it has,
+    # from the flag TRIGRAM_MISSING)
+    TRIGRAM_STATEMENTS if TRIGRAM_SUPPORTED else (),
+    # 5: Timestamp of the last change of each row, kept by triggers, used by the incremental exports
+    tuple(
+        statement
+        for utilities in (notes_categories, notes, tasks_categories, tasks)
+        for statement in (
+            utilities.ADD_COLUMN_UPDATED,
+            utilities.BACKFILL_UPDATED,
+            utilities.CREATE_INDEX_UPDATED,
+            utilities.CREATE_UPDATED_INSERT_TRIGGER,
+            utilities.CREATE_UPDATED_UPDATE_TRIGGER
+        )
+    ),
+    # 6: Unique category names. The annotations of the repeated categories are moved to the first one of each name
+    (
+        notes.MERGE_DUPLICATE_CATEGORIES,
+        notes_categories.DELETE_DUPLICATE_CATEGORIES,
+        notes_categories.CREATE_UNIQUE_INDEX_NAME,
+        tasks.MERGE_DUPLICATE_CATEGORIES,
+        tasks_categories.DELETE_DUPLICATE_CATEGORIES,
+        tasks_categories.CREATE_UNIQUE_INDEX_NAME
+    ),
+    # 7: Counter of changes (with a random generation), increased by triggers, that invalidates the cached search
+    # results
+    (
+        changes.CREATE_TABLE,
+        changes.INSERT_COUNTER,
+        *(
+            changes.count_trigger(utilities.TABLE_NAME, event)
+            for utilities in (notes_categories, notes, tasks_categories, tasks)
+            for event in changes.EVENTS
+        )
+    ),
+    # 8: Log of the last change of each row, numbered in the order of the commits, used by the incremental exports
+    (
+        change_log.CREATE_TABLE,
+        change_log.CREATE_INDEX_SEQUENCE,
+        *(
+            statement
+            for utilities in (notes_categories, notes, tasks_categories, tasks)
+            for statement in (
+                change_log.backfill(utilities.TABLE_NAME, utilities.COLUMN_ID, utilities.COLUMN_UPDATED),
+                change_log.log_trigger(utilities.TABLE_NAME, utilities.COLUMN_ID, 'INSERT'),
+                change_log.log_trigger(utilities.TABLE_NAME, utilities.COLUMN_ID, 'UPDATE'),
+                change_log.delete_trigger(utilities.TABLE_NAME, utilities.COLUMN_ID)
+            )
+        )
+    ),
+    # 9: No statements. The databases migrated by an older SQLite before the flag TRIGRAM_MISSING existed are checked
+    # once more, so their trigram tables are created (or the flag is set)
+    (),
+]
+
+SCHEMA_VERSION: Final[int] = len(MIGRATIONS)
+
+
+def schema_version(connection: Connection) -> int:
+    """ Returns the schema version applied to the database
+
+    Parameters
+    ----------
+    connection: Connection
+        Connection with the database
+
+    Returns
+    -------
+    version: int
+        Value stored in PRAGMA user_version, without the flag TRIGRAM_MISSING
+    """
+    return connection.execute('PRAGMA user_version').fetchone()[0] & ~TRIGRAM_MISSING
+
+
+def outdated(connection: Connection) -> bool:
+    """ Checks if the database must be migrated: its schema is older, or it doesn't have the trigram tables and this
+    SQLite can create them. It only costs one pragma read
+
+    Parameters
+    ----------
+    connection: Connection
+        Connection with the database
+
+    Returns
+    -------
+    outdated: bool
+        True when migrate has to run
+    """
+    user_version = connection.execute('PRAGMA user_version').fetchone()[0]
+
+    if user_version & ~TRIGRAM_MISSING < SCHEMA_VERSION:
+        return True
+
+    return TRIGRAM_SUPPORTED and bool(user_version & TRIGRAM_MISSING)
+
+
+def trigram_tables(connection: Connection) -> bool:
+    """ Checks if the database has the trigram tables, which are missing when it was migrated by a SQLite without the
+    trigram tokenizer
+
+    Parameters
+    ----------
+    connection: Connection
+        Connection with the database
+
+    Returns
+    -------
+    found: bool
+        True when both trigram tables exist
+    """
+    found = connection.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+        (notes.TRIGRAM_TABLE_NAME, tasks.TRIGRAM_TABLE_NAME)
+    ).fetchone()[0]
+
+    return found == 2
+
+
+def trigram_search(connection: Connection) -> bool:
+    """ Checks if the trigram tables can be searched: SQLite has the trigram tokenizer and the database has the tables
+
+    Parameters
+    ----------
+    connection: Connection
+        Connection with the database
+
+    Returns
+    -------
+    searchable: bool
+        True when the fuzzy searches can use the trigram tables
+    """
+    return TRIGRAM_SUPPORTED and trigram_tables(connection)
+
+
+def migrate(connection: Connection) -> int:
+    """ Applies the migrations that are missing in the database
+
+    The missing steps run in a single transaction together with the update of user_version, so a failed step leaves
+    the database in the version it had. The transaction is taken with BEGIN IMMEDIATE and the version is read again
+    inside it, in case another process migrated the database in the meantime. Then, the trigram tables skipped by an
+    older SQLite are created, when this one has the trigram tokenizer, or the flag TRIGRAM_MISSING is set
+
+    Parameters
+    ----------
+    connection: Connection
+        Connection with the database
+
+    Returns
+    -------
+    applied: int
+        Number of migrations applied
+    """
+    applied = 0
+
+    if outdated(connection):
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for version in range(schema_version(connection), SCHEMA_VERSION):
+                for statement in MIGRATIONS[version]:
+                    connection.execute(statement)
+
+                applied += 1
+
+            if TRIGRAM_SUPPORTED and not trigram_tables(connection):
+                for statement in TRIGRAM_STATEMENTS:
+                    connection.execute(statement)
+
+            flag = 0 if trigram_tables(connection) else TRIGRAM_MISSING
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION | flag}')
+            connection.commit()
+
+        except BaseException:
+            connection.rollback()
+            raise
+
+    return applied
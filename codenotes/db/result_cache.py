@@ -0,0 +1,287 @@
+""" Module of the cache of the search results, saved on disk next to the database
+
+The same searches are run many times (e.g. search task --week from a prompt or a status bar) while the annotations
+rarely change. Each result is saved in a file of the cache directory (<database>.cache), named by the hash of the query
+and the counter of changes of the database and its generation (see codenotes.db.utilities.changes), so a change of the
+annotations makes all the results saved before it unreachable, without deleting them. A repeated search only reads the
+counter and the files, instead of running the query and sorting its rows again.
+
+The last counter seen is saved in the cache directory too. When the database has another generation (it was deleted and
+created again) or its counter went down (a backup was restored), the cache is cleared, since the counter will repeat
+values whose results were saved for other annotations.
+
+The cache is bounded: when it's bigger than MAX_SIZE bytes or has more than MAX_ENTRIES results, the least recently
+used ones (by the modification time of their files, updated on every hit) are deleted. Set CODENOTES_CACHE=0 to disable
+it.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import tempfile
+from typing import TYPE_CHECKING, Callable, Final, Optional
+
+import codenotes.db.utilities.changes as changes
+
+if TYPE_CHECKING:
+    from codenotes.db.connection import SQLiteConnection
+
+CACHE_SUFFIX: Final[str] = '.cache'
+CACHE_VARIABLE: Final[str] = 'CODENOTES_CACHE'  # Environment variable that disables the cache with 0
+ENTRY_SUFFIX: Final[str] = '.json'
+STATE_FILE: Final[str] = 'counter'  # Last counter of changes (and its generation) seen by the cache
+MAX_ENTRIES: Final[int] = 256
+MAX_SIZE: Final[int] = 8 * 1024 * 1024  # Bytes of all the results saved
+
+
+def cache_enabled() -> bool:
+    """ Checks if the search results are cached
+
+    Returns
+    -------
+    enabled: bool
+        False when the environment variable is 0
+    """
+    return os.environ.get(CACHE_VARIABLE, '1') != '0'
+
+
+def cache_directory(database_path: str) -> str:
+    """ Returns the directory where the results of the searches in the database are saved
+
+    Parameters
+    ----------
+    database_path: str
+        Path of the database
+
+    Returns
+    -------
+    directory: str
+        Path of the cache directory, next to the database
+    """
+    return database_path + CACHE_SUFFIX
+
+
+def change_count(db: 'SQLiteConnection') -> Optional[tuple[int, str]]:
+    """ Returns the counter of changes of the database
+
+    Parameters
+    ----------
+    db: SQLiteConnection
+        Connection with the database
+
+    Returns
+    -------
+    count: Optional[tuple[int, str]]
+        Number of changes and generation of the counter, or None when the database doesn't have the counter
+    """
+    try:
+        found = db.exec_sql(changes.SELECT_COUNT).fetchone()
+    except sqlite3.OperationalError:  # Schema older than the counter, opened by a read-only connection
+        return None
+
+    return (found[0], found[1]) if found and found[1] else None
+
+
+def check_counter(directory: str, count: tuple[int, str]) -> None:
+    """ Clears the cache when the counter of changes isn't after the one seen before (another generation, or a lower
+    count), and saves the counter
+
+    Parameters
+    ----------
+    directory: str
+        Cache directory
+
+    count: tuple[int, str]
+        Number of changes and generation of the counter of the database
+    """
+    path = os.path.join(directory, STATE_FILE)
+
+    try:
+        with open(path, encoding='utf-8') as state:
+            seen_count, seen_generation = json.load(state)
+    except (OSError, ValueError, TypeError):  # First search, or an unreadable state
+        seen_count, seen_generation = None, None
+
+    if (seen_count, seen_generation) == count:
+        return
+
+    if seen_generation != count[1] or seen_count > count[0]:
+        clear_directory(directory)
+
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as state:
+            json.dump(count, state)
+
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def fetch(db: 'SQLiteConnection', key: tuple, query: Callable[[], list[tuple]]) -> list[tuple]:
+    """ Returns the rows of the query saved in the cache, or runs the query and saves its rows
+
+    Parameters
+    ----------
+    db: SQLiteConnection
+        Connection with the database
+
+    key: tuple
+        Values that identify the query and its result (e.g. its sql and values). They must be JSON serializable,
+        dates are converted to text
+
+    query: Callable[[], list[tuple]]
+        Function that runs the query, when its result isn't saved
+
+    Returns
+    -------
+    rows: list[tuple]
+        Rows of the query
+    """
+    # Inside a transaction, the counter can reach the value of changes that are rolled back later
+    if db.in_memory or db.connection.in_transaction or not cache_enabled():
+        return query()
+
+    count = change_count(db)  # Read before the query, so the rows saved can't be older than the counter
+
+    if count is None:
+        return query()
+
+    digest = hashlib.sha256(json.dumps([*count, *key], default=str).encode('utf-8')).hexdigest()
+    directory = cache_directory(db.database_path)
+    path = os.path.join(directory, digest + ENTRY_SUFFIX)
+
+    try:
+        check_counter(directory, count)
+    except OSError:  # The cache can't be checked, so it isn't used
+        return query()
+
+    try:
+        with open(path, encoding='utf-8') as entry:
+            rows = [tuple(row) for row in json.load(entry)]
+
+        os.utime(path)  # Most recently used
+        return rows
+    except (OSError, ValueError):
+        pass
+
+    rows = query()
+
+    try:
+        save(directory, path, rows)
+    except (OSError, TypeError, ValueError):  # The cache can't be written, or the rows aren't JSON serializable
+        pass
+
+    return rows
+
+
+def save(directory: str, path: str, rows: list, max_entries: int = MAX_ENTRIES, max_size: int = MAX_SIZE) -> None:
+    """ Saves the rows in the file of the cache (through a temporary file, so a concurrent search never reads half of
+    it), and evicts the least recently used results when the cache is full
+
+    Parameters
+    ----------
+    directory: str
+        Cache directory
+
+    path: str
+        Path of the file of the result
+
+    rows: list
+        Rows of the result
+
+    max_entries: int
+        Maximum number of results of the cache
+
+    max_size: int
+        Maximum number of bytes of all the results of the cache
+    """
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as entry:
+            json.dump(rows, entry, ensure_ascii=False)
+
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+    evict(directory, max_entries, max_size)
+
+
+def evict(directory: str, max_entries: int = MAX_ENTRIES, max_size: int = MAX_SIZE) -> int:
+    """ Deletes the least recently used results until the cache is within its bounds
+
+    Parameters
+    ----------
+    directory: str
+        Cache directory
+
+    max_entries: int
+        Maximum number of results
+
+    max_size: int
+        Maximum number of bytes of all the results
+
+    Returns
+    -------
+    evicted: int
+        Number of results deleted
+    """
+    entries: list[tuple[float, int, str]] = []
+
+    with os.scandir(directory) as scanned:
+        for entry in scanned:
+            if entry.name.endswith(ENTRY_SUFFIX):
+                try:
+                    status = entry.stat()
+                except FileNotFoundError:  # Evicted by another search
+                    continue
+
+                entries.append((status.st_mtime, status.st_size, entry.path))
+
+    size = sum(entry_size for _, entry_size, _ in entries)
+    evicted = 0
+
+    for _, entry_size, path in sorted(entries):
+        if len(entries) - evicted <= max_entries and size <= max_size:
+            break
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        size -= entry_size
+        evicted += 1
+
+    return evicted
+
+
+def clear(database_path: str) -> None:
+    """ Deletes the cache of the database
+
+    Parameters
+    ----------
+    database_path: str
+        Path of the database
+    """
+    clear_directory(cache_directory(database_path))
+
+
+def clear_directory(directory: str) -> None:
+    """ Deletes the cache directory
+
+    Parameters
+    ----------
+    directory: str
+        Cache directory
+    """
+    import shutil
+
+    shutil.rmtree(directory, ignore_errors=True)
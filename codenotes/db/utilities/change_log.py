@@ -0,0 +1,106 @@
+""" Utility module with the statements of the change log, which has the last change of each row of the annotations and
+their categories, numbered by a sequence. Only one connection writes at a time, so the sequence follows the order of the
+commits: a row committed after an export always has a number greater than the ones the export read, even if its
+statement ran (and its timestamp was taken) before. The incremental exports use it instead of the timestamps
+"""
+from typing import Final, Text
+
+TABLE_NAME: Final[str] = 'cn_change_log'
+
+COLUMN_SEQUENCE: Final[str] = 'cn_change_sequence'
+COLUMN_TABLE: Final[str] = 'cn_change_table'
+COLUMN_ROW: Final[str] = 'cn_change_row'
+
+# AUTOINCREMENT, so the numbers of the rows deleted are never used again
+CREATE_TABLE: Final[Text] = f'CREATE TABLE IF NOT EXISTS {TABLE_NAME} ({COLUMN_SEQUENCE} INTEGER PRIMARY KEY ' \
+                            f'AUTOINCREMENT, {COLUMN_TABLE} TEXT NOT NULL, {COLUMN_ROW} INTEGER NOT NULL, ' \
+                            f'UNIQUE ({COLUMN_TABLE}, {COLUMN_ROW}));'
+
+CREATE_INDEX_SEQUENCE: Final[Text] = f'CREATE INDEX IF NOT EXISTS {TABLE_NAME}_sequence_idx ON {TABLE_NAME} ' \
+                                     f'({COLUMN_TABLE}, {COLUMN_SEQUENCE});'
+
+SELECT_LAST_SEQUENCE: Final[Text] = f'SELECT COALESCE(MAX({COLUMN_SEQUENCE}), 0) FROM {TABLE_NAME}'
+
+
+def backfill(table: str, column_id: str, column_updated: str) -> Text:
+    """ Returns the statement that logs the rows stored before the change log was created, in the order of their last
+    change
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    column_id: str
+        Integer primary key of table
+    column_updated: str
+        Timestamp column of table
+
+    Returns
+    -------
+    sql: Text
+        INSERT statement
+    """
+    return f"INSERT OR IGNORE INTO {TABLE_NAME} ({COLUMN_TABLE}, {COLUMN_ROW}) SELECT '{table}', {column_id} FROM " \
+           f'{table} ORDER BY {column_updated}, {column_id};'
+
+
+def log_trigger(table: str, column_id: str, event: str) -> Text:
+    """ Returns the statement that creates the trigger which moves a row inserted or updated to the end of the log. The
+    entry is deleted and inserted again (instead of INSERT OR REPLACE), so the conflict clause of the statement that
+    fires the trigger can't turn it into an ignore
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    column_id: str
+        Integer primary key of table
+    event: str
+        INSERT or UPDATE
+
+    Returns
+    -------
+    sql: Text
+        CREATE TRIGGER statement
+    """
+    return f'CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_log AFTER {event} ON {table} BEGIN DELETE FROM ' \
+           f"{TABLE_NAME} WHERE {COLUMN_TABLE} = '{table}' AND {COLUMN_ROW} = new.{column_id}; INSERT INTO " \
+           f"{TABLE_NAME} ({COLUMN_TABLE}, {COLUMN_ROW}) VALUES ('{table}', new.{column_id}); END;"
+
+
+def delete_trigger(table: str, column_id: str) -> Text:
+    """ Returns the statement that creates the trigger which removes the rows deleted from the log
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    column_id: str
+        Integer primary key of table
+
+    Returns
+    -------
+    sql: Text
+        CREATE TRIGGER statement
+    """
+    return f'CREATE TRIGGER IF NOT EXISTS {table}_delete_log AFTER DELETE ON {table} BEGIN DELETE FROM {TABLE_NAME} ' \
+           f"WHERE {COLUMN_TABLE} = '{table}' AND {COLUMN_ROW} = old.{column_id}; END;"
+
+
+def changed_condition(table: str, column_id: str) -> Text:
+    """ Returns the condition that filters the rows of table changed after a number of the sequence
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    column_id: str
+        Integer primary key of table, qualified when the query has joins
+
+    Returns
+    -------
+    condition: Text
+        IN condition with one placeholder, the last number of the sequence read by the previous export
+    """
+    return f"{column_id} IN (SELECT {COLUMN_ROW} FROM {TABLE_NAME} WHERE {COLUMN_TABLE} = '{table}' AND " \
+           f'{COLUMN_SEQUENCE} > ?)'
@@ -0,0 +1,41 @@
+""" Utility module with the statements of the counter of changes, which is increased by any change of the annotations
+or their categories. The cached search results (see codenotes.db.result_cache) are valid while it doesn't change. The
+counter has a random generation, set when the table is created, so a database deleted and created again (whose counter
+repeats the same values) doesn't reach the results of the previous one
+"""
+from typing import Final, Text
+
+TABLE_NAME: Final[str] = 'cn_changes'
+
+COLUMN_ID: Final[str] = 'cn_change_id'
+COLUMN_COUNT: Final[str] = 'cn_change_count'
+COLUMN_GENERATION: Final[str] = 'cn_change_generation'
+
+EVENTS: Final[tuple[str, ...]] = ('INSERT', 'UPDATE', 'DELETE')
+
+CREATE_TABLE: Final[Text] = f'CREATE TABLE IF NOT EXISTS {TABLE_NAME} ({COLUMN_ID} INTEGER PRIMARY KEY CHECK ' \
+                            f'({COLUMN_ID} = 1), {COLUMN_COUNT} INTEGER NOT NULL DEFAULT 0, {COLUMN_GENERATION} TEXT);'
+
+INSERT_COUNTER: Final[Text] = f'INSERT OR IGNORE INTO {TABLE_NAME} ({COLUMN_ID}, {COLUMN_COUNT}, ' \
+                              f'{COLUMN_GENERATION}) VALUES (1, 0, lower(hex(randomblob(16))));'
+
+SELECT_COUNT: Final[Text] = f'SELECT {COLUMN_COUNT}, {COLUMN_GENERATION} FROM {TABLE_NAME} WHERE {COLUMN_ID} = 1'
+
+
+def count_trigger(table: str, event: str) -> Text:
+    """ Returns the statement that creates the trigger which increases the counter when the rows of table change
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    event: str
+        One of EVENTS
+
+    Returns
+    -------
+    sql: Text
+        CREATE TRIGGER statement
+    """
+    return f'CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_count AFTER {event} ON {table} BEGIN UPDATE ' \
+           f'{TABLE_NAME} SET {COLUMN_COUNT} = {COLUMN_COUNT} + 1 WHERE {COLUMN_ID} = 1; END;'
@@ -0,0 +1,132 @@
+""" Utility module with the statements of the full-text (FTS5) tables that index the content of another table """
+from typing import Text
+
+
+def create_table(fts_table: str, table: str, column_id: str, columns: tuple[str, ...], tokenize: str = None) -> Text:
+    """ Returns the statement that creates an external content FTS5 table, which indexes columns of table
+
+    Parameters
+    ----------
+    fts_table: str
+        Name of the FTS5 table
+    table: str
+        Name of the table indexed
+    column_id: str
+        Integer primary key of table, used as rowid of the FTS5 table
+    columns: tuple[str, ...]
+        Columns of table that are indexed
+    tokenize: str
+        Tokenizer of the FTS5 table. When it's not specified, FTS5 uses unicode61
+
+    Returns
+    -------
+    sql: Text
+        CREATE VIRTUAL TABLE statement
+    """
+    options = f"content='{table}', content_rowid='{column_id}'"
+
+    if tokenize is not None:
+        options += f", tokenize='{tokenize}'"
+
+    return f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5({", ".join(columns)}, {options});'
+
+
+def insert_trigger(fts_table: str, table: str, column_id: str, columns: tuple[str, ...]) -> Text:
+    """ Returns the statement that creates the trigger which indexes the rows inserted in table
+
+    Parameters
+    ----------
+    fts_table: str
+        Name of the FTS5 table
+    table: str
+        Name of the table indexed
+    column_id: str
+        Integer primary key of table
+    columns: tuple[str, ...]
+        Columns of table that are indexed
+
+    Returns
+    -------
+    sql: Text
+        CREATE TRIGGER statement
+    """
+    return f'CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table} BEGIN ' \
+           f'{_insert_row(fts_table, column_id, columns)} END;'
+
+
+def delete_trigger(fts_table: str, table: str, column_id: str, columns: tuple[str, ...]) -> Text:
+    """ Returns the statement that creates the trigger which removes from the index the rows deleted from table
+
+    Parameters
+    ----------
+    fts_table: str
+        Name of the FTS5 table
+    table: str
+        Name of the table indexed
+    column_id: str
+        Integer primary key of table
+    columns: tuple[str, ...]
+        Columns of table that are indexed
+
+    Returns
+    -------
+    sql: Text
+        CREATE TRIGGER statement
+    """
+    return f'CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table} BEGIN ' \
+           f'{_delete_row(fts_table, column_id, columns)} END;'
+
+
+def update_trigger(fts_table: str, table: str, column_id: str, columns: tuple[str, ...]) -> Text:
+    """ Returns the statement that creates the trigger which indexes again the rows of table whose indexed columns are
+    updated
+
+    Parameters
+    ----------
+    fts_table: str
+        Name of the FTS5 table
+    table: str
+        Name of the table indexed
+    column_id: str
+        Integer primary key of table
+    columns: tuple[str, ...]
+        Columns of table that are indexed
+
+    Returns
+    -------
+    sql: Text
+        CREATE TRIGGER statement
+    """
+    return f'CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {", ".join(columns)} ON {table} ' \
+           f'BEGIN {_delete_row(fts_table, column_id, columns)} {_insert_row(fts_table, column_id, columns)} END;'
+
+
+def rebuild(fts_table: str) -> Text:
+    """ Returns the statement that indexes again all the rows of the table indexed by the FTS5 table
+
+    Parameters
+    ----------
+    fts_table: str
+        Name of the FTS5 table
+
+    Returns
+    -------
+    sql: Text
+        INSERT statement with the 'rebuild' command
+    """
+    return f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild');"
+
+
+def _insert_row(fts_table: str, column_id: str, columns: tuple[str, ...]) -> Text:
+    """ Returns the statement, used inside a trigger, that indexes the new row """
+    values = ', '.join(f'new.{column}' for column in columns)
+
+    return f'INSERT INTO {fts_table} (rowid, {", ".join(columns)}) VALUES (new.{column_id}, {values});'
+
+
+def _delete_row(fts_table: str, column_id: str, columns: tuple[str, ...]) -> Text:
+    """ Returns the statement, used inside a trigger, that removes the old row from the index """
+    values = ', '.join(f'old.{column}' for column in columns)
+
+    return f"INSERT INTO {fts_table} ({fts_table}, rowid, {', '.join(columns)}) VALUES ('delete', old.{column_id}, " \
+           f"{values});"
@@ -1,6 +1,8 @@
 """ Utility module with the statements and names related with notes table """
 from typing import Final, Text
 
+import codenotes.db.utilities.fts as fts
+import codenotes.db.utilities.timestamps as timestamps
 import codenotes.db.utilities.notes_categories as categories
 
 TABLE_NAME: Final[str] = 'cn_notes'
@@ -11,9 +13,57 @@ COLUMN_CONTENT: Final[str] = 'cn_note_content'
 COLUMN_CATEGORY: Final[str] = 'cn_note_category'
 COLUMN_README: Final[str] = 'cn_note_readme'
 COLUMN_CREATION: Final[str] = 'cn_note_creation'
+COLUMN_UPDATED: Final[str] = 'cn_note_updated'
 
 CREATE_TABLE: Final[Text] = f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ({COLUMN_ID} INTEGER PRIMARY KEY " \
                             f"AUTOINCREMENT NULL, {COLUMN_TITLE} NVARCHAR(30) NOT NULL, {COLUMN_CONTENT} " \
                             f"TEXT NULL, {COLUMN_CATEGORY} INTEGER NOT NULL, {COLUMN_README} INTEGER NULL DEFAULT 0" \
                             f", {COLUMN_CREATION} DATE NOT NULL, FOREIGN KEY({COLUMN_CATEGORY}) " \
                             f"REFERENCES {categories.TABLE_NAME}({categories.COLUMN_ID}));"
+
+CREATE_INDEX_CREATION: Final[Text] = f'CREATE INDEX IF NOT EXISTS {TABLE_NAME}_creation_idx ON {TABLE_NAME} ' \
+                                     f'({COLUMN_CREATION});'
+
+CREATE_INDEX_CATEGORY: Final[Text] = f'CREATE INDEX IF NOT EXISTS {TABLE_NAME}_category_idx ON {TABLE_NAME} ' \
+                                     f'({COLUMN_CATEGORY}, {COLUMN_CREATION});'
+
+# Moves the annotations of the categories with a repeated name to the one with the lowest id
+MERGE_DUPLICATE_CATEGORIES: Final[Text] = f'UPDATE {TABLE_NAME} SET {COLUMN_CATEGORY} = (SELECT MIN(kept.' \
+                                          f'{categories.COLUMN_ID}) FROM {categories.TABLE_NAME} AS kept JOIN ' \
+                                          f'{categories.TABLE_NAME} AS current ON kept.{categories.COLUMN_NAME} = ' \
+                                          f'current.{categories.COLUMN_NAME} WHERE current.{categories.COLUMN_ID} = ' \
+                                          f'{TABLE_NAME}.{COLUMN_CATEGORY}) WHERE {COLUMN_CATEGORY} IN (SELECT ' \
+                                          f'repeated.{categories.COLUMN_ID} FROM {categories.TABLE_NAME} AS ' \
+                                          f'repeated WHERE EXISTS (SELECT 1 FROM {categories.TABLE_NAME} AS kept ' \
+                                          f'WHERE kept.{categories.COLUMN_NAME} = repeated.{categories.COLUMN_NAME} ' \
+                                          f'AND kept.{categories.COLUMN_ID} < repeated.{categories.COLUMN_ID}));'
+
+ADD_COLUMN_UPDATED: Final[Text] = timestamps.add_column(TABLE_NAME, COLUMN_UPDATED)
+BACKFILL_UPDATED: Final[Text] = timestamps.backfill(TABLE_NAME, COLUMN_UPDATED)
+CREATE_INDEX_UPDATED: Final[Text] = timestamps.create_index(TABLE_NAME, COLUMN_UPDATED)
+CREATE_UPDATED_INSERT_TRIGGER: Final[Text] = timestamps.insert_trigger(TABLE_NAME, COLUMN_ID, COLUMN_UPDATED)
+CREATE_UPDATED_UPDATE_TRIGGER: Final[Text] = timestamps.update_trigger(TABLE_NAME, COLUMN_ID, COLUMN_UPDATED)
+
+FTS_TABLE_NAME: Final[str] = 'cn_notes_fts'
+
+FTS_COLUMNS: Final[tuple[str, ...]] = (COLUMN_TITLE, COLUMN_CONTENT)
+
+CREATE_FTS_TABLE: Final[Text] = fts.create_table(FTS_TABLE_NAME, TABLE_NAME, COLUMN_ID, FTS_COLUMNS)
+CREATE_FTS_INSERT_TRIGGER: Final[Text] = fts.insert_trigger(FTS_TABLE_NAME, TABLE_NAME, COLUMN_ID, FTS_COLUMNS)
+CREATE_FTS_DELETE_TRIGGER: Final[Text] = fts.delete_trigger(FTS_TABLE_NAME, TABLE_NAME, COLUMN_ID, FTS_COLUMNS)
+CREATE_FTS_UPDATE_TRIGGER: Final[Text] = fts.update_trigger(FTS_TABLE_NAME, TABLE_NAME, COLUMN_ID, FTS_COLUMNS)
+REBUILD_FTS_TABLE: Final[Text] = fts.rebuild(FTS_TABLE_NAME)
+
+TRIGRAM_TABLE_NAME: Final[str] = 'cn_notes_trigram'
+
+TRIGRAM_COLUMNS: Final[tuple[str, ...]] = (COLUMN_TITLE,)
+
+CREATE_TRIGRAM_TABLE: Final[Text] = fts.create_table(TRIGRAM_TABLE_NAME, TABLE_NAME, COLUMN_ID, TRIGRAM_COLUMNS,
+                                                     'trigram')
+CREATE_TRIGRAM_INSERT_TRIGGER: Final[Text] = fts.insert_trigger(TRIGRAM_TABLE_NAME, TABLE_NAME, COLUMN_ID,
+                                                                 TRIGRAM_COLUMNS)
+CREATE_TRIGRAM_DELETE_TRIGGER: Final[Text] = fts.delete_trigger(TRIGRAM_TABLE_NAME, TABLE_NAME, COLUMN_ID,
+                                                                 TRIGRAM_COLUMNS)
+CREATE_TRIGRAM_UPDATE_TRIGGER: Final[Text] = fts.update_trigger(TRIGRAM_TABLE_NAME, TABLE_NAME, COLUMN_ID,
+                                                                 TRIGRAM_COLUMNS)
+REBUILD_TRIGRAM_TABLE: Final[Text] = fts.rebuild(TRIGRAM_TABLE_NAME)
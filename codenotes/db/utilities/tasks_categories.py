@@ -1,13 +1,37 @@
 """ Utility module with the statements and names related with task notes table """
 from typing import Final, Text
 
+import codenotes.db.utilities.timestamps as timestamps
+
 TABLE_NAME: Final[str] = 'cn_tasks_categories'
 
 COLUMN_ID: Final[str] = 'cn_tasks_category_id'
 COLUMN_NAME: Final[str] = 'cn_tasks_category_name'
+COLUMN_UPDATED: Final[str] = 'cn_tasks_category_updated'
 
 CREATE_TABLE: Final[Text] = f'CREATE TABLE IF NOT EXISTS {TABLE_NAME} ({COLUMN_ID} INTEGER ' \
                                      f'PRIMARY KEY AUTOINCREMENT NULL, {COLUMN_NAME} NVARCHAR(30) NOT NULL);'
 
 INSERT_DEFAULT_CATEGORY: Final[Text] = f'INSERT INTO {TABLE_NAME} ({COLUMN_NAME}) SELECT "TODO Tasks" WHERE NOT ' \
                                  f'EXISTS(SELECT 1 FROM {TABLE_NAME} WHERE {COLUMN_ID} = 1); '
+
+# Keeps the category with the lowest id of each name. The annotations are moved to it first (see tasks.MERGE_DUPLICATE_CATEGORIES)
+DELETE_DUPLICATE_CATEGORIES: Final[Text] = f'DELETE FROM {TABLE_NAME} WHERE EXISTS (SELECT 1 FROM {TABLE_NAME} AS ' \
+                                           f'kept WHERE kept.{COLUMN_NAME} = {TABLE_NAME}.{COLUMN_NAME} AND ' \
+                                           f'kept.{COLUMN_ID} < {TABLE_NAME}.{COLUMN_ID});'
+
+CREATE_UNIQUE_INDEX_NAME: Final[Text] = f'CREATE UNIQUE INDEX IF NOT EXISTS {TABLE_NAME}_name_idx ON {TABLE_NAME} ' \
+                                        f'({COLUMN_NAME});'
+
+INSERT_CATEGORY: Final[Text] = f'INSERT INTO {TABLE_NAME} ({COLUMN_NAME}) VALUES (?) ON CONFLICT ({COLUMN_NAME}) ' \
+                               f'DO NOTHING'
+
+SELECT_CATEGORY_ID: Final[Text] = f'SELECT {COLUMN_ID} FROM {TABLE_NAME} WHERE {COLUMN_NAME} = ?'
+
+SELECT_CATEGORIES: Final[Text] = f'SELECT {COLUMN_NAME}, {COLUMN_ID} FROM {TABLE_NAME}'
+
+ADD_COLUMN_UPDATED: Final[Text] = timestamps.add_column(TABLE_NAME, COLUMN_UPDATED)
+BACKFILL_UPDATED: Final[Text] = timestamps.backfill(TABLE_NAME, COLUMN_UPDATED)
+CREATE_INDEX_UPDATED: Final[Text] = timestamps.create_index(TABLE_NAME, COLUMN_UPDATED)
+CREATE_UPDATED_INSERT_TRIGGER: Final[Text] = timestamps.insert_trigger(TABLE_NAME, COLUMN_ID, COLUMN_UPDATED)
+CREATE_UPDATED_UPDATE_TRIGGER: Final[Text] = timestamps.update_trigger(TABLE_NAME, COLUMN_ID, COLUMN_UPDATED)
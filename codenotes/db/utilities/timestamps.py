@@ -0,0 +1,104 @@
+""" Utility module with the statements of the column that stores when each row of a table was inserted or updated """
+from typing import Final, Text
+
+# UTC timestamp with milliseconds, which is ordered as text (e.g. 2021-03-01 18:30:05.123)
+NOW: Final[Text] = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def add_column(table: str, column: str) -> Text:
+    """ Returns the statement that adds the timestamp column to table. The column is filled by the triggers, since
+    ALTER TABLE doesn't allow a non-constant default value
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    column: str
+        Name of the timestamp column
+
+    Returns
+    -------
+    sql: Text
+        ALTER TABLE statement
+    """
+    return f'ALTER TABLE {table} ADD COLUMN {column} TIMESTAMP NULL;'
+
+
+def backfill(table: str, column: str) -> Text:
+    """ Returns the statement that sets the current timestamp to the rows stored before the column was added
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    column: str
+        Name of the timestamp column
+
+    Returns
+    -------
+    sql: Text
+        UPDATE statement
+    """
+    return f'UPDATE {table} SET {column} = {NOW} WHERE {column} IS NULL;'
+
+
+def create_index(table: str, column: str) -> Text:
+    """ Returns the statement that creates the index used to find the rows changed since a timestamp
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    column: str
+        Name of the timestamp column
+
+    Returns
+    -------
+    sql: Text
+        CREATE INDEX statement
+    """
+    return f'CREATE INDEX IF NOT EXISTS {table}_{column}_idx ON {table} ({column});'
+
+
+def insert_trigger(table: str, column_id: str, column: str) -> Text:
+    """ Returns the statement that creates the trigger which sets the timestamp of the rows inserted without it
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    column_id: str
+        Integer primary key of table
+    column: str
+        Name of the timestamp column
+
+    Returns
+    -------
+    sql: Text
+        CREATE TRIGGER statement
+    """
+    return f'CREATE TRIGGER IF NOT EXISTS {table}_{column}_insert AFTER INSERT ON {table} WHEN new.{column} IS NULL ' \
+           f'BEGIN UPDATE {table} SET {column} = {NOW} WHERE {column_id} = new.{column_id}; END;'
+
+
+def update_trigger(table: str, column_id: str, column: str) -> Text:
+    """ Returns the statement that creates the trigger which sets the timestamp of the rows updated. The trigger isn't
+    fired again by its own update, because recursive triggers are disabled by default
+
+    Parameters
+    ----------
+    table: str
+        Name of the table
+    column_id: str
+        Integer primary key of table
+    column: str
+        Name of the timestamp column
+
+    Returns
+    -------
+    sql: Text
+        CREATE TRIGGER statement
+    """
+    return f'CREATE TRIGGER IF NOT EXISTS {table}_{column}_update AFTER UPDATE ON {table} WHEN ' \
+           f'new.{column} IS old.{column} BEGIN UPDATE {table} SET {column} = {NOW} WHERE ' \
+           f'{column_id} = new.{column_id}; END;'
@@ -1,8 +1,12 @@
 from argparse import Namespace
+from typing import TYPE_CHECKING, Union
 
 import py_cui
 
-from codenotes.tui.windows import TaskWindow
+from codenotes.tui.windows import REFRESH_TIMEOUT, NoteWindow, TaskWindow
+
+if TYPE_CHECKING:
+    from codenotes.db.connection import SQLiteConnection
 
 
 class ImpPyCUI(py_cui.PyCUI):
@@ -16,19 +20,73 @@ class ImpPyCUI(py_cui.PyCUI):
 class App:
 
     root: ImpPyCUI
+    db: 'SQLiteConnection'
+    window: Union[TaskWindow, NoteWindow]
+
+    def __init__(self, root: ImpPyCUI, args: Namespace, db: 'SQLiteConnection') -> None:
+        """ App Constructor
+
+        Parameters
+        ----------
+        root: ImpPyCUI
+            Root of the TUI
+
+        args: Namespace
+            Arguments of argparse
 
-    def __init__(self, root: ImpPyCUI, args: Namespace) -> None:
+        db: SQLiteConnection
+            Connection with the database displayed
+        """
         self.root = root
+        self.db = db
 
         if args.type == 'note':
-            pass
+            self._set_note_widget_set()
         elif args.type == 'task':
             self._set_task_widget_set()
 
+    @classmethod
+    def set_args(cls, args: Namespace, db: 'SQLiteConnection' = None) -> None:
+        """ Set args, initialize class and run the TUI until the user exits
+
+        Parameters
+        ----------
+        args: Namespace
+            Arguments of argparse
+
+        db: SQLiteConnection
+            Connection with the database. When it isn't passed, a new connection is opened, which is closed by the
+            class
+        """
+        import codenotes.db.journal as journal
+        from codenotes.db.connection import SQLiteConnection
+
+        own_db = db is None
+        db = db if db is not None else SQLiteConnection()
+
+        try:
+            journal.replay(db)  # The annotations captured in the journal are displayed too
+
+            root = ImpPyCUI(TaskWindow.ROWS, TaskWindow.COLUMNS)
+            cls(root, args, db)
+            root.start()
+        finally:
+            if own_db:
+                db.close()
+
     def _set_task_widget_set(self):
-        self.root.apply_widget_set(
-                TaskWindow.create_widget_set(self.root)
-            )
+        self.window = TaskWindow(self.root, self.db)
+
+        self.root.apply_widget_set(self.window.window)
+        self.root.move_focus(self.window.tasks.menu)  # The keys go straight to the menu
 
     def _set_note_widget_set(self):
-        pass
+        self.window = NoteWindow(self.root, self.db)
+
+        self.root.apply_widget_set(self.window.window)
+        self.root.move_focus(self.window.notes.menu)
+
+        # The content loaded by the worker thread is displayed in the next draw, without waiting for a key
+        self.root.set_on_draw_update_func(self.window.update)
+        self.root.set_refresh_timeout(REFRESH_TIMEOUT)
+        self.root.run_on_exit(self.window.close)
@@ -0,0 +1,205 @@
+""" Module that loads the content of the notes displayed by the TUI in a worker thread
+
+The menu of notes only reads their titles (see codenotes.tui.windows), so it scrolls as fast with long notes as with
+short ones. The content of the note selected is read and rendered (Markdown for the readme notes) by a worker thread,
+which has its own read-only connection, while the TUI keeps handling the keys. When the selection moves before a load
+starts, the load is skipped, so holding a key down doesn't queue a render for every note passed.
+"""
+import textwrap
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Final, Optional, final
+
+import codenotes.db.utilities.notes as notes
+
+if TYPE_CHECKING:
+    from codenotes.db.connection import SQLiteConnection
+
+SELECT_CONTENT: Final[str] = f'SELECT {notes.COLUMN_CONTENT}, {notes.COLUMN_README} FROM {notes.TABLE_NAME} ' \
+                             f'WHERE {notes.COLUMN_ID} = ?'
+
+Request = tuple[int, int]  # Id of the note and width of its lines
+
+
+@final
+class NoteLoader:
+    """ Class that reads and renders the content of a note in a worker thread
+
+    Attributes
+    ----------
+    db: SQLiteConnection
+        Connection with the database, used by the TUI thread
+
+    worker_db: Optional[SQLiteConnection]
+        Read-only connection of the worker thread. It's None when the database is in memory, which can't be opened
+        twice, so its content is read by the TUI thread and only the render is made by the worker
+
+    executor: ThreadPoolExecutor
+        Executor with the worker thread
+
+    requested: Optional[Request]
+        Last note requested
+
+    future: Optional[Future]
+        Load of the last note requested
+    """
+
+    db: 'SQLiteConnection'
+    worker_db: Optional['SQLiteConnection'] = None
+    executor: ThreadPoolExecutor
+    requested: Optional[Request] = None
+    future: Optional[Future] = None
+
+    def __init__(self, db: 'SQLiteConnection') -> None:
+        """ NoteLoader Constructor
+
+        Parameters
+        ----------
+        db: SQLiteConnection
+            Connection with the database
+        """
+        self.db = db
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='codenotes-loader',
+                                           initializer=self.__connect)
+
+    def request(self, row_id: int, width: int) -> bool:
+        """ Starts loading the note, unless it's the last one requested
+
+        Parameters
+        ----------
+        row_id: int
+            Id of the note
+
+        width: int
+            Max number of characters of each line
+
+        Returns
+        -------
+        requested: bool
+            True when a new load is started
+        """
+        request = (row_id, width)
+
+        if request == self.requested:
+            return False
+
+        self.requested = request
+
+        if self.db.in_memory:
+            row = self.db.exec_sql(SELECT_CONTENT, (row_id,)).fetchone()
+            self.future = self.executor.submit(self.__render, request, row)
+        else:
+            self.future = self.executor.submit(self.__load, request)
+
+        return True
+
+    def result(self) -> Optional[list[str]]:
+        """ Returns the lines of the last note requested once they are loaded. Then, it returns None until the next
+        request is loaded
+
+        Returns
+        -------
+        lines: Optional[list[str]]
+            Lines of the note, or None when they aren't loaded yet (or were already returned)
+        """
+        if self.future is None or not self.future.done():
+            return None
+
+        future, self.future = self.future, None
+
+        return future.result()
+
+    def close(self) -> None:
+        """ Waits for the load in course and closes the connection of the worker thread """
+        self.requested = None  # The loads that didn't start are skipped
+        self.executor.submit(self.__disconnect).result()
+        self.executor.shutdown()
+
+    def __connect(self) -> None:
+        """ Function that opens the connection of the worker thread, in the worker thread (sqlite3 connections can
+        only be used by the thread that opens them) """
+        from codenotes.db.connection import SQLiteConnection
+
+        if not self.db.in_memory:
+            self.worker_db = SQLiteConnection(read_only=True, path=self.db.database_path)
+
+    def __disconnect(self) -> None:
+        """ Function that closes the connection of the worker thread, in the worker thread """
+        if self.worker_db is not None:
+            self.worker_db.close()
+            self.worker_db = None
+
+    def __load(self, request: Request) -> Optional[list[str]]:
+        """ Function that reads the note and renders it, unless another note was requested in the meantime
+
+        Parameters
+        ----------
+        request: Request
+            Note requested
+
+        Returns
+        -------
+        lines: Optional[list[str]]
+            Lines of the note, or None when the load is skipped
+        """
+        if request != self.requested:
+            return None
+
+        return self.__render(request, self.worker_db.exec_sql(SELECT_CONTENT, (request[0],)).fetchone())
+
+    def __render(self, request: Request, row: Optional[tuple]) -> Optional[list[str]]:
+        """ Function that renders the note, unless another note was requested in the meantime
+
+        Parameters
+        ----------
+        request: Request
+            Note requested
+
+        row: Optional[tuple]
+            Content and readme flag of the note, or None when the note doesn't exist anymore
+
+        Returns
+        -------
+        lines: Optional[list[str]]
+            Lines of the note, or None when the render is skipped
+        """
+        if request != self.requested:
+            return None
+
+        return render(row, request[1])
+
+
+def render(row: Optional[tuple], width: int) -> list[str]:
+    """ Renders the content of a note in lines of plain text, since the menus of py_cui don't display rich styles
+
+    Parameters
+    ----------
+    row: Optional[tuple]
+        Content and readme flag of the note, or None when the note doesn't exist
+
+    width: int
+        Max number of characters of each line
+
+    Returns
+    -------
+    lines: list[str]
+        Lines of the note
+    """
+    if row is None:
+        return ['Note not found']
+
+    content, readme = row
+
+    if readme:
+        from rich.console import Console
+
+        from codenotes.cli.markdown import render_lines
+
+        console = Console(width=width, color_system=None, force_terminal=False)
+        lines = render_lines(console, console.options, content if content else '# Note Empty')
+
+        return [''.join(segment.text for segment in line).rstrip() for line in lines]
+
+    if not content:
+        return ['Empty note']
+
+    return [wrapped for line in content.splitlines() for wrapped in textwrap.wrap(line, width) or ['']]
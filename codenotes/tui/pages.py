@@ -0,0 +1,242 @@
+""" Module that reads the rows displayed by the windows of the TUI one page at a time
+
+The windows never load a whole table: they keep a window of rows around the one selected, and read the next or the
+previous page when the selection gets to an end of it. The pages are read by id (keyset pagination), so reading any
+page costs the same search in the primary key, no matter how many rows are before it.
+"""
+from typing import TYPE_CHECKING, Callable, Final, Optional, final
+
+import py_cui
+
+from codenotes.util.sql import Query
+
+if TYPE_CHECKING:
+    from codenotes.db.connection import SQLiteConnection
+
+PAGE_SIZE: Final[int] = 100  # Rows read at a time. It must be greater than the height of the menus
+WINDOW_SIZE: Final[int] = 3 * PAGE_SIZE  # Max number of rows kept in a menu
+
+
+@final
+class KeysetPages:
+    """ Class that reads the rows of a query, ordered by id, one page at a time
+
+    Attributes
+    ----------
+    db: SQLiteConnection
+        Connection with the database
+
+    query: Callable[[], Query]
+        Function that returns a new query of the rows, whose last column is the id
+
+    id_column: str
+        Column of the id, qualified with its table
+
+    page_size: int
+        Number of rows of each page
+    """
+
+    db: 'SQLiteConnection'
+    query: Callable[[], Query]
+    id_column: str
+    page_size: int
+
+    def __init__(self, db: 'SQLiteConnection', query: Callable[[], Query], id_column: str,
+                 page_size: int = PAGE_SIZE) -> None:
+        """ KeysetPages Constructor
+
+        Parameters
+        ----------
+        db: SQLiteConnection
+            Connection with the database
+
+        query: Callable[[], Query]
+            Function that returns a new query of the rows, whose last column is the id
+
+        id_column: str
+            Column of the id, qualified with its table
+
+        page_size: int
+            Number of rows of each page
+        """
+        self.db = db
+        self.query = query
+        self.id_column = id_column
+        self.page_size = page_size
+
+    def first(self) -> list[tuple]:
+        """ Returns the first page """
+        return self.__page(None, descending=False)
+
+    def last(self) -> list[tuple]:
+        """ Returns the last page """
+        return self.__page(None, descending=True)
+
+    def after(self, row_id: int) -> list[tuple]:
+        """ Returns the page that starts after the row with the id """
+        return self.__page(row_id, descending=False)
+
+    def before(self, row_id: int) -> list[tuple]:
+        """ Returns the page that ends before the row with the id """
+        return self.__page(row_id, descending=True)
+
+    def __page(self, row_id: Optional[int], descending: bool) -> list[tuple]:
+        """ Function that reads a page in the order of the ids
+
+        Parameters
+        ----------
+        row_id: Optional[int]
+            Id where the page starts (excluded). None to start from an end of the table
+
+        descending: bool
+            Flag to read the page backwards, from the id (or the end of the table)
+
+        Returns
+        -------
+        rows: list[tuple]
+            Rows of the page, ordered by id
+        """
+        query = self.query()
+
+        if row_id is not None:
+            query.where(f'{self.id_column} {"<" if descending else ">"} ?', row_id)
+
+        query.order_by(f'{self.id_column} DESC' if descending else self.id_column).limit(self.page_size)
+        rows = self.db.exec_sql(*query.build()).fetchall()
+
+        return rows[::-1] if descending else rows
+
+
+@final
+class PagedMenu:
+    """ Class that fills a scroll menu with the pages of the rows around the item selected
+
+    The menu has at most window_size items. When a key would move the selection past the first or the last item, the
+    previous or next page is read before the menu handles the key, and the items at the other end are dropped.
+
+    Attributes
+    ----------
+    menu: ScrollMenu
+        Scroll menu of the rows
+
+    pages: KeysetPages
+        Pages of the rows
+
+    item: Callable[[tuple], object]
+        Function that converts a row into an item of the menu, which must have the id of the row in row_id
+
+    window_size: int
+        Max number of items of the menu
+    """
+
+    menu: py_cui.widgets.ScrollMenu
+    pages: KeysetPages
+    item: Callable[[tuple], object]
+    window_size: int
+
+    def __init__(self, menu: py_cui.widgets.ScrollMenu, pages: KeysetPages, item: Callable[[tuple], object],
+                 window_size: int = WINDOW_SIZE) -> None:
+        """ PagedMenu Constructor
+
+        Parameters
+        ----------
+        menu: ScrollMenu
+            Scroll menu of the rows
+
+        pages: KeysetPages
+            Pages of the rows
+
+        item: Callable[[tuple], object]
+            Function that converts a row into an item of the menu, which must have the id of the row in row_id
+
+        window_size: int
+            Max number of items of the menu
+        """
+        self.menu = menu
+        self.pages = pages
+        self.item = item
+        self.window_size = window_size
+
+        # The commands of the keys run before the menu moves the selection
+        menu.add_key_command(py_cui.keys.KEY_DOWN_ARROW, lambda: self.load_below(1))
+        menu.add_key_command(py_cui.keys.KEY_PAGE_DOWN, lambda: self.load_below(menu._page_scroll_len))
+        menu.add_key_command(py_cui.keys.KEY_UP_ARROW, lambda: self.load_above(1))
+        menu.add_key_command(py_cui.keys.KEY_PAGE_UP, lambda: self.load_above(menu._page_scroll_len))
+        menu.add_key_command(py_cui.keys.KEY_HOME, self.load_first)
+        menu.add_key_command(py_cui.keys.KEY_END, self.load_last)
+
+        self.load_first()
+
+    def selected(self) -> Optional[object]:
+        """ Returns the item selected, or None when the menu is empty """
+        items = self.menu.get_item_list()
+
+        return items[self.menu.get_selected_item_index()] if items else None
+
+    def load_first(self) -> None:
+        """ Replaces the items with the first page """
+        self.menu.clear()
+        self.menu.add_item_list([self.item(row) for row in self.pages.first()])
+
+    def load_last(self) -> None:
+        """ Replaces the items with the last page. The menu moves the selection to the last item """
+        self.menu.clear()
+        self.menu.add_item_list([self.item(row) for row in self.pages.last()])
+
+    def load_below(self, distance: int) -> int:
+        """ Reads the next page when the selection is going to move past the last item
+
+        Parameters
+        ----------
+        distance: int
+            Number of items the selection is going to move down
+
+        Returns
+        -------
+        loaded: int
+            Number of items added
+        """
+        items = self.menu.get_item_list()
+
+        if not items or self.menu.get_selected_item_index() + distance < len(items):
+            return 0
+
+        rows = self.pages.after(items[-1].row_id)
+        items.extend(self.item(row) for row in rows)
+
+        dropped = len(items) - self.window_size
+        if dropped > 0:  # The first items, which are above the view
+            del items[:dropped]
+            self.menu.set_selected_item_index(self.menu.get_selected_item_index() - dropped)
+            self.menu._top_view = max(0, self.menu._top_view - dropped)
+
+        return len(rows)
+
+    def load_above(self, distance: int) -> int:
+        """ Reads the previous page when the selection is going to move past the first item
+
+        Parameters
+        ----------
+        distance: int
+            Number of items the selection is going to move up
+
+        Returns
+        -------
+        loaded: int
+            Number of items added
+        """
+        items = self.menu.get_item_list()
+
+        if not items or self.menu.get_selected_item_index() - distance >= 0:
+            return 0
+
+        rows = self.pages.before(items[0].row_id)
+        items[:0] = [self.item(row) for row in rows]
+
+        # The items added are above the view, which keeps showing the same items
+        self.menu.set_selected_item_index(self.menu.get_selected_item_index() + len(rows))
+        self.menu._top_view += len(rows)
+
+        del items[self.window_size:]  # The last items, which are below the view
+
+        return len(rows)
@@ -1,33 +1,257 @@
-from typing import Final
+from typing import TYPE_CHECKING, Final, final
 
+import py_cui
 from py_cui import PyCUI
 from py_cui.widget_set import WidgetSet
 
+import codenotes.db.utilities.notes as notes
+import codenotes.db.utilities.tasks as tasks
+import codenotes.db.utilities.notes_categories as notes_categories
+import codenotes.db.utilities.tasks_categories as tasks_categories
+from codenotes.util.sql import Query
+from codenotes.util.text import status_text
+from codenotes.tui.pages import KeysetPages, PagedMenu
+from codenotes.tui.loader import NoteLoader
+
+if TYPE_CHECKING:
+    from codenotes.db.connection import SQLiteConnection
+
+STATUS_KEYS: Final[dict[int, int]] = {py_cui.keys.KEY_0: 0, py_cui.keys.KEY_1: 1, py_cui.keys.KEY_2: 2}
+REFRESH_TIMEOUT: Final[float] = 0.1  # Seconds between the draws of the TUI, when no key is pressed
+
+
+@final
+class TaskItem:
+    """ Item of the menu of tasks. Its status is changed in place, so the menu doesn't read the page again
+
+    Attributes
+    ----------
+    content: str
+        Content of the task
+
+    status: int
+        Status of the task
+
+    category: str
+        Name of the category of the task
+
+    creation: str
+        Creation date of the task
+
+    row_id: int
+        Id of the task
+    """
+
+    content: str
+    status: int
+    category: str
+    creation: str
+    row_id: int
+
+    def __init__(self, row: tuple) -> None:
+        """ TaskItem Constructor
+
+        Parameters
+        ----------
+        row: tuple
+            Content, status, category name, creation date and id of the task
+        """
+        self.content, self.status, self.category, self.creation, self.row_id = row
+
+    def __str__(self) -> str:
+        content = ' '.join(self.content.split())  # A line of the menu for each task
+
+        return f'{status_text(self.status):<10}  {self.creation}  [{self.category}]  {content}'
+
 
 class TaskWindow:
- 
+    """ Window with the menu of all the tasks, ordered by id. Only the pages around the task selected are read (see
+    codenotes.tui.pages), so it opens as fast with a hundred thousand tasks as with a few of them
+
+    Enter moves the task selected to the next status, and 0, 1 and 2 set its status
+    """
+
     COLUMNS: Final[int] = 5
     ROWS: Final[int] = 3
 
     root: PyCUI
+    db: 'SQLiteConnection'
     window: WidgetSet
+    tasks: PagedMenu
 
-    def __init__(self, root: PyCUI) -> None:
+    def __init__(self, root: PyCUI, db: 'SQLiteConnection') -> None:
         """ TaskWindow Constructor """
         self.root = root
+        self.db = db
         self.window = self.root.create_new_widget_set(self.ROWS, self.COLUMNS)
 
         self.__config()
 
     def __config(self) -> None:
-        pass
+        menu = self.window.add_scroll_menu('Tasks', 0, 0, row_span=self.ROWS, column_span=self.COLUMNS)
+        pages = KeysetPages(self.db, self.__query, f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID}')
+
+        self.tasks = PagedMenu(menu, pages, TaskItem)
+
+        menu.add_key_command(py_cui.keys.KEY_ENTER, lambda: self.set_status(None))
+        for key, status in STATUS_KEYS.items():
+            menu.add_key_command(key, lambda status=status: self.set_status(status))
+
+        menu.set_help_text('Enter: next status, 0: Incomplete, 1: In Process, 2: Finished, Esc: exit the menu')
+        self.window.set_selected_widget(menu.get_id())
+
+    @staticmethod
+    def __query() -> Query:
+        """ Returns the query of the tasks, with the name of their categories """
+        columns = (
+            tasks.COLUMN_CONTENT, tasks.COLUMN_STATUS, tasks_categories.COLUMN_NAME, tasks.COLUMN_CREATION,
+            f'{tasks.TABLE_NAME}.{tasks.COLUMN_ID}'
+        )
+
+        return Query(tasks.TABLE_NAME, columns).join(
+            tasks_categories.TABLE_NAME,
+            f'{tasks.TABLE_NAME}.{tasks.COLUMN_CATEGORY} = {tasks_categories.TABLE_NAME}.{tasks_categories.COLUMN_ID}'
+        )
+
+    def set_status(self, status: int = None) -> None:
+        """ Saves the status of the task selected, and changes it in its item
+
+        Parameters
+        ----------
+        status: int
+            New status of the task. When it's None, the task moves to the status after its current one
+        """
+        item = self.tasks.selected()
+
+        if item is None:
+            return
+
+        if status is None:
+            status = ((item.status or 0) + 1) % len(STATUS_KEYS)
+
+        self.db.write(lambda: self.db.exec_sql(tasks.UPDATE_STATUS, (status, item.row_id)))
+        item.status = status
 
     @classmethod
-    def create_widget_set(cls, root: PyCUI) -> WidgetSet:
-        """ 
+    def create_widget_set(cls, root: PyCUI, db: 'SQLiteConnection') -> WidgetSet:
+        """
         Returns
         -------
         widget_set: WidgetSet
             Returns widgset preconfigured to be applied on root
         """
-        return cls(root).window
+        return cls(root, db).window
+
+
+@final
+class NoteItem:
+    """ Item of the menu of notes, without the content of the note
+
+    Attributes
+    ----------
+    title: str
+        Title of the note
+
+    category: str
+        Name of the category of the note
+
+    creation: str
+        Creation date of the note
+
+    row_id: int
+        Id of the note
+    """
+
+    title: str
+    category: str
+    creation: str
+    row_id: int
+
+    def __init__(self, row: tuple) -> None:
+        """ NoteItem Constructor
+
+        Parameters
+        ----------
+        row: tuple
+            Title, category name, creation date and id of the note
+        """
+        self.title, self.category, self.creation, self.row_id = row
+
+    def __str__(self) -> str:
+        return f'{self.creation}  [{self.category}]  {" ".join(self.title.split())}'
+
+
+class NoteWindow:
+    """ Window with the menu of the titles of all the notes, ordered by id, and the content of the note selected. The
+    titles are read by pages (see codenotes.tui.pages), and the content is read and rendered by a worker thread (see
+    codenotes.tui.loader), so scrolling doesn't wait for the long notes
+
+    update() must run on each draw of the root, which applies the content loaded
+    """
+
+    COLUMNS: Final[int] = 5
+    ROWS: Final[int] = 3
+
+    root: PyCUI
+    db: 'SQLiteConnection'
+    window: WidgetSet
+    notes: PagedMenu
+    content: py_cui.widgets.ScrollMenu
+    loader: NoteLoader
+
+    def __init__(self, root: PyCUI, db: 'SQLiteConnection') -> None:
+        """ NoteWindow Constructor """
+        self.root = root
+        self.db = db
+        self.window = self.root.create_new_widget_set(self.ROWS, self.COLUMNS)
+        self.loader = NoteLoader(db)
+
+        self.__config()
+
+    def __config(self) -> None:
+        menu = self.window.add_scroll_menu('Notes', 0, 0, row_span=self.ROWS, column_span=2)
+        pages = KeysetPages(self.db, self.__query, f'{notes.TABLE_NAME}.{notes.COLUMN_ID}')
+
+        self.notes = PagedMenu(menu, pages, NoteItem)
+        self.content = self.window.add_scroll_menu('Content', 0, 2, row_span=self.ROWS, column_span=3)
+
+        menu.set_help_text('Arrows: select a note, Esc: exit the menu, then the arrows move to the content')
+        self.content.set_help_text('Arrows: scroll the content, Esc: exit the menu')
+        self.window.set_selected_widget(menu.get_id())
+
+    @staticmethod
+    def __query() -> Query:
+        """ Returns the query of the titles of the notes, with the name of their categories """
+        columns = (
+            notes.COLUMN_TITLE, notes_categories.COLUMN_NAME, notes.COLUMN_CREATION,
+            f'{notes.TABLE_NAME}.{notes.COLUMN_ID}'
+        )
+
+        return Query(notes.TABLE_NAME, columns).join(
+            notes_categories.TABLE_NAME,
+            f'{notes.TABLE_NAME}.{notes.COLUMN_CATEGORY} = {notes_categories.TABLE_NAME}.{notes_categories.COLUMN_ID}'
+        )
+
+    def update(self) -> None:
+        """ Requests the content of the note selected, when the selection changed, and displays the content loaded """
+        item = self.notes.selected()
+
+        if item is not None:
+            _, width = self.content.get_absolute_dimensions()
+            padx, _ = self.content.get_padding()
+
+            if self.loader.request(item.row_id, max(1, width - 2 * padx - 4)):
+                self.__show(['Loading...'])
+
+        lines = self.loader.result()
+        if lines is not None:
+            self.__show(lines)
+
+    def __show(self, lines: list[str]) -> None:
+        """ Replaces the lines of the content """
+        self.content.clear()
+        self.content.add_item_list(lines)
+
+    def close(self) -> None:
+        """ Stops the worker thread of the content """
+        self.loader.close()
@@ -1,7 +1,7 @@
 import calendar
-from argparse import Namespace
+from argparse import ArgumentTypeError, Namespace
 from typing import overload, Union
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 
 def date_args_empty(args: Namespace) -> bool:
     """ Check if arguments required to search are empty
@@ -138,3 +138,86 @@ def format_argument_text(arg_text: list[str]) -> str:
     text = ' '.join(arg_text)
 
     return text.strip()
+
+
+def positive_int(arg_text: str) -> int:
+    """ Function used as type of argparse arguments that must be a positive integer
+
+    Parameters
+    ----------
+    arg_text: str
+        Text of the argument
+
+    Returns
+    -------
+    value: int
+        Integer value of the argument
+
+    Raises
+    ------
+    ArgumentTypeError
+        When the argument isn't a positive integer
+    """
+    try:
+        value = int(arg_text)
+    except ValueError:
+        raise ArgumentTypeError(f'invalid positive integer: {arg_text!r}')
+
+    if value <= 0:
+        raise ArgumentTypeError(f'invalid positive integer: {arg_text!r}')
+    return value
+
+
+def timestamp(arg_text: str) -> str:
+    """ Function used as type of argparse arguments that must be a date or datetime in ISO format. The datetimes with a
+    timezone offset are converted to UTC, the ones without it are taken as UTC
+
+    Parameters
+    ----------
+    arg_text: str
+        Text of the argument (e.g. 2021-03-01, 2021-03-01 18:30:05.123, 2021-03-01T20:30:05+02:00)
+
+    Returns
+    -------
+    value: str
+        Timestamp (UTC) in the format stored in the database, which can be compared as text
+
+    Raises
+    ------
+    ArgumentTypeError
+        When the argument isn't a valid date or datetime
+    """
+    try:
+        value = datetime.fromisoformat(arg_text.strip())
+    except ValueError:
+        raise ArgumentTypeError(f'invalid timestamp: {arg_text!r}')
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def change_number(arg_text: str) -> Union[int, str]:
+    """ Function used as type of argparse arguments that must be the number of a change (shown by the previous export),
+    or a timestamp (see timestamp())
+
+    Parameters
+    ----------
+    arg_text: str
+        Text of the argument (e.g. 1250, 2021-03-01 18:30:05.123)
+
+    Returns
+    -------
+    value: Union[int, str]
+        Number of the change, or timestamp in the format stored in the database
+
+    Raises
+    ------
+    ArgumentTypeError
+        When the argument isn't a number nor a valid timestamp
+    """
+    if arg_text.strip().isdigit():
+        return int(arg_text)
+
+    return timestamp(arg_text)
@@ -0,0 +1,221 @@
+""" Utility module to write rows of a query, and read records, in machine-readable formats
+
+The rows are read from the cursor in batches and written as soon as they are read, so the memory used doesn't depend on
+the number of rows. In the same way, records are read from the input file one line at a time. This module must not
+import rich, since it is used by the commands that write to pipes.
+"""
+import re
+import csv
+import sys
+import json
+import os.path
+from typing import TYPE_CHECKING, Any, Callable, Final, Iterable, Optional, TextIO
+
+if TYPE_CHECKING:  # The journaled add doesn't import sqlite3
+    from sqlite3.dbapi2 import Cursor
+
+FORMATS: Final[tuple[str, ...]] = ('ndjson', 'tsv', 'csv')
+INPUT_FORMATS: Final[tuple[str, ...]] = ('ndjson', 'csv', 'todotxt')
+INPUT_EXTENSIONS: Final[dict[str, str]] = {
+    '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.json': 'ndjson', '.csv': 'csv', '.txt': 'todotxt'
+}
+BATCH_SIZE: Final[int] = 500  # Rows read from the cursor in each fetchmany()
+
+TODOTXT_DATE: Final[re.Pattern] = re.compile(r'\d{4}-\d{2}-\d{2}')
+TODOTXT_PRIORITY: Final[re.Pattern] = re.compile(r'\([A-Z]\)')
+
+
+def iter_cursor(cursor: 'Cursor', batch_size: int = BATCH_SIZE) -> Iterable[tuple]:
+    """ Function that iterates the rows of the cursor reading them in batches
+
+    Parameters
+    ----------
+    cursor: Cursor
+        Cursor with the query executed
+
+    batch_size: int
+        Number of rows read in each fetchmany()
+
+    Returns
+    -------
+    rows: Iterable[tuple]
+        Rows of the query
+    """
+    rows = cursor.fetchmany(batch_size)
+
+    while rows:
+        yield from rows
+        rows = cursor.fetchmany(batch_size)
+
+
+def tsv_field(value: Any) -> str:
+    """ Function that converts a value into a TSV field, escaping the tabs and line breaks it contains
+
+    Parameters
+    ----------
+    value: Any
+        Value of the field. None is written as an empty field
+
+    Returns
+    -------
+    field: str
+        Text of the field
+    """
+    if value is None:
+        return ''
+
+    text = str(value)
+    for character, escaped in (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r')):
+        text = text.replace(character, escaped)
+
+    return text
+
+
+def write_rows(rows: Iterable[tuple], columns: tuple[str, ...], output_format: str, stream: TextIO = None,
+               convert: Callable[[tuple], tuple] = None) -> int:
+    """ Function that writes the rows in the format specified, flushing the stream after each batch of rows
+
+    Parameters
+    ----------
+    rows: Iterable[tuple]
+        Rows written. Use iter_cursor() to write the rows of a cursor
+
+    columns: tuple[str, ...]
+        Names of the columns, used in the header (tsv/csv) or as keys (ndjson)
+
+    output_format: str
+        One of FORMATS
+
+    stream: TextIO
+        Stream where the rows are written (Default sys.stdout)
+
+    convert: Callable[[tuple], tuple]
+        Optional function applied to each row before writing it
+
+    Returns
+    -------
+    count: int
+        Number of rows written
+    """
+    stream = stream if stream is not None else sys.stdout
+    count = 0
+
+    if output_format == 'ndjson':
+        def write(row: tuple) -> None:
+            stream.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + '\n')
+    elif output_format == 'tsv':
+        def write(row: tuple) -> None:
+            stream.write('\t'.join(tsv_field(value) for value in row) + '\n')
+
+        write(columns)
+    elif output_format == 'csv':
+        writer = csv.writer(stream, lineterminator='\n')
+        write = writer.writerow
+
+        write(columns)
+    else:
+        raise ValueError(f'Unknown format: {output_format}')
+
+    for row in rows:
+        write(convert(row) if convert is not None else row)
+        count += 1
+
+        if count % BATCH_SIZE == 0:
+            stream.flush()
+
+    stream.flush()
+
+    return count
+
+
+def input_format_of(path: str) -> Optional[str]:
+    """ Function that guesses the format of the input file by its extension
+
+    Parameters
+    ----------
+    path: str
+        Path of the input file
+
+    Returns
+    -------
+    input_format: Optional[str]
+        One of INPUT_FORMATS, or None when the extension is unknown
+    """
+    return INPUT_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def parse_todotxt(line: str) -> dict[str, Any]:
+    """ Function that converts a line of a todo.txt file into a record
+
+    A completed task ("x " at the start, followed by its completion date) has status 2. The priority is discarded, the
+    creation date is kept and the first +project is used as category and removed from the content
+
+    Parameters
+    ----------
+    line: str
+        Line of the todo.txt file
+
+    Returns
+    -------
+    record: dict[str, Any]
+        Record with content and, when they are found, status, creation and category
+    """
+    words = line.split()
+    record = {}
+
+    if words[:1] == ['x']:
+        record['status'] = 2
+        words = words[1:]
+
+        if words and TODOTXT_DATE.fullmatch(words[0]):  # Completion date
+            words = words[1:]
+    elif words and TODOTXT_PRIORITY.fullmatch(words[0]):
+        words = words[1:]
+
+    if words and TODOTXT_DATE.fullmatch(words[0]):
+        record['creation'] = words[0]
+        words = words[1:]
+
+    project = next((word for word in words if word.startswith('+') and len(word) > 1), None)
+    if project:
+        record['category'] = project[1:]
+        words.remove(project)
+
+    record['content'] = ' '.join(words)
+
+    return record
+
+
+def read_records(stream: TextIO, input_format: str) -> Iterable[Optional[dict[str, Any]]]:
+    """ Function that reads the records of the stream one by one. Blank lines are ignored
+
+    Parameters
+    ----------
+    stream: TextIO
+        Stream with the records
+
+    input_format: str
+        One of INPUT_FORMATS. The csv files must have a header with the names of the fields
+
+    Returns
+    -------
+    records: Iterable[Optional[dict[str, Any]]]
+        Records read, with None in place of the lines that can't be parsed
+    """
+    if input_format == 'ndjson':
+        for line in stream:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+
+                yield record if isinstance(record, dict) else None
+    elif input_format == 'csv':
+        yield from csv.DictReader(stream)
+    elif input_format == 'todotxt':
+        for line in stream:
+            if line.strip():
+                yield parse_todotxt(line)
+    else:
+        raise ValueError(f'Unknown format: {input_format}')
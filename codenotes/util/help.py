@@ -9,17 +9,30 @@ codenotes <command> <annotation> <text> <flags>
 [header]CORE COMMANDS[/header]
 add     Create new note or task with the content typed
 search  Search for notes or tasks with the parameters specified
+import  Import notes or tasks from a file
+export  Export all the categories, notes and tasks
+batch   Run a script of commands in one transaction
+compact Save in the database the annotations captured in the journal
+init    Create a database for the project in the working directory (.codenotes/codenotes.db)
+shell   Open an interactive shell to run several commands in a row
+tui     Browse the tasks (changing their status with Enter or 0, 1 and 2) or the notes in the terminal (q to quit)
+daemon  Start, stop or show the status of the daemon, which runs add and search commands without starting a new process
 
 [header]ANNOTATION[/header]
 note/task       Type of annotations
 
 [header]FLAGS[/header]
 --version, -v   Show codenotes version
+--db <path>     Database used by the command
+
+[header]DATABASE[/header]
+The database is the one of --db, or CODENOTES_DB, or the one of the project (.codenotes/codenotes.db in the working directory or its parents), or the path of the [database] section of ~/.config/codenotes/config.ini, in that order. With :memory:, the database only exists while the command runs (e.g. a batch script)
 
 [header]EXAMPLES[/header]
 $ codenotes add task Finish coding the tests --new-categoery Reminders
 $ codenotes add task Create documentation for the codenotes proyect; Release the proyect -p
 $ codenotes search note --today
+$ codenotes --db ~/work/codenotes.db search task --week
 
 [header]FEEDBACK[/header]
 Open an issue in [u]github.com/EGAMAGZ/codenotes[/u]"""
@@ -35,6 +48,7 @@ codenotes add note <text> <flags>
 \t\tthe first 30 characters from the note
 --category,-c <category> Create a new category if it not exist and will store the note in it
 --preview, -p Shows a preview of the note that will be save
+--journal, -j Append the note to the journal, without opening the database. It's saved by the next search or compact (also with CODENOTES_JOURNAL=1)
 
 [header]USAGE[/header]
 $ codenotes add note I got an idea for UI --title UI Idea --category Codenotes"""
@@ -48,6 +62,7 @@ codenotes add task <text> <flags>
 [header]FLAGS[/header]
 --category,-c <category> Create a new category if it not exist and will store the note in it
 --preview, -p Shows a preview of the note that will be save
+--journal, -j Append the tasks to the journal, without opening the database. They're saved by the next search or compact (also with CODENOTES_JOURNAL=1)
 
 [header]TEXT[/header]
 To save two or more task, use the symbol ; to indicate the ending of a task.
@@ -65,14 +80,107 @@ codenotes search <annotation> <text> <flags>
 note/task       Type of annotations
 
 [header]TEXT[/header]
-Text that will be search if any annotations contains it.
+Words that will be search in the annotations. An annotation is found when it contains the text (also inside a word), or all the words, or words that start with them.
 
 [header]FLAGS[/header]
 --today, -t Search annotations created today
 --yesterday, -y Search annotations created yesterday
 --week, -w Search annotations created in the week
 --month, -m Search annotations created in the month
+--rank, -r Order the annotations by relevance to the text searched, showing the best matches highlighted
+--fuzzy, -f Search tasks and note titles that contain the text, even partially or with typos, ordered by similarity
+--limit, -l <number> Max number of annotations displayed per page (or in the best matches)
+--after, -a <id> Display the page that starts after the annotation with the id shown at the end of the previous page
+--page <number> Display the page with that number
+--format <ndjson|tsv|csv> Write the annotations found in a machine-readable format, instead of displaying them. All the annotations found are written, unless a limit is specified
+--all-dbs Search in all the known databases (the default, configured and project ones) at the same time, showing the annotations by date with their database
+
+[header]CACHE[/header]
+The results are saved next to the database (<database>.cache) until the annotations change, so a repeated search doesn't run again. Set CODENOTES_CACHE=0 to disable it
 
 [header]USAGE[/header]
 $ codenotes search note --today
-$ codenotes search task Finish my project --month"""
+$ codenotes search task Finish my project --month
+$ codenotes search note database index --rank
+$ codenotes search task SQLiteConection --fuzzy
+$ codenotes search task --month --format ndjson
+$ codenotes search task release --all-dbs"""
+
+
+IMPORT_USAGE_TEXT: Final[Text] = """[quote]Write any thought you have without quitting from the command line[/quote]
+
+[header]USAGE[/header]
+codenotes import <annotation> <file> <flags>
+
+[header]ANNOTATION[/header]
+note/task       Type of annotations
+
+[header]FILE[/header]
+File with one annotation per line, in one of these formats:
+ndjson   JSON objects with the fields content, status, creation and category (tasks), or title, content, category, readme and creation (notes)
+csv      Header with the same fields as ndjson
+todotxt  todo.txt tasks. Completed tasks are finished, and the first +project is the category
+
+[header]FLAGS[/header]
+--format <ndjson|csv|todotxt> Format of the file. By default, it's guessed by the extension (.ndjson/.jsonl, .csv, .txt)
+--batch-size, -b <number> Commit the annotations imported every number of annotations, instead of all at once
+
+[header]USAGE[/header]
+$ codenotes import task todo.txt
+$ codenotes import note notes.jsonl --batch-size 10000"""
+
+
+EXPORT_USAGE_TEXT: Final[Text] = """[quote]Write any thought you have without quitting from the command line[/quote]
+
+[header]USAGE[/header]
+codenotes export <flags>
+
+[header]FLAGS[/header]
+--format <ndjson|tsv|csv> Format of the records (Default ndjson). Each record has a type: note_category, task_category, note or task
+--output, -o <file> File where the records are written, instead of stdout. Files ending with .gz are compressed
+--gzip, -z Compress the records with gzip
+--since, -s <change> Export only the annotations created or changed after the change, whose number is shown at the end of the previous export. A timestamp (UTC, or with its offset) exports the ones changed since it, but it can miss the annotations of a long transaction
+
+[header]USAGE[/header]
+$ codenotes export --output backup.jsonl.gz
+$ codenotes export --format csv --since 1250 > changes.csv"""
+
+
+BATCH_USAGE_TEXT: Final[Text] = """[quote]Write any thought you have without quitting from the command line[/quote]
+
+[header]USAGE[/header]
+codenotes batch <file> <flags>
+
+[header]FILE[/header]
+Script with a command per line (add, search, import or export), typed as in the command line (with or without codenotes). Use - to read it from stdin. Blank lines and lines starting with # are ignored
+
+[header]FLAGS[/header]
+--commit-every, -n <number> Commit the changes every number of commands, instead of all at once
+--quiet, -q Don't show the output of the commands, only the summary
+
+[header]USAGE[/header]
+$ codenotes batch standup.txt
+$ generate-tasks | codenotes batch - --commit-every 100 --quiet"""
+
+
+SHELL_USAGE_TEXT: Final[Text] = """[quote]Write any thought you have without quitting from the command line[/quote]
+
+[header]USAGE[/header]
+<command> <annotation> <text> <flags>
+
+[header]COMMANDS[/header]
+add     Create new note or task with the content typed
+search  Search for notes or tasks with the parameters specified
+import  Import notes or tasks from a file
+export  Export all the categories, notes and tasks
+compact Save in the database the annotations captured in the journal
+help    Show this help
+exit    Close the shell (or Ctrl+D)
+
+[header]KEYS[/header]
+Tab      Complete commands, annotations and names of categories (after --category)
+Up/Down  Browse the history of commands
+
+[header]EXAMPLES[/header]
+codenotes> add task Review pull request --category Work
+codenotes> search task review --rank"""
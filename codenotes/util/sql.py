@@ -1,22 +1,370 @@
-def add_conditions_sql(sql: str, condition: str, type_condition: str = None) -> str:
-    """ Adds where conditions to sql
-    
+from typing import Any, Final, Union, final
+from datetime import date, timedelta
+
+from codenotes.util.text import trigrams
+
+
+SNIPPET_START: Final[str] = '\x02'  # Marks the start of a term highlighted by snippet()
+SNIPPET_END: Final[str] = '\x03'  # Marks the end of a term highlighted by snippet()
+LIKE_ESCAPE: Final[str] = '\\'  # Character used to escape the wildcards of a LIKE pattern
+
+
+@final
+class Query:
+    """ Class to build parameterized SELECT statements
+
+    The statement is composed with the methods of the class, which can be chained. All the values used in the
+    conditions are passed as parameters, never inside the SQL, so the same kind of search always produces the same SQL
+    text and its prepared statement is reused from the statement cache of sqlite3. Also, any text searched by the user
+    can't change the statement.
+
+    Attributes
+    ----------
+    table: str
+        Table of the FROM clause
+
+    columns: tuple[str, ...]
+        Columns selected
+
+    joins: list[str]
+        INNER JOIN clauses
+
+    conditions: list[str]
+        Conditions of the WHERE clause, joined with AND
+
+    values: list[Any]
+        Values of the parameters of the conditions, in the same order
+
+    order: list[str]
+        Expressions of the ORDER BY clause
+
+    limit_value: int
+        Max number of rows selected, or None to select all of them
+
+    offset_value: int
+        Number of rows skipped before the ones selected
+    """
+
+    table: str
+    columns: tuple[str, ...]
+    joins: list[str]
+    conditions: list[str]
+    values: list[Any]
+    order: list[str]
+    limit_value: int
+    offset_value: int
+
+    def __init__(self, table: str, columns: tuple[str, ...]) -> None:
+        """ Query Constructor
+
+        Parameters
+        ----------
+        table: str
+            Table of the FROM clause
+
+        columns: tuple[str, ...]
+            Columns selected
+        """
+        self.table = table
+        self.columns = columns
+        self.joins = []
+        self.conditions = []
+        self.values = []
+        self.order = []
+        self.limit_value = None
+        self.offset_value = None
+
+    def join(self, table: str, condition: str) -> 'Query':
+        """ Adds an INNER JOIN with the table
+
+        Parameters
+        ----------
+        table: str
+            Table joined
+        condition: str
+            Condition of the ON clause
+
+        Returns
+        -------
+        query: Query
+            The same query, to chain other methods
+        """
+        self.joins.append(f'INNER JOIN {table} ON {condition}')
+
+        return self
+
+    def where(self, condition: str, *values: Any) -> 'Query':
+        """ Adds a condition to the WHERE clause. It's joined with AND to the conditions already added
+
+        Parameters
+        ----------
+        condition: str
+            Condition with a placeholder (?) for each value
+        values: Any
+            Values of the placeholders of the condition
+
+        Returns
+        -------
+        query: Query
+            The same query, to chain other methods
+        """
+        self.conditions.append(condition)
+        self.values.extend(values)
+
+        return self
+
+    def order_by(self, *expressions: str) -> 'Query':
+        """ Adds expressions to the ORDER BY clause
+
+        Parameters
+        ----------
+        expressions: str
+            Expressions to order the rows
+
+        Returns
+        -------
+        query: Query
+            The same query, to chain other methods
+        """
+        self.order.extend(expressions)
+
+        return self
+
+    def limit(self, limit: int) -> 'Query':
+        """ Sets the max number of rows selected
+
+        Parameters
+        ----------
+        limit: int
+            Max number of rows
+
+        Returns
+        -------
+        query: Query
+            The same query, to chain other methods
+        """
+        self.limit_value = limit
+
+        return self
+
+    def offset(self, offset: int) -> 'Query':
+        """ Sets the number of rows skipped before the ones selected. It's only used together with a limit
+
+        Parameters
+        ----------
+        offset: int
+            Number of rows skipped
+
+        Returns
+        -------
+        query: Query
+            The same query, to chain other methods
+        """
+        self.offset_value = offset
+
+        return self
+
+    def build(self) -> tuple[str, tuple]:
+        """ Returns the SQL statement with the values of its parameters
+
+        Returns
+        -------
+        statement: tuple[str, tuple]
+            SQL statement and the values of its parameters, ready to be passed to exec_sql
+        """
+        sql = f'SELECT {", ".join(self.columns)} FROM {self.table}'
+        values = list(self.values)
+
+        if self.joins:
+            sql += ' ' + ' '.join(self.joins)
+
+        if self.conditions:
+            sql += ' WHERE ' + ' AND '.join(f'({condition})' for condition in self.conditions)
+
+        if self.order:
+            sql += ' ORDER BY ' + ', '.join(self.order)
+
+        if self.limit_value is not None:
+            sql += ' LIMIT ?'
+            values.append(self.limit_value)
+
+            if self.offset_value is not None:
+                sql += ' OFFSET ?'
+                values.append(self.offset_value)
+
+        return sql, tuple(values)
+
+
+def date_range(search_date: Union[date, list[date]]) -> tuple[date, date]:
+    """ Converts the date(s) to search into a half-open range [first_day, end_day)
+
     Parameters
     ----------
-    sql : str
-        SQL string that will be added the condition
-    condition : str
-        Condition added to SQL
-    type_condition : str
-        If 'WHERE' exists, will add the type of condition (AND/OR)
+    search_date: Union[date, list[date]]
+        Date or first and last day to search
 
     Returns
     -------
-    sql : str
-        Returns the same SQL passed with the condition
+    search_range: tuple[date, date]
+        First day included in the search and the day after the last one included
     """
-    if 'where' in sql.lower():
-        sql = sql + f' {type_condition} {condition}'
+    if isinstance(search_date, list):
+        first_day, last_day = search_date
     else:
-        sql = sql + f' WHERE {condition}'
-    return sql
+        first_day = last_day = search_date
+
+    return first_day, last_day + timedelta(days=1)
+
+
+def date_range_condition(column: str) -> str:
+    """ Returns the condition that filters a date column with a range, so the index of the column can be used. Its
+    values are the ones returned by date_range()
+
+    Parameters
+    ----------
+    column: str
+        Name of the column with the date
+
+    Returns
+    -------
+    condition: str
+        Range condition over the column, with two placeholders
+    """
+    return f'{column} >= ? AND {column} < ?'
+
+
+def like_condition(column: str) -> str:
+    """ Returns the condition that searches a text inside a column. Its value is the one returned by like_pattern()
+
+    Parameters
+    ----------
+    column: str
+        Name of the column with the text
+
+    Returns
+    -------
+    condition: str
+        LIKE condition over the column, with one placeholder
+    """
+    return f"{column} LIKE ? ESCAPE '{LIKE_ESCAPE}'"
+
+
+def like_pattern(text: str) -> str:
+    """ Returns the LIKE pattern that matches any text that contains text. The wildcards of LIKE inside text are
+    escaped, so they are searched literally
+
+    Parameters
+    ----------
+    text: str
+        Text to search
+
+    Returns
+    -------
+    pattern: str
+        LIKE pattern
+    """
+    for character in (LIKE_ESCAPE, '%', '_'):
+        text = text.replace(character, LIKE_ESCAPE + character)
+
+    return f'%{text}%'
+
+
+def fts_query(text: str) -> str:
+    """ Converts the text typed by the user into a FTS5 query
+
+    Every word is quoted, so the operators and special characters of the FTS5 syntax are searched as text, and is
+    searched as a prefix. The words are joined with an implicit AND.
+
+    Parameters
+    ----------
+    text: str
+        Text to search
+
+    Returns
+    -------
+    query: str
+        FTS5 query, or empty string if the text doesn't have any word to search
+    """
+    terms = []
+
+    for word in text.split():
+        if any(character.isalnum() for character in word):
+            word = word.replace('"', '""')
+            terms.append(f'"{word}"*')
+
+    return ' '.join(terms)
+
+
+def snippet_sql(fts_table: str, column: int = -1, tokens: int = 12) -> str:
+    """ Returns the call to the FTS5 function snippet(), which excerpts a column of the row matched
+
+    Parameters
+    ----------
+    fts_table: str
+        Name of the FTS5 table searched
+    column: int
+        Index of the column excerpted. With -1, it's the column that best matches the search
+    tokens: int
+        Max number of tokens of the excerpt
+
+    Returns
+    -------
+    sql: str
+        Call to snippet(), where the terms matched are wrapped with SNIPPET_START and SNIPPET_END
+    """
+    return f"snippet({fts_table}, {column}, '{SNIPPET_START}', '{SNIPPET_END}', '...', {tokens})"
+
+
+def strip_snippet(snippet: str) -> str:
+    """ Removes from the excerpt returned by snippet() the marks of the matched terms
+
+    Parameters
+    ----------
+    snippet: str
+        Excerpt with the matched terms wrapped by SNIPPET_START and SNIPPET_END
+
+    Returns
+    -------
+    text: str
+        Excerpt without marks
+    """
+    return snippet.replace(SNIPPET_START, '').replace(SNIPPET_END, '') if snippet else snippet
+
+
+def substring_query(text: str) -> str:
+    """ Converts the text typed by the user into a FTS5 query for a table with the trigram tokenizer, which matches the
+    rows that contain the whole text, like the pattern of like_pattern() but searched in the index
+
+    Parameters
+    ----------
+    text: str
+        Text to search
+
+    Returns
+    -------
+    query: str
+        FTS5 query, or empty string if the text is shorter than three characters, which the trigram tables can't search
+    """
+    if len(text) < 3:
+        return ''
+
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+def trigram_query(text: str) -> str:
+    """ Converts the text typed by the user into a FTS5 query for a table with the trigram tokenizer, which matches the
+    rows that contain any of the trigrams of the text
+
+    Parameters
+    ----------
+    text: str
+        Text to search
+
+    Returns
+    -------
+    query: str
+        FTS5 query, or empty string if the text is shorter than three characters
+    """
+    search_trigrams = sorted(trigrams(text))
+
+    return ' OR '.join('"{}"'.format(trigram.replace('"', '""')) for trigram in search_trigrams)
@@ -1,8 +1,11 @@
-from typing import overload, Union
+from typing import Final, overload, Union
 
 from codenotes.util.args import format_argument_text
 
 
+MIN_TRIGRAM_SIMILARITY: Final[float] = 0.5  # Min fraction of trigrams shared by a fuzzy match and the text searched
+
+
 def text_break(complete_text: str, max_length: int = 15) -> str:
     """ Functions that breaks the text you pass after a defined length (Default 15 characters)
 
@@ -20,7 +23,7 @@ def text_break(complete_text: str, max_length: int = 15) -> str:
         Depending in the length of the text, it's the way the text will be broken
     """
 
-    if len(complete_text) > 15:
+    if len(complete_text) > max_length:
         return f'{complete_text[:max_length]}...'
     else:
         return complete_text
@@ -81,3 +84,43 @@ def status_text(status_value: int) -> str:
         return 'In Process'
     elif status_value == 2:
         return 'Finished'
+
+
+def trigrams(text: str) -> set[str]:
+    """ Functions that returns the trigrams (sequences of three characters) of the text, ignoring case
+
+    Parameters
+    ----------
+    text: str
+        Text to split in trigrams
+
+    Returns
+    -------
+    text_trigrams: set[str]
+        Trigrams of the text. Empty when the text is shorter than three characters
+    """
+    text = text.lower()
+
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def trigram_similarity(search_trigrams: set[str], text: str) -> float:
+    """ Functions that returns the fraction of the trigrams searched that are contained in the text
+
+    Parameters
+    ----------
+    search_trigrams: set[str]
+        Trigrams of the text searched
+
+    text: str
+        Text compared with the text searched
+
+    Returns
+    -------
+    similarity: float
+        Value between 0 and 1, where 1 means that the text contains all the trigrams searched
+    """
+    if not search_trigrams:
+        return 1.0
+
+    return len(search_trigrams & trigrams(text)) / len(search_trigrams)
@@ -1,4 +1,7 @@
 @echo off
 cls
 IF EXIST codenotes\codenotes.db DEL /F codenotes\codenotes.db
+IF EXIST codenotes\codenotes.db-wal DEL /F codenotes\codenotes.db-wal
+IF EXIST codenotes\codenotes.db-shm DEL /F codenotes\codenotes.db-shm
+IF EXIST codenotes\codenotes.db.cache RMDIR /S /Q codenotes\codenotes.db.cache
 python -m unittest -v
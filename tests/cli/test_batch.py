@@ -0,0 +1,57 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import codenotes.db.utilities.tasks as tasks
+from codenotes import parse_args
+from codenotes.cli.batch import BatchCommands
+from codenotes.db.connection import SQLiteConnection
+
+
+class TestBatchCommands(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral(in_memory=False)  # The tasks committed are read by another connection
+        handle, self.script = tempfile.mkstemp(suffix='.txt')
+        os.close(handle)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        os.remove(self.script)
+
+    def write_script(self, *lines: str) -> None:
+        with open(self.script, 'w', encoding='utf-8') as script:
+            script.write('\n'.join(lines))
+
+    def batch_tasks(self) -> list[str]:
+        sql = f"SELECT {tasks.COLUMN_CONTENT} FROM {tasks.TABLE_NAME} WHERE {tasks.COLUMN_CONTENT} LIKE 'Batch %' " \
+              f"ORDER BY {tasks.COLUMN_ID}"
+        db = SQLiteConnection(path=self.db.database_path)  # Another connection only sees the committed tasks
+        try:
+            return [content for content, in db.exec_sql(sql).fetchall()]
+        finally:
+            db.close()
+
+    def test_batch(self):
+        self.write_script('# Tasks of the batch', 'add task Batch first task', '', 'codenotes add task "Batch second task"')
+
+        with redirect_stdout(io.StringIO()):
+            BatchCommands.set_args(parse_args(['batch', self.script, '--quiet']), self.db)
+
+        self.assertFalse(self.db.deferred_commits)
+        self.assertListEqual(self.batch_tasks(), ['Batch first task', 'Batch second task'])
+
+    def test_batch_rollback(self):
+        self.write_script('add task Batch first task', 'add task Batch second task', 'add task Batch third task',
+                          'shell')
+
+        with redirect_stdout(io.StringIO()), self.assertRaises(SystemExit):
+            BatchCommands.set_args(parse_args(['batch', self.script, '-q', '--commit-every', '2']), self.db)
+
+        self.assertListEqual(self.batch_tasks(), ['Batch first task', 'Batch second task'])
+
+
+if __name__ == '__main__':
+    unittest.main()
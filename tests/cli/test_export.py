@@ -0,0 +1,84 @@
+import os
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+
+import codenotes.db.utilities.tasks as tasks
+from codenotes import parse_args
+from codenotes.cli.export import ExportAnnotations
+from codenotes.db.connection import SQLiteConnection
+
+
+class TestExportAnnotations(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.db = SQLiteConnection.ephemeral()
+        self.add_task('Task 1')
+
+    def tearDown(self) -> None:
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def add_task(self, content: str, updated: str = None) -> None:
+        self.db.exec_sql(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, '
+                         f'{tasks.COLUMN_CATEGORY}, {tasks.COLUMN_UPDATED}) VALUES (?, ?, 1, ?)',
+                         (content, '2021-03-01', updated))
+        self.db.commit()
+
+    def export(self, *args: str) -> ExportAnnotations:
+        return ExportAnnotations(parse_args(['export', *args]), self.db)
+
+    def read_records(self, path: str) -> list[dict]:
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_export(self):
+        path = os.path.join(self.directory, 'backup.jsonl.gz')
+        export = self.export('--output', path)
+        records = self.read_records(path)
+
+        self.assertEqual(export.exported, len(records))
+        self.assertDictEqual(records[0], {
+            'type': 'note_category', 'id': 1, 'category': 'General', 'updated': records[0]['updated']
+        })
+        self.assertIn('task_category', {record['type'] for record in records})
+        self.assertEqual(records[-1]['content'], 'Task 1')
+        self.assertEqual(export.last_updated, max(record['updated'] for record in records))
+
+    def test_export_since(self):
+        export = self.export('--output', os.path.join(self.directory, 'backup.jsonl.gz'))
+        self.assertGreater(export.last_change, 0)
+
+        path = os.path.join(self.directory, 'changes.jsonl.gz')
+        changes = self.export('--output', path, '--since', str(export.last_change))
+
+        self.assertEqual(changes.exported, 0)
+        self.assertListEqual(self.read_records(path), [])
+        self.assertEqual(changes.last_change, export.last_change)
+
+    def test_export_since_late_commit(self):
+        """ Test that a row committed after the export is exported, although its timestamp is older than the export
+        (e.g. a long transaction, or the same millisecond) """
+        export = self.export('--output', os.path.join(self.directory, 'backup.jsonl.gz'))
+        self.add_task('Task 2', '2000-01-01 00:00:00.000')
+
+        path = os.path.join(self.directory, 'changes.jsonl.gz')
+        changes = self.export('--output', path, '--since', str(export.last_change))
+
+        self.assertListEqual([record.get('content') for record in self.read_records(path)], ['Task 2'])
+        self.assertGreater(changes.last_change, export.last_change)
+
+    def test_export_since_timestamp(self):
+        export = self.export('--output', os.path.join(self.directory, 'backup.jsonl.gz'))
+
+        path = os.path.join(self.directory, 'changes.jsonl.gz')
+        self.export('--output', path, '--since', export.last_updated)
+
+        self.assertTrue(all(record['updated'] == export.last_updated for record in self.read_records(path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+
+import codenotes.db.location as location
+import codenotes.db.utilities.tasks as tasks
+from codenotes import dispatch, parse_args
+from codenotes.db.connection import SQLiteConnection
+from codenotes.db.federated import database_label, query_databases
+
+
+class TestFederatedSearch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        # The current database is searched too, so it mustn't be the one of the package
+        self.environ = mock.patch.dict(os.environ, {
+            location.CONFIG_VARIABLE: self.directory.name,
+            location.DATABASE_VARIABLE: os.path.join(self.directory.name, 'codenotes.db')
+        })
+        self.environ.start()
+
+        self.paths = []
+        for project, dates in (('first', ('2020-01-03', '2020-01-05')), ('second', ('2020-01-01', '2020-01-04'))):
+            os.mkdir(os.path.join(self.directory.name, project))
+            with redirect_stdout(io.StringIO()):
+                dispatch(parse_args(['init', os.path.join(self.directory.name, project)]))
+
+            path = os.path.join(self.directory.name, project, location.PROJECT_DIRECTORY, location.PROJECT_DATABASE)
+            db = SQLiteConnection(path=path)
+            db.exec_many(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, '
+                         f'{tasks.COLUMN_CATEGORY}) VALUES (?, ?, 1)',
+                         [(f'Federated {project} task', creation) for creation in dates])
+            db.commit()
+            db.close()
+
+            self.paths.append(path)
+
+    def tearDown(self) -> None:
+        self.environ.stop()
+        self.directory.cleanup()
+
+    def test_query_databases(self):
+        sql = f'SELECT {tasks.COLUMN_CREATION} FROM {tasks.TABLE_NAME} ORDER BY {tasks.COLUMN_CREATION}'
+        missing = os.path.join(self.directory.name, 'missing', 'codenotes.db')
+        os.makedirs(missing)  # A directory can't be opened as a database
+
+        rows, failed = query_databases([*self.paths, self.paths[0], missing], sql, (), key=lambda row: row[0])
+
+        self.assertListEqual([(database_label(path), creation) for path, creation in rows], [
+            ('second', '2020-01-01'), ('first', '2020-01-03'), ('second', '2020-01-04'), ('first', '2020-01-05')
+        ])
+        self.assertListEqual(failed, [missing])
+
+    def test_search_all_dbs(self):
+        stream = io.StringIO()
+        with redirect_stdout(stream):
+            dispatch(parse_args(['search', 'task', 'Federated', '--all-dbs', '--limit', '3', '--format', 'tsv']))
+
+        lines = [line.split('\t') for line in stream.getvalue().splitlines()]
+
+        self.assertListEqual(lines[0], ['database', 'id', 'content', 'status', 'creation', 'category'])
+        self.assertListEqual([(line[0], line[4]) for line in lines[1:]], [
+            (self.paths[1], '2020-01-01'), (self.paths[0], '2020-01-03'), (self.paths[1], '2020-01-04')
+        ])
+
+        with redirect_stdout(io.StringIO()):
+            dispatch(parse_args(['search', 'task', 'Federated', '--all-dbs']))
+            dispatch(parse_args(['search', 'note', 'Federated', '--all-dbs']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import threading
+from unittest import mock
+from datetime import date
+
+from codenotes import parse_args
+from codenotes.cli.importer import ImportAnnotations, parse_status
+from codenotes.db.connection import SQLiteConnection
+import codenotes.db.utilities.notes as notes
+import codenotes.db.utilities.tasks as tasks
+
+
+class TestImportAnnotations(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.db = SQLiteConnection.ephemeral()
+
+    def tearDown(self) -> None:
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+    def write_file(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+        return path
+
+    def select(self, sql: str) -> list[tuple]:
+        return self.db.exec_sql(sql).fetchall()
+
+    def test_import_tasks(self):
+        path = self.write_file('todo.txt', 'x 2020-01-03 2020-01-02 Imported finished chore\n'
+                                           '\n'
+                                           '(A) 2020-01-02 Imported pending chore\n')
+        importer = ImportAnnotations(parse_args(['import', 'task', path, '--batch-size', '1']), self.db)
+
+        self.assertEqual(importer.imported, 2)
+        self.assertListEqual(
+            self.select(f"SELECT {tasks.COLUMN_CONTENT}, {tasks.COLUMN_STATUS}, {tasks.COLUMN_CREATION} FROM "
+                        f"{tasks.TABLE_NAME} WHERE {tasks.COLUMN_CONTENT} LIKE 'Imported%' ORDER BY "
+                        f"{tasks.COLUMN_STATUS}"),
+            [('Imported pending chore', 0, '2020-01-02'), ('Imported finished chore', 2, '2020-01-02')]
+        )
+
+    def test_import_notes(self):
+        path = self.write_file('notes.jsonl', '{"title": "Imported note", "content": "# Heading", "readme": true, '
+                                              '"category": "General", "creation": "2020-01-02T10:00:00"}\n'
+                                              '{"content": ""}\n'
+                                              'not json\n')
+        importer = ImportAnnotations(parse_args(['import', 'note', path]), self.db)
+
+        self.assertEqual(importer.imported, 1)
+        self.assertEqual(importer.skipped, 2)
+        self.assertListEqual(
+            self.select(f"SELECT {notes.COLUMN_CONTENT}, {notes.COLUMN_CATEGORY}, {notes.COLUMN_README}, "
+                        f"{notes.COLUMN_CREATION} FROM {notes.TABLE_NAME} WHERE "
+                        f"{notes.COLUMN_TITLE} = 'Imported note'"),
+            [('# Heading', 1, 1, str(date(2020, 1, 2)))]
+        )
+
+    def test_import_locked(self):
+        """ Without busy timeout, the import waits for the other writer to release the lock """
+        db = SQLiteConnection(path=os.path.join(self.directory, 'codenotes.db'), timeout=0)
+        locked = threading.Event()
+
+        def hold_lock() -> None:
+            writer = SQLiteConnection(path=db.database_path)
+            writer.exec_sql('BEGIN IMMEDIATE')
+            locked.set()
+            threading.Event().wait(0.2)
+            writer.rollback()
+            writer.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        locked.wait()
+
+        try:
+            path = self.write_file('todo.txt', 'Imported locked chore\nImported other chore\n')
+            importer = ImportAnnotations(parse_args(['import', 'task', path]), db)
+            thread.join()
+
+            self.assertEqual(importer.imported, 2)
+            self.assertEqual(db.exec_sql(f'SELECT COUNT(*) FROM {tasks.TABLE_NAME}').fetchone()[0], 2)
+            self.assertFalse(db.connection.in_transaction)
+        finally:
+            db.close()
+
+    def test_import_retried(self):
+        """ The lock is lost in the middle of the batch, so the retry must insert all the records of the batch again """
+        path = self.write_file('tasks.jsonl', '{"content": "Retried chore", "category": "Retried"}\n'
+                                              '{"content": ""}\n'
+                                              '{"content": "Other retried chore", "category": "Retried"}\n')
+        exec_many = self.db.exec_many
+
+        for arguments in (['--batch-size', '3'], []):
+            attempts = []
+
+            def locked_once(sql, values):
+                attempts.append(sql)
+
+                if len(attempts) == 1:
+                    raise sqlite3.OperationalError('database is locked')
+
+                return exec_many(sql, values)
+
+            with mock.patch.object(self.db, 'exec_many', locked_once):
+                importer = ImportAnnotations(parse_args(['import', 'task', path, *arguments]), self.db)
+
+            self.assertEqual(len(attempts), 2)
+            self.assertEqual((importer.imported, importer.skipped), (2, 1))
+            self.assertListEqual(
+                self.select(f"SELECT {tasks.COLUMN_CONTENT} FROM {tasks.TABLE_NAME} WHERE {tasks.COLUMN_CATEGORY} > 1 "
+                            f"ORDER BY {tasks.COLUMN_ID}"),
+                [('Retried chore',), ('Other retried chore',)]
+            )
+            self.db.exec_sql(f'DELETE FROM {tasks.TABLE_NAME}')
+            self.db.commit()
+
+    def test_parse_status(self):
+        self.assertEqual(parse_status(None), 0)
+        self.assertEqual(parse_status('In Process'), 1)
+        self.assertEqual(parse_status('2'), 2)
+        self.assertRaises(ValueError, parse_status, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import io
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from rich.panel import Panel
+from rich.console import Console
+from rich.markdown import Markdown
+
+import codenotes.cli.markdown as markdown
+from codenotes.cli.markdown import CachedMarkdown
+
+README = """# Readme note
+
+Some **bold** text, a [link](https://github.com/EGAMAGZ/codenotes) and a list:
+
+* First item
+* Second item
+
+```python
+def greet(name: str) -> str:
+    return f'Hello {name}'
+```
+"""
+
+
+class TestCachedMarkdown(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.environ = mock.patch.dict(os.environ, {'XDG_CACHE_HOME': self.directory.name})
+        self.environ.start()
+        markdown.RENDERS.clear()
+
+    def tearDown(self) -> None:
+        markdown.RENDERS.clear()
+        self.environ.stop()
+        self.directory.cleanup()
+
+    @staticmethod
+    def render(renderable, width: int = 60, color_system: str = 'truecolor') -> str:
+        console = Console(file=io.StringIO(), width=width, force_terminal=True, color_system=color_system)
+        console.print(Panel(renderable, title='Readme note'))
+
+        return re.sub(r'id=[\d.-]+', '', console.file.getvalue())  # The ids of the links are random
+
+    def test_same_output(self):
+        expected = self.render(Markdown(README))
+
+        self.assertEqual(self.render(CachedMarkdown(README)), expected)
+
+        markdown.RENDERS.clear()  # Loaded from the file saved
+        with mock.patch.object(markdown, 'Markdown', side_effect=AssertionError('Markdown parsed again')):
+            self.assertEqual(self.render(CachedMarkdown(README)), expected)
+
+    def test_width(self):
+        self.render(CachedMarkdown(README), width=60)
+        self.render(CachedMarkdown(README), width=80)
+
+        self.assertEqual(len(markdown.RENDERS), 2)
+        self.assertEqual(len(os.listdir(markdown.cache_directory())), 2)
+        self.assertEqual(self.render(CachedMarkdown(README), width=80), self.render(Markdown(README), width=80))
+
+    def test_render_settings(self):
+        """ Test that the renders of another terminal or version of rich aren't reused """
+        self.render(CachedMarkdown(README))
+
+        self.assertEqual(self.render(CachedMarkdown(README), color_system='standard'),
+                         self.render(Markdown(README), color_system='standard'))
+
+        with mock.patch.object(markdown, 'rich_version', return_value='0.0.0'):
+            self.render(CachedMarkdown(README))
+
+        self.assertEqual(len(markdown.RENDERS), 3)
+        self.assertEqual(len(os.listdir(markdown.cache_directory())), 3)
+
+    def test_bounded(self):
+        with mock.patch.object(markdown, 'MEMORY_ENTRIES', 2), mock.patch.object(markdown, 'MAX_ENTRIES', 3):
+            for number in range(5):
+                self.render(CachedMarkdown(f'# Note {number}'))
+
+        self.assertEqual(len(markdown.RENDERS), 2)
+        self.assertEqual(len(os.listdir(markdown.cache_directory())), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,31 @@
+import io
 from datetime import datetime
 import unittest
+from unittest import mock
+from contextlib import redirect_stdout
 
 from codenotes import parse_args
-from codenotes.cli.notes import AddNote, SearchNote
+from codenotes.cli.notes import EXCERPT_TOKENS, AddNote, SearchNote
+from codenotes.db.connection import SQLiteConnection
+from codenotes.util.sql import SNIPPET_START, SNIPPET_END
+
+LOREM_IPSUM = ['Lorem', 'ipsum', 'dolor', 'sit', 'amet,', 'consectetur', 'adipiscing', 'elit,', 'sed', 'do', 'eiusmod',
+               'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore', 'magna', 'aliqua.']
+
+
+def add_notes(db: SQLiteConnection) -> None:
+    """ Stores the notes searched by the tests """
+    for text in ([*LOREM_IPSUM, '--title', 'Lorem', 'ipsum', 'Note', '--category', 'CLI', 'Category'],
+                 ['New', 'Note', 'in', 'the', 'same', 'category', '--category', 'CLI', 'Category'],
+                 LOREM_IPSUM, ['--title', 'Empty', 'Note']):
+        with redirect_stdout(io.StringIO()):
+            AddNote(parse_args(['add', 'note', *text]), db)
 
 
 class TestAddNote(unittest.TestCase):
 
     def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral()
         self.expected_note_text = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor ' \
                                   'incididunt ut labore et dolore magna aliqua.'
 
@@ -17,7 +35,7 @@ class TestAddNote(unittest.TestCase):
             'elit,', 'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore',
             'magna', 'aliqua.', '--title', 'Lorem', 'ipsum', 'Note', '--category', 'CLI', 'Category'
         ])
-        add_note = AddNote(args)
+        add_note = AddNote(args, self.db)
 
         self.assertEqual(add_note.category_id, 2)
         self.assertEqual(add_note.category_name, 'CLI Category')
@@ -27,7 +45,7 @@ class TestAddNote(unittest.TestCase):
         args = parse_args([
             'add', 'note', 'New', 'Note', 'in', 'the', 'same', 'category', '--category', 'CLI', 'Category'
         ])
-        add_note = AddNote(args)
+        add_note = AddNote(args, self.db)
 
         self.assertEqual(add_note.category_id, 2)
         self.assertEqual(add_note.category_name, 'CLI Category')
@@ -40,7 +58,7 @@ class TestAddNote(unittest.TestCase):
             'elit,', 'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore',
             'magna', 'aliqua.'
         ])
-        add_note = AddNote(args)
+        add_note = AddNote(args, self.db)
 
         self.assertEqual(add_note.note_text, self.expected_note_text)
         self.assertEqual(add_note.note_title, 'Lorem ipsum dolor sit amet, co')
@@ -49,24 +67,28 @@ class TestAddNote(unittest.TestCase):
         args = parse_args([
             'add', 'note', '--title', 'Empty', 'Note'
         ])
-        add_note = AddNote(args) 
+        add_note = AddNote(args, self.db) 
 
         self.assertEqual(add_note.note_text, None)
         self.assertEqual(add_note.note_title, 'Empty Note')
 
     def tearDown(self) -> None:
+        self.db.close()
         del self.expected_note_text
 
 
 class TestSearchNote(unittest.TestCase):
     
     def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral()
         self.date = datetime.now().date().strftime('%Y-%m-%d')
         self.default_note_text = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor ' \
                                   'incididunt ut labore et dolore magna aliqua.'
         self.default_note_title = 'Lorem ipsum Note'
         self.default_category = 'General'
 
+        add_notes(self.db)
+
     def test_search_month_note(self):
         expected_notes = [
             (self.default_note_title, self.default_note_text, 'CLI Category', 0, self.date),
@@ -76,7 +98,7 @@ class TestSearchNote(unittest.TestCase):
         ]
 
         args = parse_args(['search', 'note', '--month'])
-        query = SearchNote(args).sql_query()
+        query = SearchNote(args, self.db).sql_query()
 
         self.assertCountEqual(query, expected_notes)
 
@@ -87,7 +109,7 @@ class TestSearchNote(unittest.TestCase):
         ]
 
         args = parse_args(['search', 'note', 'Lorem', 'ipsum', '--today'])
-        query = SearchNote(args).sql_query()
+        query = SearchNote(args, self.db).sql_query()
 
         self.assertCountEqual(query, expected_notes)
     
@@ -99,10 +121,57 @@ class TestSearchNote(unittest.TestCase):
         ]
 
         args = parse_args(['search', 'note', 'Lorem', 'ipsum'])
-        query = SearchNote(args).sql_query()
+        query = SearchNote(args, self.db).sql_query()
 
         self.assertCountEqual(query, expected_notes)
 
+    def test_search_substring_note(self):
+        args = parse_args(['search', 'note', 'psu'])
+        query = SearchNote(args, self.db).sql_query()
+
+        self.assertCountEqual([note[0] for note in query], [self.default_note_title, 'Lorem ipsum dolor sit amet, co'])
+
+    def test_search_fuzzy_note(self):
+        expected_notes = [
+            (self.default_note_title, self.default_note_text, 'CLI Category', self.date),
+            ('Lorem ipsum dolor sit amet, co', self.default_note_text, self.default_category, self.date)
+        ]
+
+        args = parse_args(['search', 'note', 'orem ipsun', '--fuzzy'])
+        query = SearchNote(args, self.db).fuzzy_query()
+
+        self.assertCountEqual(query, expected_notes)
+
+    def test_search_ranked_note(self):
+        args = parse_args(['search', 'note', 'consectetur', '--rank'])
+        query = SearchNote(args, self.db).ranked_query()
+
+        self.assertCountEqual([note[0] for note in query], [self.default_note_title, 'Lorem ipsum dolor sit amet, co'])
+        for note in query:
+            self.assertIn(f'{SNIPPET_START}consectetur{SNIPPET_END}', note[1])
+
+    def test_search_ranked_long_note(self):
+        with redirect_stdout(io.StringIO()):
+            AddNote(parse_args(['add', 'note', *LOREM_IPSUM * 5, 'highlighted', 'marker', '--title', 'Long', 'Note']),
+                    self.db)
+
+        args = parse_args(['search', 'note', 'highlighted', 'marker', '--rank'])
+        excerpt = SearchNote(args, self.db).ranked_query()[0][1]
+
+        self.assertIn(f'{SNIPPET_START}highlighted{SNIPPET_END} {SNIPPET_START}marker{SNIPPET_END}', excerpt)
+        self.assertLessEqual(len(excerpt.replace('...', ' ').split()), EXCERPT_TOKENS)
+
+    def test_search_closes_database(self):
+        """ Test that the connection opened by the search is closed once the notes are displayed """
+        with mock.patch('codenotes.cli.notes.SQLiteConnection', return_value=self.db), \
+                mock.patch.object(self.db, 'close') as close, redirect_stdout(io.StringIO()):
+            SearchNote(parse_args(['search', 'note', '--today']))
+            close.assert_called_once()
+
+            close.reset_mock()
+            SearchNote(parse_args(['search', 'note', '--today']), self.db)  # Connection of the caller
+            close.assert_not_called()
+
     def test_search_today_note(self):
         expected_notes = [
             (self.default_note_title, self.default_note_text, 'CLI Category', 0, self.date),
@@ -112,7 +181,7 @@ class TestSearchNote(unittest.TestCase):
         ]
 
         args = parse_args(['search', 'note', '--today'])
-        query = SearchNote(args).sql_query()
+        query = SearchNote(args, self.db).sql_query()
 
         self.assertCountEqual(query, expected_notes)
 
@@ -120,11 +189,12 @@ class TestSearchNote(unittest.TestCase):
         expected_notes = []
 
         args = parse_args(['search', 'note', '--yesterday'])
-        query = SearchNote(args).sql_query()
+        query = SearchNote(args, self.db).sql_query()
 
         self.assertCountEqual(query, expected_notes)
 
     def tearDown(self) -> None:
+        self.db.close()
         del self.date
         del self.default_note_text
         del self.default_note_title
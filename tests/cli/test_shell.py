@@ -0,0 +1,48 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from codenotes import parse_args
+from codenotes.cli import PrintFormatted
+from codenotes.cli.shell import Shell
+from codenotes.db.connection import SQLiteConnection
+
+
+class TestShell(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral()
+        self.shell = Shell(parse_args(['shell']), self.db)
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_run_line(self):
+        stream = io.StringIO()
+        with redirect_stdout(stream):
+            self.assertTrue(self.shell.run_line('codenotes search task --today --format tsv'))
+            self.assertTrue(self.shell.run_line('search task "unclosed'))
+            self.assertTrue(self.shell.run_line(''))
+
+        self.assertTrue(stream.getvalue().startswith('id\tcontent\tstatus\tcreation\tcategory\n'))
+        self.assertFalse(self.shell.run_line('exit'))
+
+    def test_shared_console(self):
+        PrintFormatted.share_console(self.shell.console)
+        try:
+            self.assertIs(PrintFormatted().console, self.shell.console)
+        finally:
+            PrintFormatted.share_console(None)
+
+        self.assertIsNot(PrintFormatted().console, self.shell.console)
+
+    def test_completions(self):
+        self.assertListEqual(self.shell.completions('se', 'se'), ['search'])
+        self.assertListEqual(self.shell.completions('add ', ''), ['note', 'task'])
+        self.assertListEqual(self.shell.completions('add task Review -c TO', 'TO'), ['TODO Tasks'])
+        self.assertListEqual(self.shell.completions('add task Review --category TODO ', ''), ['Tasks'])
+        self.assertListEqual(self.shell.completions('add note Review -c Gen', 'Gen'), ['General'])
+
+
+if __name__ == '__main__':
+    unittest.main()
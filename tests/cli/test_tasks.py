@@ -1,23 +1,42 @@
+import io
+import json
 import unittest
+from unittest import mock
 from datetime import datetime
+from contextlib import redirect_stdout
 
 from codenotes import parse_args
 from codenotes.cli.tasks import AddTask, SearchTask
+from codenotes.db.connection import SQLiteConnection
+from codenotes.util.sql import SNIPPET_START, SNIPPET_END
+
+
+def add_tasks(db: SQLiteConnection) -> None:
+    """ Stores the tasks searched by the tests """
+    for text in (['New task #1'], ['New task #2;New task #3'], ['Different', 'task'],
+                 ['CLI', 'task', '--category', 'CLI', 'Category'],
+                 ['Task', 'in', 'same', 'category', '--category', 'CLI', 'Category']):
+        with redirect_stdout(io.StringIO()):
+            AddTask(parse_args(['add', 'task', *text]), db)
 
 
 class TestAddTask(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral()
+
     # ! format_task_text function is indirectly tested
     def test_add_bad_input_task(self):
         """ Test bad task input, when is only typed ; """
         args = parse_args(['add', 'task', ';'])
-        add_task = AddTask(args)
+        add_task = AddTask(args, self.db)
 
         self.assertTrue(isinstance(add_task.task, list))
         self.assertListEqual(add_task.task, [])
 
     def test_add_task_and_category(self):
         args = parse_args(['add', 'task', 'CLI', 'task', '--category','CLI', 'Category'])
-        add_task = AddTask(args)
+        add_task = AddTask(args, self.db)
 
         self.assertEqual(add_task.category_id, 2)
         self.assertEqual(add_task.category_name, 'CLI Category')
@@ -26,7 +45,7 @@ class TestAddTask(unittest.TestCase):
         args = parse_args([
             'add', 'task', 'Task', 'in','same', 'category', '--category','CLI', 'Category'
             ])
-        add_task = AddTask(args)
+        add_task = AddTask(args, self.db)
 
         self.assertEqual(add_task.category_id, 2)
         self.assertEqual(add_task.category_name, 'CLI Category')
@@ -35,7 +54,7 @@ class TestAddTask(unittest.TestCase):
     def test_add_many_tasks(self):
         """ Test the storage of two tasks """
         args = parse_args(['add', 'task', 'New task #2;New task #3'])
-        add_task = AddTask(args)
+        add_task = AddTask(args, self.db)
 
         self.assertTrue(isinstance(add_task.task, list))
         self.assertListEqual(add_task.task, ['New task #2', 'New task #3'])
@@ -43,23 +62,25 @@ class TestAddTask(unittest.TestCase):
     def test_add_one_task(self):
         """ Test the storage of one task """
         args = parse_args(['add', 'task', 'New task #1'])
-        add_task = AddTask(args)
+        add_task = AddTask(args, self.db)
 
         self.assertTrue(isinstance(add_task.task, str))
         self.assertEqual(add_task.task, 'New task #1')
 
+    def tearDown(self) -> None:
+        self.db.close()
+
 
 class TestSearchTask(unittest.TestCase):
 
     def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral()
         self.date = datetime.now().date().strftime('%Y-%m-%d')
         self.default_category_name = 'TODO Tasks'
 
-    def test_search_month_task(self):
-        # Stores a fourth task
-        args = parse_args(['add', 'task', 'Different', 'task'])
-        AddTask.set_args(args)
+        add_tasks(self.db)
 
+    def test_search_month_task(self):
         expected_tasks = [
             ('New task #1', 0, self.date, self.default_category_name),
             ('New task #2', 0, self.date, self.default_category_name),
@@ -70,7 +91,7 @@ class TestSearchTask(unittest.TestCase):
         ]
 
         args = parse_args(['search', 'task', '--month'])
-        query = SearchTask(args).sql_query()
+        query = SearchTask(args, self.db).sql_query()
 
         self.assertCountEqual(query, expected_tasks)
 
@@ -81,7 +102,7 @@ class TestSearchTask(unittest.TestCase):
             ('Different task', 0, self.date, self.default_category_name)
         ]
         args = parse_args(['search', 'task', 'Different', '--today'])
-        query = SearchTask(args).sql_query()
+        query = SearchTask(args, self.db).sql_query()
 
         self.assertCountEqual(query, expected_tasks)
 
@@ -93,10 +114,96 @@ class TestSearchTask(unittest.TestCase):
             ('New task #3', 0, self.date, self.default_category_name)
         ]
         args = parse_args(['search', 'task', 'New', 'task'])
-        query = SearchTask(args).sql_query()
+        query = SearchTask(args, self.db).sql_query()
+
+        self.assertCountEqual(query, expected_tasks)
+
+    def test_search_substring_task(self):
+        """ Test that search the tasks that contain the text inside a word, and the short texts """
+        with redirect_stdout(io.StringIO()):
+            AddTask(parse_args(['add', 'task', 'Fix', 'the', 'codenotes', 'parser']), self.db)
+
+        args = parse_args(['search', 'task', 'ode'])
+        self.assertListEqual(SearchTask(args, self.db).sql_query(),
+                             [('Fix the codenotes parser', 0, self.date, self.default_category_name)])
+
+        args = parse_args(['search', 'task', 'od'])
+        self.assertListEqual([task[0] for task in SearchTask(args, self.db).sql_query()], ['Fix the codenotes parser'])
+
+    def test_search_fuzzy_task(self):
+        """ Test that search a task with a typo in the text searched """
+        expected_tasks = [
+            ('New task #1', 0, self.date, self.default_category_name),
+            ('New task #2', 0, self.date, self.default_category_name),
+            ('New task #3', 0, self.date, self.default_category_name)
+        ]
+        args = parse_args(['search', 'task', 'New', 'tsk', '--fuzzy'])
+        query = SearchTask(args, self.db).fuzzy_query()
 
         self.assertCountEqual(query, expected_tasks)
 
+    def test_search_pages_task(self):
+        """ Test that the pages, through --after and --page, contain all the tasks without repeating any """
+        args = parse_args(['search', 'task', '--today'])
+        expected_tasks = SearchTask(args, self.db).sql_query()
+
+        args = parse_args(['search', 'task', '--today', '--limit', '4'])
+        first_page, next_after = SearchTask(args, self.db).page_query()
+
+        args = parse_args(['search', 'task', '--today', '--limit', '4', '--after', str(next_after)])
+        second_page, last_after = SearchTask(args, self.db).page_query()
+
+        self.assertEqual(len(first_page), 4)
+        self.assertIsNone(last_after)
+        self.assertListEqual(first_page + second_page, expected_tasks)
+
+        args = parse_args(['search', 'task', '--today', '--limit', '4', '--page', '2'])
+        self.assertListEqual(SearchTask(args, self.db).sql_query(), second_page)
+
+    def test_search_ranked_task(self):
+        args = parse_args(['search', 'task', 'same', 'categ', '--rank'])
+        query = SearchTask(args, self.db).ranked_query()
+
+        expected_tasks = [
+            (f'Task in {SNIPPET_START}same{SNIPPET_END} {SNIPPET_START}category{SNIPPET_END}', 0, self.date,
+             'CLI Category')
+        ]
+
+        self.assertListEqual(query, expected_tasks)
+
+    def test_search_stream_task(self):
+        """ Test that the tasks found are written as ndjson, in the same order they are displayed """
+        args = parse_args(['search', 'task', '--today'])
+        expected_tasks = SearchTask(args, self.db).sql_query()
+
+        stream = io.StringIO()
+        with redirect_stdout(stream):
+            SearchTask(parse_args(['search', 'task', '--today', '--format', 'ndjson']), self.db)
+
+        written_tasks = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        self.assertListEqual([task['content'] for task in written_tasks], [task[0] for task in expected_tasks])
+        self.assertSetEqual(set(written_tasks[0]), {'id', 'content', 'status', 'creation', 'category'})
+
+    def test_search_sql_text(self):
+        """ Test that text with SQL syntax is searched as text """
+        for text in (['"', 'OR', '1=1', '--'], ["'", ')', 'where', '('], ['%']):
+            args = parse_args(['search', 'task', *text])
+            query = SearchTask(args, self.db).sql_query()
+
+            self.assertListEqual(query, [])
+
+    def test_search_closes_database(self):
+        """ Test that the connection opened by the search is closed once the tasks are displayed """
+        with mock.patch('codenotes.cli.tasks.SQLiteConnection', return_value=self.db), \
+                mock.patch.object(self.db, 'close') as close, redirect_stdout(io.StringIO()):
+            SearchTask(parse_args(['search', 'task', '--today']))
+            close.assert_called_once()
+
+            close.reset_mock()
+            SearchTask(parse_args(['search', 'task', '--today']), self.db)  # Connection of the caller
+            close.assert_not_called()
+
     def test_search_today_task(self):
         """ Test that search for the four tasks added """
         expected_tasks = [
@@ -109,7 +216,7 @@ class TestSearchTask(unittest.TestCase):
         ]
 
         args = parse_args(['search', 'task', '--today'])
-        query = SearchTask(args).sql_query()
+        query = SearchTask(args, self.db).sql_query()
 
         self.assertCountEqual(query, expected_tasks)
 
@@ -117,11 +224,12 @@ class TestSearchTask(unittest.TestCase):
         expected_tasks = []
 
         args = parse_args(['search', 'task', '--yesterday'])
-        query = SearchTask(args).sql_query()
+        query = SearchTask(args, self.db).sql_query()
 
         self.assertCountEqual(query, expected_tasks)
 
     def tearDown(self) -> None:
+        self.db.close()
         del self.date
         del self.default_category_name
 
@@ -0,0 +1,55 @@
+import unittest
+
+import codenotes.db.category_ids as category_ids
+import codenotes.db.utilities.notes_categories as notes_categories
+import codenotes.db.utilities.tasks_categories as tasks_categories
+from codenotes.db.connection import SQLiteConnection
+
+
+class TestCategoryIds(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral()
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_resolve(self):
+        self.assertEqual(category_ids.resolve(self.db, tasks_categories, None), 1)
+        self.assertEqual(category_ids.resolve(self.db, tasks_categories, 'Work'), 2)
+        self.assertEqual(category_ids.resolve(self.db, notes_categories, 'Work'), 2)
+
+        self.db.category_ids.clear()  # Found in the database, instead of the cache
+        self.assertEqual(category_ids.resolve(self.db, tasks_categories, 'Work'), 2)
+
+        count = self.db.exec_sql(f'SELECT COUNT(*) FROM {tasks_categories.TABLE_NAME}').fetchone()[0]
+        self.assertEqual(count, 2)
+
+    def test_find(self):
+        self.assertEqual(category_ids.find(self.db, tasks_categories, 'TODO Tasks'), 1)
+        self.assertIsNone(category_ids.find(self.db, tasks_categories, 'Missing'))
+        self.assertNotIn('Missing', category_ids.cache(self.db, tasks_categories))
+
+    def test_cache(self):
+        category_ids.resolve(self.db, tasks_categories, 'Cached')
+        self.db.exec_sql('PRAGMA query_only = ON')  # The cached categories don't query the database
+
+        self.assertEqual(category_ids.resolve(self.db, tasks_categories, 'Cached'), 2)
+
+    def test_rollback(self):
+        self.db.exec_sql('BEGIN')
+        category_ids.resolve(self.db, tasks_categories, 'Rolled back')
+        self.db.rollback()
+
+        self.assertIsNone(category_ids.find(self.db, tasks_categories, 'Rolled back'))
+
+    def test_load(self):
+        category_ids.resolve(self.db, tasks_categories, 'Loaded')
+        self.db.commit()
+        self.db.category_ids.clear()
+
+        self.assertDictEqual(category_ids.load(self.db, tasks_categories), {'TODO Tasks': 1, 'Loaded': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+import multiprocessing
+
+import codenotes.db.utilities.tasks as tasks
+from codenotes.db.connection import SQLiteConnection
+
+WRITERS = 8
+TASKS_PER_WRITER = 25
+
+
+def add_tasks(path: str, writer: int) -> None:
+    """ Adds the tasks of a writer, each one in its own transaction """
+    db = SQLiteConnection(path=path)
+    sql = f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, {tasks.COLUMN_CATEGORY}) ' \
+          f"VALUES (?, '2020-01-01', 1)"
+
+    try:
+        for number in range(TASKS_PER_WRITER):
+            db.write(lambda: db.exec_sql(sql, (f'Writer {writer} task {number}',)))
+    finally:
+        db.close()
+
+
+class TestConcurrentWriters(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'codenotes.db')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_concurrent_writers(self):
+        """ All the writers start at the same time on a new database, so they also race to migrate it """
+        processes = [
+            multiprocessing.Process(target=add_tasks, args=(self.path, writer)) for writer in range(WRITERS)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+
+        self.assertListEqual([process.exitcode for process in processes], [0] * WRITERS)
+
+        db = SQLiteConnection(read_only=True, path=self.path)
+        try:
+            self.assertEqual(db.exec_sql('PRAGMA journal_mode').fetchone()[0], 'wal')
+            self.assertEqual(db.exec_sql(f'SELECT COUNT(*) FROM {tasks.TABLE_NAME}').fetchone()[0],
+                             WRITERS * TASKS_PER_WRITER)
+        finally:
+            db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
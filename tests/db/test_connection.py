@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+import threading
+from unittest import mock
+
+import codenotes.db.utilities.tasks as tasks
+from codenotes.db.connection import SQLiteConnection
+from codenotes.db.journal import journal_enabled
+from codenotes.db.location import DATABASE_VARIABLE, MEMORY_DATABASE
+
+
+class TestReadOnlyConnection(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.writer = SQLiteConnection.ephemeral(in_memory=False)
+        self.db = SQLiteConnection(read_only=True, path=self.writer.database_path)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.writer.close()
+
+    def test_read(self):
+        self.assertTrue(self.db.read_only)
+        self.assertEqual(self.db.exec_sql('PRAGMA query_only').fetchone()[0], 1)
+        self.assertIsInstance(self.db.exec_sql(f'SELECT COUNT(*) FROM {tasks.TABLE_NAME}').fetchone()[0], int)
+
+    def test_write(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            self.db.exec_sql(f"INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}) VALUES ('Read-only task')")
+
+    def test_read_while_writing(self):
+        try:
+            self.writer.exec_sql('BEGIN IMMEDIATE')
+            self.writer.exec_sql(f"UPDATE {tasks.TABLE_NAME} SET {tasks.COLUMN_STATUS} = 0 "
+                                 f"WHERE {tasks.COLUMN_ID} = 0")
+
+            self.assertIsInstance(self.db.exec_sql(f'SELECT COUNT(*) FROM {tasks.TABLE_NAME}').fetchone()[0], int)
+        finally:
+            self.writer.rollback()
+
+
+class TestEphemeralConnection(unittest.TestCase):
+
+    def test_in_memory(self):
+        first, second = SQLiteConnection.ephemeral(), SQLiteConnection.ephemeral()
+        try:
+            first.write(lambda: first.exec_sql(f"INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, "
+                                               f"{tasks.COLUMN_CREATION}) VALUES ('In-memory task', '2020-01-01')"))
+
+            self.assertTrue(first.in_memory)
+            self.assertEqual(first.exec_sql(f'SELECT COUNT(*) FROM {tasks.TABLE_NAME}').fetchone()[0], 1)
+            self.assertEqual(second.exec_sql(f'SELECT COUNT(*) FROM {tasks.TABLE_NAME}').fetchone()[0], 0)
+        finally:
+            first.close()
+            second.close()
+
+    def test_temporary_file(self):
+        db = SQLiteConnection.ephemeral(in_memory=False)
+        db.write(lambda: db.exec_sql(f"INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, "
+                                     f"{tasks.COLUMN_CREATION}) VALUES ('Temporary task', '2020-01-01')"))
+
+        reader = SQLiteConnection(read_only=True, path=db.database_path)
+        self.assertEqual(reader.exec_sql(f'SELECT COUNT(*) FROM {tasks.TABLE_NAME}').fetchone()[0], 1)
+        reader.close()
+
+        db.close()
+        self.assertFalse(os.path.exists(db.database_path))
+
+    def test_memory_variable(self):
+        with mock.patch.dict(os.environ, {DATABASE_VARIABLE: MEMORY_DATABASE}):
+            db = SQLiteConnection(read_only=True)
+
+            self.assertTrue(db.in_memory)
+            self.assertFalse(journal_enabled(True))  # There's no database to replay the journal into
+            db.close()
+
+
+class TestWrite(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'codenotes.db')
+        self.db = SQLiteConnection(path=self.path, timeout=0)
+        self.sql = f"INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, " \
+                   f"{tasks.COLUMN_CATEGORY}) VALUES ('Write task', '2020-01-01', 1)"
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.directory.cleanup()
+
+    def count(self) -> int:
+        return self.db.exec_sql(f'SELECT COUNT(*) FROM {tasks.TABLE_NAME}').fetchone()[0]
+
+    def test_retry(self):
+        """ Without busy timeout, the write is retried until the other writer releases the lock """
+        locked = threading.Event()
+
+        def hold_lock() -> None:
+            writer = SQLiteConnection(path=self.path)
+            writer.exec_sql('BEGIN IMMEDIATE')
+            locked.set()
+            threading.Event().wait(0.2)
+            writer.rollback()
+            writer.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        locked.wait()
+
+        self.db.write(lambda: self.db.exec_sql(self.sql))
+        thread.join()
+
+        self.assertEqual(self.count(), 1)
+        self.assertFalse(self.db.connection.in_transaction)
+
+    def test_error(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            self.db.write(lambda: self.db.exec_sql(self.sql) and self.db.exec_sql('SELECT * FROM missing_table'))
+
+        self.assertEqual(self.count(), 0)
+
+    def test_deferred_commits(self):
+        self.db.deferred_commits = True
+        self.db.write(lambda: self.db.exec_sql(self.sql))
+        self.db.write(lambda: self.db.exec_sql(self.sql))
+
+        self.assertTrue(self.db.connection.in_transaction)
+        self.db.rollback()
+        self.assertEqual(self.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import io
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+import codenotes.db.journal as journal
+import codenotes.db.utilities.notes as notes
+import codenotes.db.utilities.tasks as tasks
+from codenotes import parse_args
+from codenotes.cli.journal import CaptureAnnotations
+from codenotes.cli.tasks import SearchTask
+from codenotes.db.connection import SQLiteConnection
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral(in_memory=False)
+        handle, self.path = tempfile.mkstemp(suffix=journal.JOURNAL_SUFFIX)
+        os.close(handle)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        os.remove(self.path)
+
+        if os.path.exists(self.path + journal.REJECTED_SUFFIX):
+            os.remove(self.path + journal.REJECTED_SUFFIX)
+
+    def test_append_replay(self):
+        records = [
+            {'type': 'task', 'content': 'Journal first task', 'category': None, 'creation': '2020-02-01'},
+            {'type': 'task', 'content': 'Journal second task', 'category': None, 'creation': '2020-02-01'},
+            {'type': 'note', 'title': 'Journal note', 'content': 'Content', 'category': None, 'creation': '2020-02-01'}
+        ]
+
+        self.assertFalse(journal.pending(self.path))
+        self.assertEqual(journal.append(records, self.path), 3)
+        self.assertTrue(journal.pending(self.path))
+
+        with open(self.path, 'a', encoding='utf-8') as journal_file:
+            journal_file.write('{"type": "task", "content": "Journal interrupted')  # Append killed mid-write
+
+        self.assertEqual(journal.replay(self.db, self.path), 3)
+        self.assertFalse(journal.pending(self.path))
+        self.assertEqual(journal.replay(self.db, self.path), 0)
+
+        sql = f"SELECT {tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, {tasks.COLUMN_CATEGORY} FROM {tasks.TABLE_NAME} " \
+              f"WHERE {tasks.COLUMN_CONTENT} LIKE 'Journal %' ORDER BY {tasks.COLUMN_ID}"
+        self.assertListEqual(self.db.exec_sql(sql).fetchall(), [
+            ('Journal first task', '2020-02-01', 1), ('Journal second task', '2020-02-01', 1)
+        ])
+
+    def test_replay_invalid_records(self):
+        records = [
+            {'type': 'task', 'category': None, 'creation': '2020-02-01'},
+            {'type': 'note', 'content': '', 'creation': '2020-02-01'},
+            {'type': 'task', 'content': 'Journal task', 'creation': 'yesterday'},
+            {'type': 'task', 'content': 'Journal task', 'category': 'A' * 31},
+            {'type': 'event', 'content': 'Journal event'},
+            {'type': 'task', 'content': 'Journal valid task', 'creation': '2020-02-01'},
+            {'type': 'note', 'content': 'Journal note without title', 'creation': '2020-02-01'}
+        ]
+        journal.append(records, self.path)
+
+        self.assertEqual(journal.replay(self.db, self.path), 2)
+        self.assertFalse(journal.pending(self.path))
+
+        with open(self.path + journal.REJECTED_SUFFIX, encoding='utf-8') as rejected:
+            self.assertEqual(len(rejected.readlines()), 5)
+
+        sql = f"SELECT {notes.COLUMN_TITLE} FROM {notes.TABLE_NAME}"
+        self.assertListEqual(self.db.exec_sql(sql).fetchall(), [('Journal note without title',)])
+
+    def test_replay_in_transaction(self):
+        journal.append([{'type': 'task', 'content': 'Journal task', 'creation': '2020-02-01'}], self.path)
+
+        self.db.exec_sql(f"UPDATE {tasks.TABLE_NAME} SET {tasks.COLUMN_STATUS} = 0 WHERE {tasks.COLUMN_ID} = 0")
+        self.assertEqual(journal.replay(self.db, self.path), 0)
+        self.db.commit()
+
+        self.assertTrue(journal.pending(self.path))
+
+    def test_replay_read_only(self):
+        journal.append([{'type': 'task', 'content': 'Journal task', 'creation': '2020-02-01'}], self.path)
+        read_only = SQLiteConnection(read_only=True, path=self.db.database_path, timeout=5.0)
+
+        try:
+            self.db.exec_sql('BEGIN IMMEDIATE')  # Another command writing
+
+            start = time.monotonic()
+            with redirect_stderr(io.StringIO()) as stderr:
+                self.assertEqual(journal.replay(read_only, self.path), 0)
+
+            self.assertLess(time.monotonic() - start, 1.0)  # It doesn't wait for the busy timeout
+            self.assertIn('locked', stderr.getvalue())
+            self.assertTrue(journal.pending(self.path))
+
+            self.db.rollback()
+            self.assertEqual(journal.replay(read_only, self.path), 1)
+            self.assertFalse(journal.pending(self.path))
+        finally:
+            read_only.close()
+
+    def test_replay_journal_locked(self):
+        journal.append([{'type': 'task', 'content': 'Journal task', 'creation': '2020-02-01'}], self.path)
+        read_only = SQLiteConnection(read_only=True, path=self.db.database_path)
+
+        try:
+            with open(self.path, 'r+') as locked, redirect_stderr(io.StringIO()):
+                journal.lock(locked.fileno())  # Another replay in progress
+                self.assertEqual(journal.replay(read_only, self.path), 0)
+
+            self.assertEqual(journal.replay(read_only, self.path), 1)
+        finally:
+            read_only.close()
+
+    def test_search_while_writing(self):
+        """ Test that a search runs, without the annotations of the journal, while another command holds the lock """
+        path = journal.journal_path(self.db.database_path)
+        journal.append([{'type': 'task', 'content': 'Journal task', 'creation': '2020-02-01'}], path)
+        read_only = SQLiteConnection(read_only=True, path=self.db.database_path, timeout=5.0)
+        args = parse_args(['search', 'task', 'Journal', '--format', 'tsv'])
+
+        try:
+            self.db.exec_sql('BEGIN IMMEDIATE')
+
+            with redirect_stdout(io.StringIO()) as stdout, redirect_stderr(io.StringIO()):
+                SearchTask(args, read_only)
+            self.assertNotIn('Journal task', stdout.getvalue())
+
+            self.db.rollback()
+
+            with redirect_stdout(io.StringIO()) as stdout:
+                SearchTask(args, read_only)
+            self.assertIn('Journal task', stdout.getvalue())
+        finally:
+            read_only.close()
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_capture_records(self):
+        args = parse_args(['add', 'task', 'Journal first;', 'Journal second', '-c', 'Work', '--journal'])
+        records = CaptureAnnotations.annotation_records(args)
+
+        self.assertTrue(CaptureAnnotations.capturable(args))
+        self.assertListEqual([record['content'] for record in records], ['Journal first', 'Journal second'])
+        self.assertEqual(records[0]['category'], 'Work')
+
+        args = parse_args(['add', 'note', 'Journal', 'note', 'without', 'a', 'title', 'typed', 'by', 'the', 'user'])
+        self.assertEqual(CaptureAnnotations.annotation_records(args)[0]['title'], 'Journal note without a title t')
+
+        self.assertFalse(CaptureAnnotations.capturable(parse_args(['add', 'task', 'Journal task', '--preview'])))
+        self.assertFalse(CaptureAnnotations.capturable(parse_args(['add', 'task', 'Task', '-c', 'A' * 31])))
+
+
+if __name__ == '__main__':
+    unittest.main()
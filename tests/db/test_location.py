@@ -0,0 +1,67 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+
+import codenotes.db.location as location
+from codenotes import dispatch, parse_args
+
+
+class TestLocation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self.directory.name)
+        self.config = os.path.join(self.root, 'config')
+        self.project = os.path.join(self.root, 'project')
+        self.subdirectory = os.path.join(self.project, 'src', 'package')
+        os.makedirs(self.subdirectory)
+
+        environ = {key: value for key, value in os.environ.items() if key != location.DATABASE_VARIABLE}
+        environ[location.CONFIG_VARIABLE] = self.config
+        self.environ = mock.patch.dict(os.environ, environ, clear=True)
+        self.environ.start()
+
+    def tearDown(self) -> None:
+        self.environ.stop()
+        self.directory.cleanup()
+
+    def init_project(self) -> str:
+        with redirect_stdout(io.StringIO()):
+            dispatch(parse_args(['init', self.project]))
+
+        return os.path.join(self.project, location.PROJECT_DIRECTORY, location.PROJECT_DATABASE)
+
+    def test_default(self):
+        self.assertIsNone(location.project_database(self.subdirectory))
+        self.assertEqual(location.database_path(self.subdirectory), location.DEFAULT_PATH)
+
+    def test_project(self):
+        path = self.init_project()
+
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(location.database_path(self.subdirectory), path)
+        self.assertEqual(location.database_path(self.root), location.DEFAULT_PATH)
+        self.assertIn(path, location.registered_databases())
+
+        location.register(path)  # Already registered
+        with open(os.path.join(self.config, location.REGISTRY_FILE), encoding='utf-8') as registry:
+            self.assertEqual(registry.read(), path + '\n')
+
+    def test_precedence(self):
+        self.init_project()
+        os.makedirs(self.config, exist_ok=True)  # Created by the registry
+        with open(os.path.join(self.config, location.CONFIG_FILE), 'w', encoding='utf-8') as config:
+            config.write('[database]\npath = notes/codenotes.db\n')
+
+        self.assertEqual(location.database_path(self.root), os.path.join(self.config, 'notes', 'codenotes.db'))
+        self.assertNotEqual(location.database_path(self.subdirectory), location.configured_database())
+
+        os.environ[location.DATABASE_VARIABLE] = os.path.join(self.root, 'environ.db')
+        self.assertEqual(location.database_path(self.subdirectory), os.path.join(self.root, 'environ.db'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import sqlite3
+import unittest
+from unittest import mock
+from datetime import date
+
+import codenotes.db.utilities.notes as notes
+import codenotes.db.utilities.tasks as tasks
+import codenotes.db.utilities.tasks_categories as tasks_categories
+import codenotes.db.utilities.change_log as change_log
+from codenotes.db.migrations import MIGRATIONS, SCHEMA_VERSION, TRIGRAM_MISSING, TRIGRAM_STATEMENTS, \
+    TRIGRAM_SUPPORTED, migrate, schema_version, trigram_search, trigram_tables
+from codenotes.util.sql import date_range, date_range_condition
+
+
+class TestMigrate(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.connection = sqlite3.connect(':memory:')
+
+    def test_new_database(self):
+        applied = migrate(self.connection)
+
+        self.assertEqual(applied, SCHEMA_VERSION)
+        self.assertEqual(schema_version(self.connection), SCHEMA_VERSION)
+
+        categories = self.connection.execute(
+            f'SELECT {tasks_categories.COLUMN_ID}, {tasks_categories.COLUMN_NAME} FROM {tasks_categories.TABLE_NAME}'
+        ).fetchall()
+        self.assertListEqual(categories, [(1, 'TODO Tasks')])
+
+    def test_up_to_date_database(self):
+        migrate(self.connection)
+
+        statements = []
+        self.connection.set_trace_callback(statements.append)
+        self.assertEqual(migrate(self.connection), 0)
+        self.connection.set_trace_callback(None)
+
+        self.assertListEqual(statements, ['PRAGMA user_version'])  # The only cost of an up-to-date database
+        self.assertFalse(self.connection.in_transaction)
+
+        categories = self.connection.execute(f'SELECT * FROM {tasks_categories.TABLE_NAME}').fetchall()
+        self.assertEqual(len(categories), 1)
+
+    def test_unversioned_database(self):
+        """ Test a database created before the migrations, which already has the tables """
+        self.connection.execute(tasks_categories.CREATE_TABLE)
+        self.connection.execute(tasks_categories.INSERT_DEFAULT_CATEGORY)
+        self.connection.commit()
+
+        migrate(self.connection)
+
+        categories = self.connection.execute(
+            f'SELECT {tasks_categories.COLUMN_ID}, {tasks_categories.COLUMN_NAME} FROM {tasks_categories.TABLE_NAME}'
+        ).fetchall()
+        self.assertListEqual(categories, [(1, 'TODO Tasks')])
+        self.connection.execute(f'SELECT * FROM {notes.TABLE_NAME}')
+
+    def test_date_search_uses_index(self):
+        migrate(self.connection)
+
+        plan = self.connection.execute(
+            f'EXPLAIN QUERY PLAN SELECT * FROM {tasks.TABLE_NAME} WHERE {date_range_condition(tasks.COLUMN_CREATION)}',
+            date_range([date(2021, 1, 1), date(2021, 1, 31)])
+        ).fetchall()
+
+        self.assertIn(f'USING INDEX {tasks.TABLE_NAME}_creation_idx', plan[0][-1])
+
+    def test_fts_backfill_and_sync(self):
+        """ Test that rows stored before the full-text tables are indexed, and new changes are kept in sync """
+        for statement in MIGRATIONS[0]:
+            self.connection.execute(statement)
+        self.connection.execute('PRAGMA user_version = 1')
+        self.connection.execute(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, '
+                                f'{tasks.COLUMN_CATEGORY}) VALUES ("Old task", "2021-01-01", 1)')
+        self.connection.commit()
+
+        migrate(self.connection)
+        sql = f'SELECT rowid FROM {tasks.FTS_TABLE_NAME} WHERE {tasks.FTS_TABLE_NAME} MATCH ?'
+
+        self.assertListEqual(self.connection.execute(sql, ('old',)).fetchall(), [(1,)])
+
+        self.connection.execute(f'UPDATE {tasks.TABLE_NAME} SET {tasks.COLUMN_CONTENT} = "Renamed task"')
+        self.assertListEqual(self.connection.execute(sql, ('old',)).fetchall(), [])
+        self.assertListEqual(self.connection.execute(sql, ('renamed',)).fetchall(), [(1,)])
+
+        self.connection.execute(f'DELETE FROM {tasks.TABLE_NAME}')
+        self.assertListEqual(self.connection.execute(sql, ('task',)).fetchall(), [])
+
+    def test_updated_timestamp(self):
+        """ Test that the rows stored before the timestamp column get one, and changes update it """
+        for statement in MIGRATIONS[0]:
+            self.connection.execute(statement)
+        self.connection.execute('PRAGMA user_version = 1')
+        self.connection.execute(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, '
+                                f'{tasks.COLUMN_CATEGORY}) VALUES ("Old task", "2021-01-01", 1)')
+        self.connection.commit()
+
+        migrate(self.connection)
+        sql = f'SELECT {tasks.COLUMN_UPDATED} FROM {tasks.TABLE_NAME}'
+
+        self.connection.execute(f'UPDATE {tasks.TABLE_NAME} SET {tasks.COLUMN_UPDATED} = "2021-01-01 00:00:00.000"')
+        self.assertListEqual(self.connection.execute(sql).fetchall(), [('2021-01-01 00:00:00.000',)])
+
+        self.connection.execute(f'UPDATE {tasks.TABLE_NAME} SET {tasks.COLUMN_STATUS} = 2')
+        self.connection.execute(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, '
+                                f'{tasks.COLUMN_CATEGORY}) VALUES ("New task", "2021-01-02", 1)')
+
+        updated = self.connection.execute(sql).fetchall()
+        self.assertEqual(len(updated), 2)
+        self.assertTrue(all(timestamp > '2021-01-01 00:00:00.000' for timestamp, in updated))
+
+    def test_unique_categories(self):
+        """ Test that the repeated categories are merged into the first one, with their tasks """
+        for statement in (statement for migration in MIGRATIONS[:5] for statement in migration):
+            self.connection.execute(statement)
+        self.connection.execute('PRAGMA user_version = 5')
+        self.connection.executemany(f'INSERT INTO {tasks_categories.TABLE_NAME} ({tasks_categories.COLUMN_NAME}) '
+                                    f'VALUES (?)', [('Work',), ('TODO Tasks',), ('Work',)])
+        self.connection.executemany(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, '
+                                    f'{tasks.COLUMN_CATEGORY}) VALUES (?, "2021-01-01", ?)',
+                                    [('First', 2), ('Second', 3), ('Third', 4)])
+        self.connection.commit()
+
+        migrate(self.connection)
+
+        categories = self.connection.execute(
+            f'SELECT {tasks_categories.COLUMN_ID}, {tasks_categories.COLUMN_NAME} FROM {tasks_categories.TABLE_NAME}'
+        ).fetchall()
+        self.assertListEqual(categories, [(1, 'TODO Tasks'), (2, 'Work')])
+
+        task_categories = self.connection.execute(
+            f'SELECT {tasks.COLUMN_CONTENT}, {tasks.COLUMN_CATEGORY} FROM {tasks.TABLE_NAME}'
+        ).fetchall()
+        self.assertListEqual(task_categories, [('First', 2), ('Second', 1), ('Third', 2)])
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.connection.execute(f'INSERT INTO {tasks_categories.TABLE_NAME} ({tasks_categories.COLUMN_NAME}) '
+                                    f'VALUES ("Work")')
+
+    def test_change_log(self):
+        """ Test that the rows stored before the change log are logged by their last change, and the changes move the
+        rows to the end of the log """
+        for statement in (statement for migration in MIGRATIONS[:7] for statement in migration):
+            self.connection.execute(statement)
+        self.connection.execute('PRAGMA user_version = 7')
+        self.connection.executemany(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, '
+                                    f'{tasks.COLUMN_CATEGORY}, {tasks.COLUMN_UPDATED}) VALUES (?, "2021-01-01", 1, ?)',
+                                    [('First', '2021-01-02'), ('Second', '2021-01-01')])
+        self.connection.commit()
+
+        migrate(self.connection)
+
+        def logged() -> list[int]:
+            return [row for row, in self.connection.execute(
+                f'SELECT {change_log.COLUMN_ROW} FROM {change_log.TABLE_NAME} WHERE {change_log.COLUMN_TABLE} = ? '
+                f'ORDER BY {change_log.COLUMN_SEQUENCE}', (tasks.TABLE_NAME,)
+            )]
+
+        self.assertListEqual(logged(), [2, 1])
+
+        self.connection.execute(f'UPDATE {tasks.TABLE_NAME} SET {tasks.COLUMN_STATUS} = 1 WHERE {tasks.COLUMN_ID} = 2')
+        self.assertListEqual(logged(), [1, 2])
+
+        self.connection.execute(f'DELETE FROM {tasks.TABLE_NAME} WHERE {tasks.COLUMN_ID} = 1')
+        self.assertListEqual(logged(), [2])
+
+    def tearDown(self) -> None:
+        self.connection.close()
+
+    @unittest.skipUnless(TRIGRAM_SUPPORTED, 'SQLite without the trigram tokenizer')
+    def test_trigram_tables_skipped(self):
+        """ Test a database migrated by a SQLite without the trigram tokenizer, opened after SQLite is upgraded """
+        MIGRATIONS[3] = ()  # Migration 4, as an older SQLite applies it
+        try:
+            with mock.patch('codenotes.db.migrations.TRIGRAM_SUPPORTED', False):
+                migrate(self.connection)
+        finally:
+            MIGRATIONS[3] = TRIGRAM_STATEMENTS
+
+        self.connection.execute(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, '
+                                f"{tasks.COLUMN_CATEGORY}) VALUES ('Trigram task', '2021-01-01', 1)")
+        self.connection.commit()
+
+        self.assertEqual(schema_version(self.connection), SCHEMA_VERSION)
+        self.assertEqual(self.connection.execute('PRAGMA user_version').fetchone()[0], SCHEMA_VERSION | TRIGRAM_MISSING)
+        self.assertFalse(trigram_search(self.connection))  # The fuzzy searches don't use the missing tables
+
+        self.assertEqual(migrate(self.connection), 0)
+        self.assertTrue(trigram_tables(self.connection))
+        self.assertEqual(self.connection.execute('PRAGMA user_version').fetchone()[0], SCHEMA_VERSION)
+
+        rows = self.connection.execute(f"SELECT rowid FROM {tasks.TRIGRAM_TABLE_NAME} WHERE "
+                                       f"{tasks.TRIGRAM_TABLE_NAME} MATCH 'gram'").fetchall()
+        self.assertListEqual(rows, [(1,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import io
+import glob
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import codenotes.db.result_cache as result_cache
+import codenotes.db.utilities.tasks as tasks
+import codenotes.db.utilities.changes as changes
+from codenotes import parse_args
+from codenotes.cli.tasks import AddTask, SearchTask
+from codenotes.db.connection import SQLiteConnection
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral(in_memory=False)
+        self.queries = 0
+        self.sql = f'SELECT {tasks.COLUMN_CONTENT}, {tasks.COLUMN_STATUS} FROM {tasks.TABLE_NAME}'
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def query(self) -> list[tuple]:
+        self.queries += 1
+        return self.db.exec_sql(self.sql).fetchall()
+
+    def add_task(self, content: str) -> None:
+        self.db.write(lambda: self.db.exec_sql(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, '
+                                               f'{tasks.COLUMN_CREATION}) VALUES (?, "2020-01-01")', (content,)))
+
+    def test_fetch(self):
+        self.add_task('Cached task')
+
+        self.assertListEqual(result_cache.fetch(self.db, (self.sql,), self.query), [('Cached task', 0)])
+        self.assertListEqual(result_cache.fetch(self.db, (self.sql,), self.query), [('Cached task', 0)])
+        self.assertEqual(self.queries, 1)
+
+    def test_invalidation(self):
+        result_cache.fetch(self.db, (self.sql,), self.query)
+        self.add_task('New task')
+
+        self.assertListEqual(result_cache.fetch(self.db, (self.sql,), self.query), [('New task', 0)])
+        self.assertEqual(self.queries, 2)
+
+        self.db.write(lambda: self.db.exec_sql(f'UPDATE {tasks.TABLE_NAME} SET {tasks.COLUMN_STATUS} = 2'))
+        self.assertListEqual(result_cache.fetch(self.db, (self.sql,), self.query), [('New task', 2)])
+
+        self.db.write(lambda: self.db.exec_sql(f'DELETE FROM {tasks.TABLE_NAME}'))
+        self.assertListEqual(result_cache.fetch(self.db, (self.sql,), self.query), [])
+        self.assertEqual(self.queries, 4)
+
+    def test_transaction(self):
+        """ Test that the results aren't cached inside a transaction, which may be rolled back """
+        self.db.exec_sql('BEGIN')
+        result_cache.fetch(self.db, (self.sql,), self.query)
+        result_cache.fetch(self.db, (self.sql,), self.query)
+        self.db.rollback()
+
+        self.assertEqual(self.queries, 2)
+
+    def test_evict(self):
+        directory = result_cache.cache_directory(self.db.database_path)
+
+        for number in range(4):
+            result_cache.fetch(self.db, (self.sql, number), self.query)
+        entries = sorted((entry for entry in os.scandir(directory) if entry.name.endswith(result_cache.ENTRY_SUFFIX)),
+                         key=lambda entry: entry.name)
+        for used, entry in enumerate(entries):
+            os.utime(entry.path, (used, used))
+
+        self.assertEqual(result_cache.evict(directory, max_entries=2), 2)
+        self.assertListEqual(self.entries(), [entry.name for entry in entries[2:]])
+
+        self.assertEqual(result_cache.evict(directory, max_size=0), 2)
+        self.assertListEqual(self.entries(), [])
+
+    def entries(self) -> list[str]:
+        directory = result_cache.cache_directory(self.db.database_path)
+        return sorted(os.path.basename(path) for path in glob.glob(os.path.join(directory, '*.json')))
+
+    def test_recreated_database(self):
+        """ Test that a database created again, whose counter repeats the same values, doesn't reach the results of
+        the previous one """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'codenotes.db')
+
+            for content in ('Alpha task', 'Beta task'):
+                self.db.close()
+                for file in glob.glob(path + '*'):
+                    if os.path.isfile(file):
+                        os.remove(file)
+
+                self.db = SQLiteConnection(path=path)
+                self.add_task(content)
+
+                self.assertListEqual(result_cache.fetch(self.db, (self.sql,), self.query), [(content, 0)])
+
+            self.db.close()
+            self.db = SQLiteConnection.ephemeral()
+
+        self.assertEqual(self.queries, 2)
+
+    def test_counter_down(self):
+        """ Test that the cache is cleared when the counter goes down, like when a backup is restored """
+        self.add_task('Restored task')
+        result_cache.fetch(self.db, (self.sql,), self.query)
+        self.assertEqual(len(self.entries()), 1)
+
+        self.db.write(lambda: self.db.exec_sql(f'UPDATE {changes.TABLE_NAME} SET {changes.COLUMN_COUNT} = 0'))
+        result_cache.fetch(self.db, (self.sql, 'other'), self.query)
+
+        self.assertEqual(len(self.entries()), 1)  # Only the new result
+        self.assertEqual(self.queries, 2)
+
+    def test_search(self):
+        with redirect_stdout(io.StringIO()):
+            AddTask(parse_args(['add', 'task', 'First cached task']), self.db)
+
+            args = parse_args(['search', 'task', 'cached'])
+            self.assertEqual(len(SearchTask(args, self.db).sql_query()), 1)
+
+            AddTask(parse_args(['add', 'task', 'Second cached task']), self.db)
+            self.assertEqual(len(SearchTask(args, self.db).sql_query()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import os
+import socket
+import shutil
+import tempfile
+import unittest
+import threading
+from unittest import mock
+from contextlib import redirect_stdout
+
+import codenotes.daemon as daemon
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix domain sockets are required by the daemon')
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'codenotes.sock')
+        # Forwarded to the daemon, with the other variables of codenotes
+        self.environ = mock.patch.dict(os.environ, {'CODENOTES_DB': os.path.join(self.directory, 'codenotes.db'),
+                                                    'CODENOTES_JOURNAL': '0'})
+        self.environ.start()
+
+        self.thread = threading.Thread(target=daemon.serve, args=(self.path,), daemon=True)
+        self.thread.start()
+
+        for _ in range(200):
+            if daemon.request({'control': 'status'}, self.path) is not None:
+                break
+            self.thread.join(0.025)
+
+    def tearDown(self) -> None:
+        daemon.request({'control': 'stop'}, self.path)
+        self.thread.join(5)
+        self.environ.stop()
+        shutil.rmtree(self.directory)
+
+    def test_forward(self):
+        stream = io.StringIO()
+        with redirect_stdout(stream):
+            self.assertEqual(daemon.forward(['add', 'task', 'Daemon task'], self.path), 0)
+            status = daemon.forward(['search', 'task', '--today'], self.path)
+
+        self.assertEqual(status, 0)
+        self.assertIn('Daemon task', stream.getvalue())
+
+        self.assertEqual(daemon.request({'control': 'status'}, self.path)['served'], 2)
+        self.assertTrue(os.path.exists(os.environ['CODENOTES_DB']))  # The database of the client
+
+    def test_not_forwarded(self):
+        self.assertIsNone(daemon.forward(['add', 'task', 'Preview', '--preview'], self.path))
+        self.assertIsNone(daemon.forward(['import', 'task', 'todo.txt'], self.path))
+        self.assertIsNone(daemon.forward(['search', 'task', '--format', 'ndjson'], self.path))
+        self.assertIsNone(daemon.forward(['search', 'task', '--format=csv'], self.path))
+
+    def test_invalid_request(self):
+        for line in (b'not json\n', b'\n', b'[1, 2]\n', b'{"cwd": "/"}\n'):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(5)
+                client.connect(self.path)
+                client.sendall(line)
+                client.shutdown(socket.SHUT_WR)
+
+                response = b''.join(iter(lambda: client.recv(65536), b''))
+
+            self.assertIn(b'Invalid request', response)
+
+        self.assertIsNotNone(daemon.request({'control': 'status'}, self.path))  # Still serving
+
+    def test_input_runs_locally(self):
+        stream = io.StringIO()
+        with redirect_stdout(stream):  # The category name is too long, so the command asks for another one
+            status = daemon.forward(['add', 'task', 'Input task', '-c', 'A category name longer than thirty'],
+                                    self.path)
+
+        self.assertIsNone(status)
+        self.assertEqual(stream.getvalue(), '')
+        self.assertEqual(daemon.request({'control': 'status'}, self.path)['served'], 1)
+
+    def test_socket_not_private(self):
+        os.chmod(self.path, 0o777)  # Other users could answer, or read the commands
+        self.assertIsNone(daemon.request({'control': 'status'}, self.path))
+
+        os.chmod(self.path, 0o700)
+        os.chmod(self.directory, 0o777)
+        self.assertIsNone(daemon.request({'control': 'status'}, self.path))
+
+        os.chmod(self.directory, 0o700)
+        self.assertIsNotNone(daemon.request({'control': 'status'}, self.path))
+
+    def test_client_environ(self):
+        environ = {'CODENOTES_JOURNAL': '1', 'XDG_CACHE_HOME': '/cache', 'TERM': 'xterm', 'HOME': '/home/user'}
+
+        self.assertDictEqual(daemon.client_environ(environ),
+                             {'CODENOTES_JOURNAL': '1', 'XDG_CACHE_HOME': '/cache', 'TERM': 'xterm'})
+
+    def test_stop(self):
+        self.assertEqual(daemon.request({'control': 'stop'}, self.path)['status'], 0)
+        self.thread.join(5)
+
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIsNone(daemon.forward(['search', 'task', '--today'], self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
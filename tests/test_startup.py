@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+import tempfile
+import subprocess
+from unittest import mock
+
+from codenotes.db.journal import journal_path
+from codenotes.db.location import DATABASE_VARIABLE
+
+
+def imported_modules(*code: str) -> set[str]:
+    """ Runs the code in a new interpreter with -X importtime, and returns the names of the modules it imported """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', '\n'.join(code)], capture_output=True,
+                             text=True, check=True)
+
+    return {
+        line.rsplit('|', 1)[-1].strip()
+        for line in process.stderr.splitlines() if line.startswith('import time:')
+    }
+
+
+class TestStartup(unittest.TestCase):
+    """ Regression checks of the modules loaded when the CLI starts, which are most of its start-up time """
+
+    def setUp(self) -> None:
+        # The interpreters inherit the environment, so the commands use a temporary database and journal
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'codenotes.db')
+        self.environ = mock.patch.dict(os.environ, {DATABASE_VARIABLE: path})
+        self.environ.start()
+
+    def tearDown(self) -> None:
+        self.environ.stop()
+        self.directory.cleanup()
+
+    def test_parse_args(self):
+        modules = imported_modules('import codenotes', "codenotes.parse_args(['add', 'task', 'Quick', 'task'])")
+
+        self.assertIn('codenotes', modules)
+        self.assertFalse({module for module in modules if module.split('.')[0] == 'rich'})
+        self.assertNotIn('codenotes.cli.tasks', modules)
+        self.assertNotIn('codenotes.cli.notes', modules)
+
+    def test_search_format(self):
+        modules = imported_modules(
+            'import io, contextlib, codenotes',
+            'with contextlib.redirect_stdout(io.StringIO()):',
+            "    codenotes.dispatch(codenotes.parse_args(['search', 'task', '--month', '--format', 'ndjson']))"
+        )
+
+        self.assertIn('codenotes.cli.tasks', modules)
+        self.assertFalse({module for module in modules if module.split('.')[0] == 'rich'})
+
+    def test_add_task(self):
+        modules = imported_modules(
+            'import io, contextlib, codenotes',
+            'with contextlib.redirect_stdout(io.StringIO()):',
+            "    codenotes.dispatch(codenotes.parse_args(['add', 'task', '--preview']))"
+        )
+
+        self.assertIn('rich.console', modules)
+        for module in ('rich.markdown', 'rich.tree', 'pygments', 'commonmark', 'codenotes.cli.notes'):
+            self.assertNotIn(module, modules)
+
+    def test_add_task_journal(self):
+        modules = imported_modules(
+            'import io, contextlib, codenotes',
+            'with contextlib.redirect_stdout(io.StringIO()):',
+            "    codenotes.dispatch(codenotes.parse_args(['add', 'task', 'Journal task', '--journal']))"
+        )
+
+        self.assertTrue(os.path.getsize(journal_path()))
+        self.assertIn('codenotes.cli.journal', modules)
+        for module in ('sqlite3', 'codenotes.db.connection', 'rich'):
+            self.assertNotIn(module, modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+import py_cui
+
+import codenotes.db.utilities.notes as notes
+import codenotes.db.utilities.tasks as tasks
+from codenotes import parse_args
+from codenotes.tui import App, ImpPyCUI
+from codenotes.tui.pages import PAGE_SIZE, WINDOW_SIZE, KeysetPages
+from codenotes.util.sql import Query
+from codenotes.db.connection import SQLiteConnection
+
+TASKS: int = 1000
+NOTES: int = 500
+
+
+def add_tasks(db: SQLiteConnection) -> None:
+    """ Adds TASKS tasks to the default category """
+    db.exec_many(f'INSERT INTO {tasks.TABLE_NAME} ({tasks.COLUMN_CONTENT}, {tasks.COLUMN_CREATION}, '
+                 f'{tasks.COLUMN_CATEGORY}) VALUES (?, ?, 1)', ((f'Task {i}', '2020-01-01') for i in range(TASKS)))
+    db.commit()
+
+
+def add_notes(db: SQLiteConnection) -> None:
+    """ Adds NOTES notes to the default category. The even ones are readme notes """
+    db.exec_many(f'INSERT INTO {notes.TABLE_NAME} ({notes.COLUMN_TITLE}, {notes.COLUMN_CONTENT}, '
+                 f'{notes.COLUMN_README}, {notes.COLUMN_CREATION}, {notes.COLUMN_CATEGORY}) VALUES (?, ?, ?, ?, 1)',
+                 ((f'Note {i}', f'# Heading {i}\n\nContent of the note {i}', i % 2 == 0, '2020-01-01')
+                  for i in range(NOTES)))
+    db.commit()
+
+
+class TestKeysetPages(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral()
+        add_tasks(self.db)
+
+        self.pages = KeysetPages(self.db, lambda: Query(tasks.TABLE_NAME, (tasks.COLUMN_CONTENT, tasks.COLUMN_ID)),
+                                 tasks.COLUMN_ID)
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_pages(self):
+        first = self.pages.first()
+        self.assertEqual([row[1] for row in first], list(range(1, PAGE_SIZE + 1)))
+        self.assertEqual(self.pages.after(first[-1][1])[0][1], PAGE_SIZE + 1)
+
+        last = self.pages.last()
+        self.assertEqual([row[1] for row in last], list(range(TASKS - PAGE_SIZE + 1, TASKS + 1)))
+        self.assertEqual(self.pages.before(last[0][1])[-1][1], TASKS - PAGE_SIZE)
+
+    def test_ends(self):
+        self.assertEqual(self.pages.after(TASKS), [])
+        self.assertEqual(self.pages.before(1), [])
+
+
+class TestTaskWindow(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.db = SQLiteConnection.ephemeral()
+        add_tasks(self.db)
+
+        self.root = ImpPyCUI(3, 5, simulated_terminal=[30, 120])
+        App(self.root, parse_args(['tui', 'task']), self.db)
+
+        self.menu = self.root.get_widgets()[self.root._selected_widget]
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def press(self, key: int, times: int = 1) -> None:
+        for _ in range(times):
+            self.menu._handle_key_press(key)
+
+    def selected(self):
+        return self.menu.get_item_list()[self.menu.get_selected_item_index()]
+
+    def test_first_page(self):
+        self.assertEqual(len(self.menu.get_item_list()), PAGE_SIZE)
+        self.assertEqual(self.selected().row_id, 1)
+
+    def test_scroll(self):
+        self.press(py_cui.keys.KEY_DOWN_ARROW, TASKS - 1)
+
+        self.assertEqual(self.selected().row_id, TASKS)
+        self.assertLessEqual(len(self.menu.get_item_list()), WINDOW_SIZE)
+
+        self.press(py_cui.keys.KEY_DOWN_ARROW)  # Past the last task
+        self.assertEqual(self.selected().row_id, TASKS)
+
+        self.press(py_cui.keys.KEY_PAGE_UP, TASKS)
+
+        self.assertEqual(self.selected().row_id, 1)
+        self.assertLessEqual(len(self.menu.get_item_list()), WINDOW_SIZE)
+
+    def test_consecutive_ids(self):
+        self.press(py_cui.keys.KEY_PAGE_DOWN, 150)
+        self.press(py_cui.keys.KEY_UP_ARROW, 320)
+
+        row_ids = [item.row_id for item in self.menu.get_item_list()]
+        self.assertEqual(row_ids, list(range(row_ids[0], row_ids[0] + len(row_ids))))
+        self.assertEqual(self.selected().row_id, 5 * 150 + 1 - 320)
+
+    def test_home_end(self):
+        self.press(py_cui.keys.KEY_END)
+        self.assertEqual(self.selected().row_id, TASKS)
+
+        self.press(py_cui.keys.KEY_HOME)
+        self.assertEqual(self.selected().row_id, 1)
+
+    def test_status(self):
+        self.press(py_cui.keys.KEY_DOWN_ARROW, 2)
+        self.press(py_cui.keys.KEY_ENTER)
+
+        status = self.db.exec_sql(f'SELECT {tasks.COLUMN_STATUS} FROM {tasks.TABLE_NAME} WHERE {tasks.COLUMN_ID} = 3')
+        self.assertEqual(status.fetchone()[0], 1)
+        self.assertEqual(self.selected().status, 1)
+        self.assertIn('In Process', str(self.selected()))
+
+        self.press(py_cui.keys.KEY_0)
+
+        status = self.db.exec_sql(f'SELECT {tasks.COLUMN_STATUS} FROM {tasks.TABLE_NAME} WHERE {tasks.COLUMN_ID} = 3')
+        self.assertEqual(status.fetchone()[0], 0)
+        self.assertIn('Incomplete', str(self.selected()))
+
+
+class TestNoteWindow(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.environ = mock.patch.dict(os.environ, {'CODENOTES_CACHE': '0'})  # The renders aren't saved
+        self.environ.start()
+
+        self.db = SQLiteConnection.ephemeral(in_memory=False)  # The worker thread opens its own connection
+        add_notes(self.db)
+
+        self.root = ImpPyCUI(3, 5, simulated_terminal=[30, 120])
+        self.window = App(self.root, parse_args(['tui', 'note']), self.db).window
+        self.menu = self.window.notes.menu
+
+    def tearDown(self) -> None:
+        self.window.close()
+        self.db.close()
+        self.environ.stop()
+
+    def content(self) -> list[str]:
+        """ Draws until the content of the note selected is loaded """
+        for _ in range(100):
+            self.window.update()
+            lines = self.window.content.get_item_list()
+
+            if lines != ['Loading...']:
+                return lines
+
+            time.sleep(0.01)
+
+        self.fail('The content was not loaded')
+
+    def test_titles(self):
+        self.assertEqual(len(self.menu.get_item_list()), PAGE_SIZE)
+        self.assertIn('Note 0', str(self.menu.get_item_list()[0]))
+        self.assertFalse(hasattr(self.menu.get_item_list()[0], 'content'))
+
+    def test_content(self):
+        self.assertIn('Heading 0', '\n'.join(self.content()))
+        self.assertNotIn('#', '\n'.join(self.content()))  # Readme note, rendered
+
+        self.menu._handle_key_press(py_cui.keys.KEY_DOWN_ARROW)
+        self.assertIn('# Heading 1', self.content())  # Plain note
+
+    def test_latest_selection(self):
+        for _ in range(10):
+            self.menu._handle_key_press(py_cui.keys.KEY_PAGE_DOWN)
+            self.window.update()
+
+        self.assertEqual(self.content()[-1], 'Content of the note 50')  # Only the last note selected is loaded
+
+    def test_in_memory(self):
+        db = SQLiteConnection.ephemeral()
+        add_notes(db)
+
+        window = App(ImpPyCUI(3, 5, simulated_terminal=[30, 120]), parse_args(['tui', 'note']), db).window
+        try:
+            window.notes.menu._handle_key_press(py_cui.keys.KEY_END)
+
+            for _ in range(100):
+                window.update()
+                if window.content.get_item_list() != ['Loading...']:
+                    break
+                time.sleep(0.01)
+
+            self.assertIn(f'# Heading {NOTES - 1}', window.content.get_item_list())
+        finally:
+            window.close()
+            db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
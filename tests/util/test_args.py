@@ -1,9 +1,11 @@
 import unittest
 import calendar
+from argparse import ArgumentTypeError
 from datetime import datetime, timedelta, date
 
 from codenotes import parse_args
-from codenotes.util.args import date_args_empty, dates_to_search, add_note_args_empty, add_task_args_empty
+from codenotes.util.args import date_args_empty, dates_to_search, add_note_args_empty, add_task_args_empty, \
+    change_number, positive_int, timestamp
 
 
 class TestDateArgsNeededEmpty(unittest.TestCase):
@@ -105,5 +107,33 @@ class TestAddNoteArgsEmpty(unittest.TestCase):
         self.assertTrue(add_note_args_empty(args))
 
 
+class TestPositiveInt(unittest.TestCase):
+
+    def test_positive(self):
+        self.assertEqual(positive_int('25'), 25)
+
+    def test_invalid(self):
+        for arg_text in ('0', '-3', 'ten'):
+            with self.assertRaises(ArgumentTypeError):
+                positive_int(arg_text)
+
+
+class TestTimestamp(unittest.TestCase):
+
+    def test_timestamp(self):
+        self.assertEqual(timestamp('2021-03-01'), '2021-03-01 00:00:00.000')
+        self.assertEqual(timestamp('2021-03-01T18:30:05.123456'), '2021-03-01 18:30:05.123')
+        self.assertEqual(timestamp('2021-03-01T20:30:05.123+02:00'), '2021-03-01 18:30:05.123')
+        self.assertEqual(timestamp('2021-03-01T00:30:00-03:00'), '2021-03-01 03:30:00.000')
+
+    def test_change_number(self):
+        self.assertEqual(change_number('1250'), 1250)
+        self.assertEqual(change_number('2021-03-01'), '2021-03-01 00:00:00.000')
+
+    def test_invalid(self):
+        with self.assertRaises(ArgumentTypeError):
+            timestamp('yesterday')
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,65 @@
+import io
+import json
+import unittest
+from datetime import date
+
+from codenotes.util.formats import parse_todotxt, read_records, write_rows, tsv_field
+
+
+class TestWriteRows(unittest.TestCase):
+    columns = ('id', 'content', 'creation')
+    rows = [(1, 'First task', date(2021, 3, 1)), (2, 'Second\ttask\nwith breaks', date(2021, 3, 2))]
+
+    def test_ndjson(self):
+        stream = io.StringIO()
+        count = write_rows(self.rows, self.columns, 'ndjson', stream)
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(count, 2)
+        self.assertEqual(len(lines), 2)
+        self.assertDictEqual(json.loads(lines[1]),
+                             {'id': 2, 'content': 'Second\ttask\nwith breaks', 'creation': '2021-03-02'})
+
+    def test_tsv(self):
+        stream = io.StringIO()
+        write_rows(self.rows, self.columns, 'tsv', stream)
+
+        self.assertListEqual(stream.getvalue().splitlines(), [
+            'id\tcontent\tcreation',
+            '1\tFirst task\t2021-03-01',
+            '2\tSecond\\ttask\\nwith breaks\t2021-03-02'
+        ])
+
+    def test_csv(self):
+        stream = io.StringIO()
+        write_rows(self.rows, self.columns, 'csv', stream)
+
+        self.assertEqual(stream.getvalue(),
+                         'id,content,creation\n1,First task,2021-03-01\n2,"Second\ttask\nwith breaks",2021-03-02\n')
+
+    def test_tsv_field(self):
+        self.assertEqual(tsv_field(None), '')
+        self.assertEqual(tsv_field('C:\\notes'), 'C:\\\\notes')
+
+
+class TestReadRecords(unittest.TestCase):
+
+    def test_todotxt(self):
+        self.assertDictEqual(parse_todotxt('x 2021-03-02 2021-03-01 Review docs +codenotes @home'),
+                             {'status': 2, 'creation': '2021-03-01', 'category': 'codenotes',
+                              'content': 'Review docs @home'})
+        self.assertDictEqual(parse_todotxt('(A) Call mom'), {'content': 'Call mom'})
+
+    def test_csv(self):
+        records = read_records(io.StringIO('content,status\nFirst task,Finished\n'), 'csv')
+
+        self.assertListEqual(list(records), [{'content': 'First task', 'status': 'Finished'}])
+
+    def test_ndjson(self):
+        records = read_records(io.StringIO('{"content": "First task"}\n\n[1]\n{'), 'ndjson')
+
+        self.assertListEqual(list(records), [{'content': 'First task'}, None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
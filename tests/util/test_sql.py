@@ -0,0 +1,75 @@
+import unittest
+from datetime import date
+
+from codenotes.util.sql import Query, date_range, fts_query, like_pattern, trigram_query
+
+
+class TestQuery(unittest.TestCase):
+
+    def test_without_conditions(self):
+        sql, values = Query('cn_tasks', ('cn_task_id', 'cn_task_content')).build()
+
+        self.assertEqual(sql, 'SELECT cn_task_id, cn_task_content FROM cn_tasks')
+        self.assertTupleEqual(values, ())
+
+    def test_complete_query(self):
+        query = Query('cn_tasks', ('cn_task_content',))
+        query.join('cn_tasks_categories', 'cn_task_category = cn_tasks_category_id')
+        query.where('cn_task_creation >= ? AND cn_task_creation < ?', '2021-01-01', '2021-01-02')
+        query.where('cn_task_content LIKE ?', '%where%').order_by('cn_task_id').limit(10)
+
+        sql, values = query.build()
+
+        self.assertEqual(sql, 'SELECT cn_task_content FROM cn_tasks INNER JOIN cn_tasks_categories ON '
+                              'cn_task_category = cn_tasks_category_id WHERE (cn_task_creation >= ? AND '
+                              'cn_task_creation < ?) AND (cn_task_content LIKE ?) ORDER BY cn_task_id LIMIT ?')
+        self.assertTupleEqual(values, ('2021-01-01', '2021-01-02', '%where%', 10))
+
+    def test_same_sql_different_values(self):
+        """ Test that searches of different text produce the same SQL, so the prepared statement is reused """
+        first_sql, _ = Query('cn_tasks', ('cn_task_content',)).where('cn_task_content LIKE ?', '%a%').build()
+        second_sql, _ = Query('cn_tasks', ('cn_task_content',)).where('cn_task_content LIKE ?', "%' OR 1%").build()
+
+        self.assertEqual(first_sql, second_sql)
+
+
+class TestLikePattern(unittest.TestCase):
+
+    def test_wildcards(self):
+        self.assertEqual(like_pattern('100%_done\\'), '%100\\%\\_done\\\\%')
+
+
+class TestDateRange(unittest.TestCase):
+
+    def test_one_day(self):
+        self.assertTupleEqual(date_range(date(2021, 2, 28)), (date(2021, 2, 28), date(2021, 3, 1)))
+
+    def test_many_days(self):
+        search_date = [date(2021, 12, 1), date(2021, 12, 31)]
+
+        self.assertTupleEqual(date_range(search_date), (date(2021, 12, 1), date(2022, 1, 1)))
+
+
+class TestFtsQuery(unittest.TestCase):
+
+    def test_words(self):
+        self.assertEqual(fts_query('New  task'), '"New"* "task"*')
+
+    def test_syntax_characters(self):
+        self.assertEqual(fts_query('say "NEAR" OR x-y'), '"say"* """NEAR"""* "OR"* "x-y"*')
+
+    def test_without_words(self):
+        self.assertEqual(fts_query('# ; -'), '')
+
+
+class TestTrigramQuery(unittest.TestCase):
+
+    def test_trigrams(self):
+        self.assertEqual(trigram_query('Ab"cd'), '"""cd" OR "ab""" OR "b""c"')
+
+    def test_short_text(self):
+        self.assertEqual(trigram_query('ab'), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from codenotes.util.text import text_break, trigrams, trigram_similarity
+
+
+class TestTextBreak(unittest.TestCase):
+
+    def test_short_text(self):
+        self.assertEqual(text_break('Short text', 20), 'Short text')
+
+    def test_long_text(self):
+        self.assertEqual(text_break('Text longer than the limit', 11), 'Text longer...')
+
+
+class TestTrigrams(unittest.TestCase):
+
+    def test_trigrams(self):
+        self.assertSetEqual(trigrams('Index'), {'ind', 'nde', 'dex'})
+
+    def test_short_text(self):
+        self.assertSetEqual(trigrams('in'), set())
+
+    def test_similarity(self):
+        search_trigrams = trigrams('databse')
+
+        self.assertEqual(trigram_similarity(search_trigrams, 'Database index'), 0.6)
+        self.assertEqual(trigram_similarity(search_trigrams, 'Notes'), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()